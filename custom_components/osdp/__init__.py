@@ -1,14 +1,16 @@
 from __future__ import annotations
+import asyncio
+import importlib
 import logging
-import struct
-from typing import List
-import serial
-import osdp
+import time
+from collections.abc import Callable, Mapping
+from typing import Any, List
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback, Context, EventOrigin
+from homeassistant.core import HomeAssistant, callback, EventOrigin
 from homeassistant.helpers.device_registry import async_get as async_get_devreg
-from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.typing import ConfigType
 from homeassistant.components import tag
 
 from .const import (
@@ -17,82 +19,171 @@ from .const import (
     CONF_PORT,
     CONF_BAUDRATE,
     CONF_CONTROLLER_NAME,
+    CONF_ACCESS_FILE,
+    CONF_BUSES,
+    CONF_CARD_FORMATS,
+    CONF_DEDUP_WINDOW,
+    CONF_KEYPAD_TIMEOUT,
+    CONF_PIN_MAX_LENGTH,
+    CONF_PROFILE,
+    CONF_WORKER,
+    CONF_ADAPTIVE,
+    CONF_PRIORITIES,
+    CONF_QUEUE_SIZE,
+    CONF_OVERFLOW_POLICY,
+    BUS_FAILED,
+    BUS_RUNNING,
+    DEFAULT_ADAPTIVE,
     DEFAULT_BAUDRATE,
+    DEFAULT_DEDUP_WINDOW,
+    DEFAULT_KEYPAD_TIMEOUT,
+    DEFAULT_PIN_MAX_LENGTH,
+    CARD_PIN_WINDOW,
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_OVERFLOW_POLICY,
 )
+from .access import AccessList
+from .bridge import EventBridge
+from .cardformat import AUTO_TABLE, FORMAT_AUTO, CardLayout, decode_card, layout_table
+from .device_index import ReaderDeviceIndex
+from .keypad import KEYPAD_EVENT, KeypadAssembler
+from .reader_state import ReaderStateStore
+from .vendor import async_get_vendor_index
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
-class SerialChannel(osdp.Channel):
-    """Simple serial channel implementing osdp.Channel interface."""
+# Local access decision made on the callback thread, as reported in osdp_event
+_ACCESS_RESULTS = {True: "granted", False: "denied"}
 
-    def __init__(self, device: str, speed: int):
-        super().__init__()
-        self.dev = serial.Serial(device, speed, timeout=0)
+# Modules that load libosdp. They are imported in the executor by
+# async_setup, so the extension never loads on the event loop; functions
+# below import from them locally once that has happened.
+_RUNTIME_MODULES = ("bus", "coordinator", "file_transfer", "services", "journal")
+# Seconds the runtime import took, reported with each entry's startup
+DATA_IMPORT_TIME = "osdp_import_time"
 
-    def read(self, max_read: int):
-        return self.dev.read(max_read)
 
-    def write(self, data: bytes):
-        return self.dev.write(data)
+def _import_runtime() -> None:
+    """Import the libosdp-backed modules; runs in the import executor."""
+    for module in _RUNTIME_MODULES:
+        importlib.import_module(f"{__name__}.{module}")
 
-    def flush(self):
-        self.dev.flush()
 
-    def __del__(self):
-        try:
-            self.dev.close()
-        except Exception:
-            pass
+def _ms(seconds: float) -> int:
+    return round(seconds * 1000)
 
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up an OSDP controller and its readers from a config entry."""
-    data = entry.data
-    port: str = data[CONF_PORT]
-    baudrate: int = entry.options.get(CONF_BAUDRATE, data.get(CONF_BAUDRATE, DEFAULT_BAUDRATE))
-    name: str = data.get(CONF_CONTROLLER_NAME, f"OSDP Controller ({port})")
-
-    readers_cfg: List[int] = entry.options.get("readers", [])
-
-    # Controller-level callback
-    def _controller_callback(id: int, event: dict) -> int:
-        """Handle events from the OSDP ControlPanel and dispatch per reader."""
-        rid = event["reader_no"]
-
-        devreg = dr.async_get(hass)
-
-        dev = devreg.async_get_device({(DOMAIN, f"reader_{port}_{rid}")})
-
-        ctx = Context(user_id="80136773bd514db4a8b1631fd33194ad")
-
-        if event["event"] == osdp.Event.CardRead and dev is not None:
-            event_data = {
-                "tag_id": struct.unpack('>L', event["data"])[0],
-                "type": "tag_scanned",
-                "device_id": dev.id
-            }
-            hass.create_task(tag.async_scan_tag(hass, str(event_data["tag_id"]), event_data["device_id"], ctx))
-            hass.bus.fire("osdp_event", event_data, EventOrigin.local, ctx)
-
-        return 0
-
-    cp = None
-    if readers_cfg:
-        channel = SerialChannel(port, baudrate)
-        pd_infos = [osdp.PDInfo(rid, channel) for rid in readers_cfg]
-        cp = osdp.ControlPanel(pd_infos, osdp.LogLevel.Info, _controller_callback)
-        cp.start()
-
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
-        "cp": cp,
-        "readers": readers_cfg,
-        "port": port,
-        "baudrate": baudrate,
-        "name": name,
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Load libosdp, register the integration-wide services and open the read journal."""
+    started = time.monotonic()
+    await hass.async_add_import_executor_job(_import_runtime)
+    hass.data[DATA_IMPORT_TIME] = time.monotonic() - started
+
+    from .journal import async_setup_journal
+    from .services import async_setup_services
+
+    async_setup_services(hass)
+    await async_setup_journal(hass)
+    return True
+
+
+def _async_dispatch_factory(
+    hass: HomeAssistant,
+    entry_id: str,
+    port: str,
+    index: ReaderDeviceIndex,
+    card_tables: dict[int, Mapping[int, CardLayout]],
+    store: ReaderStateStore,
+) -> Callable[[list[dict]], None]:
+    """Build the loop-side handler that turns queued events into HA events."""
+    from .bus import EVENT_NOTIFICATION
+    from .journal import DATA_JOURNAL
+
+    ctx = index.context
+    journal = hass.data[DATA_JOURNAL]
+
+    def _card_fields(event: dict) -> dict:
+        data = event["data"]
+        card = decode_card(card_tables.get(event["pd"], AUTO_TABLE), data, event.get("length", 0))
+        return {
+            "tag_id": int.from_bytes(data, "big"),
+            "format": card.format,
+            "bits": card.bits,
+            "facility_code": card.facility_code,
+            "card_number": card.card_number,
+            "parity_valid": card.parity_valid,
+            "access": _ACCESS_RESULTS.get(event.get("access")),
+        }
+
+    @callback
+    def _async_dispatch(events: list[dict]) -> None:
+        for event in events:
+            if event["event"] == EVENT_NOTIFICATION:
+                domain_data = hass.data[DOMAIN].get(entry_id)
+                runtime = domain_data["buses"].get(port) if domain_data else None
+                if runtime:
+                    runtime["coordinator"].async_set_reader_online(event["pd"], event["online"])
+                continue
+
+            device_id = index.get(event["pd"])
+            if device_id is None:
+                continue
+
+            if event["event"] == KEYPAD_EVENT:
+                event_data = {"type": "pin_entered", "device_id": device_id, "pin": event["pin"]}
+                if event["card"] is not None:
+                    event_data.update(_card_fields(event["card"]), type="card_and_pin")
+                store.async_record_event(port, event["pd"], event_data["type"])
+                hass.bus.async_fire("osdp_event", event_data, EventOrigin.local, ctx)
+                continue
+
+            event_data = {"type": "tag_scanned", "device_id": device_id, **_card_fields(event)}
+            store.async_record_event(port, event["pd"], "tag_scanned")
+            journal.async_record(port, event["pd"], event_data["tag_id"], event_data)
+            hass.async_create_task(tag.async_scan_tag(hass, str(event_data["tag_id"]), event_data["device_id"], ctx))
+            hass.bus.async_fire("osdp_event", event_data, EventOrigin.local, ctx)
+
+    return _async_dispatch
+
+
+def _bus_configs(entry: ConfigEntry) -> dict[str, tuple[int, List[int], dict[str, str], dict[str, str]]]:
+    """Return port -> (baudrate, readers, card formats, door priorities) for every bus of the entry.
+
+    The bus the entry was created for keeps its settings at the top level of
+    data/options; buses added later in hub mode live under ``buses``.
+    """
+    port: str = entry.data[CONF_PORT]
+    baudrate: int = entry.options.get(CONF_BAUDRATE, entry.data.get(CONF_BAUDRATE, DEFAULT_BAUDRATE))
+    configs = {
+        port: (
+            baudrate,
+            list(entry.options.get("readers", [])),
+            entry.options.get(CONF_CARD_FORMATS, {}),
+            entry.options.get(CONF_PRIORITIES, {}),
+        )
     }
+    for bus_cfg in entry.options.get(CONF_BUSES, []):
+        configs[bus_cfg[CONF_PORT]] = (
+            bus_cfg.get(CONF_BAUDRATE, DEFAULT_BAUDRATE),
+            list(bus_cfg.get("readers", [])),
+            bus_cfg.get(CONF_CARD_FORMATS, {}),
+            bus_cfg.get(CONF_PRIORITIES, {}),
+        )
+    return configs
 
-    # Register controller device
+
+def _card_tables(readers: List[int], formats: dict[str, str]) -> dict[int, Mapping[int, CardLayout]]:
+    """Resolve each reader's configured card format to its layout table."""
+    return {rid: layout_table(formats.get(str(rid), FORMAT_AUTO)) for rid in readers}
+
+
+@callback
+def _async_register_devices(
+    hass: HomeAssistant, entry: ConfigEntry, port: str, name: str, readers: List[int]
+) -> None:
+    """Make sure the controller device of a bus and its reader devices exist."""
     devreg = async_get_devreg(hass)
     devreg.async_get_or_create(
         config_entry_id=entry.entry_id,
@@ -101,9 +192,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         name=name,
         model="OSDP Bus",
     )
-
-    # Register reader devices
-    for rid in readers_cfg:
+    for rid in readers:
         devreg.async_get_or_create(
             config_entry_id=entry.entry_id,
             identifiers={(DOMAIN, f"reader_{port}_{rid}")},
@@ -113,101 +202,292 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             via_device=(DOMAIN, f"controller_{port}"),
         )
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
-
-    _LOGGER.info("OSDP controller on %s @ %s set up with readers: %s", port, baudrate, readers_cfg)
-    return True
-
 
-async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Unload an OSDP config entry."""
-    unloaded = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
-    data = hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
-    if data and data["cp"]:
-        try:
-            data["cp"].stop()
-        except Exception as exc:
-            _LOGGER.warning("Error stopping ControlPanel: %s", exc)
-    return unloaded
+@callback
+def _async_remove_devices(hass: HomeAssistant, port: str, readers: List[int], controller: bool = False) -> None:
+    """Remove reader devices (and with them their entities) of a bus."""
+    devreg = dr.async_get(hass)
+    identifiers = [f"reader_{port}_{rid}" for rid in readers]
+    if controller:
+        identifiers.append(f"controller_{port}")
+    for ident in identifiers:
+        dev = devreg.async_get_device({(DOMAIN, ident)})
+        if dev:
+            devreg.async_remove_device(dev.id)
+            _LOGGER.info("Removed OSDP device %s", ident)
 
 
 @callback
-async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Rebuild the ControlPanel when options (readers list or baudrate) change."""
-    domain_data = hass.data[DOMAIN].get(entry.entry_id)
-    if not domain_data:
-        return
+def _async_create_bus(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    port: str,
+    baudrate: int,
+    readers: List[int],
+    formats: dict[str, str],
+    priorities: dict[str, str],
+) -> dict:
+    """Build one bus with its own ControlPanel, event bridge and coordinator.
+
+    Nothing is opened yet: the bus stays initializing until _async_open_bus
+    has started it in the executor, so its entities can be added first.
+    """
+    from .bus import STATUS_PUSH_SUPPORTED, OSDPBus
+    from .coordinator import OSDPCoordinator
+    from .file_transfer import FileTransferManager
+
+    domain_data = hass.data[DOMAIN][entry.entry_id]
+    store: ReaderStateStore = domain_data["readers"]
+    primary = port == entry.data[CONF_PORT]
+    name: str = entry.data.get(CONF_CONTROLLER_NAME, f"OSDP Controller ({entry.data[CONF_PORT]})")
+    bus_name = name if primary else f"{name} ({port})"
+
+    index = ReaderDeviceIndex(hass, port)
+    card_tables = _card_tables(readers, formats)
+    bridge = EventBridge(
+        hass.loop,
+        _async_dispatch_factory(hass, entry.entry_id, port, index, card_tables, store),
+        entry.options.get(CONF_QUEUE_SIZE, DEFAULT_QUEUE_SIZE),
+        entry.options.get(CONF_OVERFLOW_POLICY, DEFAULT_OVERFLOW_POLICY),
+    )
+    bus = OSDPBus(
+        port,
+        baudrate,
+        readers,
+        bridge,
+        domain_data["access"],
+        entry.options.get(CONF_DEDUP_WINDOW, DEFAULT_DEDUP_WINDOW),
+        entry.options.get(CONF_PROFILE, False),
+        KeypadAssembler(
+            entry.options.get(CONF_KEYPAD_TIMEOUT, DEFAULT_KEYPAD_TIMEOUT),
+            entry.options.get(CONF_PIN_MAX_LENGTH, DEFAULT_PIN_MAX_LENGTH),
+            CARD_PIN_WINDOW,
+        ),
+        entry.options.get(CONF_WORKER, False),
+        entry.options.get(CONF_ADAPTIVE, DEFAULT_ADAPTIVE),
+        priorities,
+    )
 
-    old_cp: osdp.ControlPanel | None = domain_data["cp"]
-    port: str = domain_data["port"]
-    baudrate: int = entry.options.get(CONF_BAUDRATE, domain_data["baudrate"])
-    name: str = domain_data["name"]
+    _async_register_devices(hass, entry, port, bus_name, readers)
+    index.async_rebuild(readers)
+
+    # Entities of the original bus keep their pre-hub unique ids
+    unique_base = entry.entry_id if primary else f"{entry.entry_id}_{port}"
+    coordinator = OSDPCoordinator(hass, entry, bus, bus_name, unique_base, push=STATUS_PUSH_SUPPORTED)
+
+    return {
+        "bus": bus,
+        "name": bus_name,
+        "bridge": bridge,
+        "index": index,
+        "coordinator": coordinator,
+        "card_tables": card_tables,
+        "transfers": FileTransferManager(hass, bus, index),
+        "unsub_index": index.async_listen(),
+        "unsub_store": store.async_add_bus(port, bus_name, coordinator, readers),
+    }
 
-    old_readers_cfg: List[int] = domain_data["readers"]
-    new_readers_cfg: List[int] = entry.options.get("readers", [])
 
-    # Stop old CP
-    if old_cp:
-        try:
-            old_cp.stop()
-        except Exception as exc:
-            _LOGGER.debug("Stopping previous ControlPanel failed: %s", exc)
+async def _async_open_bus(hass: HomeAssistant, runtime: dict) -> dict[str, int]:
+    """Open the channel and start the panel of a bus, then poll its readers once.
+
+    Returns the time each phase took in milliseconds. A bus that fails to
+    open is logged and left failed; it does not hold up the other buses.
+    """
+    bus = runtime["bus"]
+    coordinator = runtime["coordinator"]
+    timing: dict[str, int] = {}
+
+    phase = time.monotonic()
+    try:
+        await hass.async_add_executor_job(bus.start)
+    except Exception as exc:
+        _LOGGER.error("Could not open OSDP bus %s: %s", bus.port, exc)
+        coordinator.async_update_listeners()
+        return timing
+    timing["open_ms"] = _ms(time.monotonic() - phase)
+
+    phase = time.monotonic()
+    await coordinator.async_refresh()
+    timing["first_refresh_ms"] = _ms(time.monotonic() - phase)
+
+    _LOGGER.info("OSDP bus on %s @ %s set up with readers: %s", bus.port, bus.baudrate, bus.readers)
+    return timing
+
+
+async def _async_open_buses(hass: HomeAssistant, domain_data: dict, started: float) -> None:
+    """Open all buses of an entry concurrently and report how long startup took."""
+    startup = domain_data["startup"]
+    buses = domain_data["buses"]
+    timings = await asyncio.gather(*(_async_open_bus(hass, runtime) for runtime in buses.values()))
+    startup["buses"] = dict(zip(buses, timings))
+    startup["ready_ms"] = _ms(time.monotonic() - started)
+    _LOGGER.info(
+        "OSDP controller %s ready in %d ms, %d of %d buses running: %s",
+        domain_data["name"],
+        startup["ready_ms"],
+        sum(1 for runtime in buses.values() if runtime["bus"].state == BUS_RUNNING),
+        len(buses),
+        startup,
+    )
 
-    # Controller-level callback
-    def _controller_callback(id: int, event: dict) -> int:
-        """Handle events from the OSDP ControlPanel and dispatch per reader."""
-        rid = event["reader_no"]
 
-        devreg = dr.async_get(hass)
+async def _async_stop_bus(hass: HomeAssistant, runtime: dict) -> None:
+    """Stop a bus built by _async_create_bus."""
+    runtime["unsub_index"]()
+    runtime["unsub_store"]()
+    runtime["transfers"].async_stop()
+    runtime["bridge"].close()
+    await runtime["coordinator"].async_shutdown()
+    await hass.async_add_executor_job(runtime["bus"].stop)
+    # libosdp no longer reads the files
+    runtime["transfers"].async_release()
 
-        dev = devreg.async_get_device({(DOMAIN, f"reader_{port}_{rid}")})
 
-        ctx = Context(user_id="80136773bd514db4a8b1631fd33194ad")
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up an OSDP controller, its buses and their readers from a config entry.
+
+    Setup returns once the entities exist. The buses are opened afterwards,
+    all at once, in a background task, so a slow port or converter delays
+    neither Home Assistant's startup nor the other entries.
+    """
+    from .services import async_load_access_list
+
+    started = time.monotonic()
+    startup: dict[str, Any] = {"import_ms": _ms(hass.data.get(DATA_IMPORT_TIME, 0.0))}
+    domain_data = hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+        "name": entry.data.get(CONF_CONTROLLER_NAME, f"OSDP Controller ({entry.data[CONF_PORT]})"),
+        "buses": {},
+        # Platform callbacks creating entities for buses/readers added later
+        "reader_entity_adders": [],
+        "access": AccessList(),
+        # Milliseconds spent in each setup phase, for the log and diagnostics
+        "startup": startup,
+    }
+    phase = time.monotonic()
+    await async_load_access_list(hass, entry)
+    startup["access_list_ms"] = _ms(time.monotonic() - phase)
+
+    # PD IDs are rendered once, by the store, with vendor names resolved
+    phase = time.monotonic()
+    domain_data["readers"] = ReaderStateStore(await async_get_vendor_index(hass))
+    startup["vendor_index_ms"] = _ms(time.monotonic() - phase)
+
+    # Each bus has its own ControlPanel (and refresh thread), so a slow bus
+    # cannot hold up the others
+    for port, (baudrate, readers, formats, priorities) in _bus_configs(entry).items():
+        domain_data["buses"][port] = _async_create_bus(
+            hass, entry, port, baudrate, readers, formats, priorities
+        )
 
-        if event["event"] == osdp.Event.CardRead and dev is not None:
-            event_data = {
-                "tag_id": struct.unpack('>L', event["data"])[0],
-                "type": "tag_scanned",
-                "device_id": dev.id
-            }
-            hass.create_task(tag.async_scan_tag(hass, str(event_data["tag_id"]), event_data["device_id"], ctx))
-            hass.bus.fire("osdp_event", event_data, EventOrigin.local, ctx)
+    phase = time.monotonic()
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    startup["platforms_ms"] = _ms(time.monotonic() - phase)
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
 
-        return 0
+    domain_data["opening"] = entry.async_create_background_task(
+        hass, _async_open_buses(hass, domain_data, started), f"OSDP open buses {entry.title}"
+    )
+    return True
 
-    new_cp = None
-    if new_readers_cfg:
-        channel = SerialChannel(port, baudrate)
-        pd_infos = [osdp.PDInfo(rid, channel) for rid in new_readers_cfg]
-        new_cp = osdp.ControlPanel(pd_infos, osdp.LogLevel.Info, _controller_callback)
-        new_cp.start()
 
-    # Save new CP and readers
-    domain_data["cp"] = new_cp
-    domain_data["readers"] = new_readers_cfg
-    domain_data["baudrate"] = baudrate
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Unload an OSDP config entry."""
+    unloaded = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    data = hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+    if data:
+        # A bus still opening in the executor can only be stopped once it is up
+        await data["opening"]
+        for runtime in data["buses"].values():
+            await _async_stop_bus(hass, runtime)
+    return unloaded
 
-    devreg = dr.async_get(hass)
 
-    # Remove devices for readers no longer present
-    removed_ids = set(old_readers_cfg) - set(new_readers_cfg)
-    for rid in removed_ids:
-        dev = devreg.async_get_device({(DOMAIN, f"reader_{port}_{rid}")})
-        if dev:
-            devreg.async_remove_device(dev.id)
-            _LOGGER.info("Removed OSDP Reader %s (port %s)", rid, port)
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running buses without reloading the entry."""
+    domain_data = hass.data[DOMAIN].get(entry.entry_id)
+    if not domain_data:
+        return
 
-    # Ensure devices exist for new readers
-    for rid in new_readers_cfg:
-        devreg.async_get_or_create(
-            config_entry_id=entry.entry_id,
-            identifiers={(DOMAIN, f"reader_{port}_{rid}")},
-            manufacturer="OSDP",
-            name=f"OSDP Reader {rid}",
-            model="Card Reader",
-            via_device=(DOMAIN, f"controller_{port}"),
+    from .services import async_load_access_list
+
+    # Changes are applied to opened buses only
+    await domain_data["opening"]
+
+    buses: dict[str, dict] = domain_data["buses"]
+    configs = _bus_configs(entry)
+
+    if entry.options.get(CONF_ACCESS_FILE) != domain_data["access_file"]:
+        await async_load_access_list(hass, entry)
+
+    # Buses removed from the hub
+    for port in [port for port in buses if port not in configs]:
+        runtime = buses.pop(port)
+        await _async_stop_bus(hass, runtime)
+        domain_data["readers"].async_remove_bus(port)
+        _async_remove_devices(hass, port, runtime["bus"].readers, controller=True)
+
+    for port, (baudrate, new_readers_cfg, formats, priorities) in configs.items():
+        runtime = buses.get(port)
+        if runtime is None:
+            # Bus added to the hub
+            runtime = buses[port] = _async_create_bus(
+                hass, entry, port, baudrate, new_readers_cfg, formats, priorities
+            )
+            for add_reader_entities in domain_data["reader_entity_adders"]:
+                add_reader_entities(port, new_readers_cfg)
+            domain_data["startup"].setdefault("buses", {})[port] = await _async_open_bus(hass, runtime)
+            continue
+
+        bus = runtime["bus"]
+        # Swapped in place: the dispatcher holds a reference to this dict
+        card_tables = runtime["card_tables"]
+        card_tables.clear()
+        card_tables.update(_card_tables(new_readers_cfg, formats))
+        runtime["bridge"].configure(
+            entry.options.get(CONF_QUEUE_SIZE, DEFAULT_QUEUE_SIZE),
+            entry.options.get(CONF_OVERFLOW_POLICY, DEFAULT_OVERFLOW_POLICY),
+        )
+        bus.dedup.configure(entry.options.get(CONF_DEDUP_WINDOW, DEFAULT_DEDUP_WINDOW))
+        bus.metrics.profiling = entry.options.get(CONF_PROFILE, False)
+        bus.keypad.configure(
+            entry.options.get(CONF_KEYPAD_TIMEOUT, DEFAULT_KEYPAD_TIMEOUT),
+            entry.options.get(CONF_PIN_MAX_LENGTH, DEFAULT_PIN_MAX_LENGTH),
+        )
+        await hass.async_add_executor_job(
+            bus.configure_scheduling, priorities, entry.options.get(CONF_ADAPTIVE, DEFAULT_ADAPTIVE)
+        )
+        worker = entry.options.get(CONF_WORKER, False)
+        if worker != bus.worker:
+            await hass.async_add_executor_job(bus.set_worker, worker)
+            _LOGGER.info("OSDP bus %s now runs %s", port, "in a worker process" if worker else "in process")
+        old_readers_cfg: List[int] = list(bus.readers)
+        if new_readers_cfg == old_readers_cfg and baudrate == bus.baudrate:
+            continue
+
+        gap = await hass.async_add_executor_job(bus.reconfigure, new_readers_cfg, baudrate)
+        _LOGGER.info(
+            "Reconfigured OSDP bus %s @ %s, readers %s, polling paused for %.0f ms",
+            port,
+            baudrate,
+            new_readers_cfg,
+            gap * 1000,
         )
 
-    # Reload entry so entities are recreated/removed accordingly
-    await hass.config_entries.async_reload(entry.entry_id)
\ No newline at end of file
+        removed_ids = [rid for rid in old_readers_cfg if rid not in new_readers_cfg]
+        added_ids = [rid for rid in new_readers_cfg if rid not in old_readers_cfg]
+        _async_remove_devices(hass, port, removed_ids)
+        _async_register_devices(hass, entry, port, runtime["name"], added_ids)
+        runtime["index"].async_rebuild(new_readers_cfg)
+        domain_data["readers"].async_set_readers(port, new_readers_cfg)
+
+        if added_ids:
+            for add_reader_entities in domain_data["reader_entity_adders"]:
+                add_reader_entities(port, added_ids)
+        if added_ids or removed_ids:
+            await runtime["coordinator"].async_request_refresh()
+
+    # Saving the options retries buses that could not be opened
+    for port, runtime in buses.items():
+        if runtime["bus"].state == BUS_FAILED:
+            domain_data["startup"].setdefault("buses", {})[port] = await _async_open_bus(hass, runtime)
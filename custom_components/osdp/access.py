@@ -0,0 +1,91 @@
+"""Local allow-list deciding reader feedback without a round trip through HA."""
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+import json
+from typing import Any
+
+ReaderKey = tuple[str, int]
+
+
+def _tag_set(tags: Iterable[Any]) -> frozenset[int]:
+    return frozenset(int(tag) for tag in tags)
+
+
+class AccessList:
+    """Allowed tag ids per reader, checked from libosdp's refresh thread.
+
+    Lists are kept as a default set plus per-reader sets (merged with the
+    default when published). The merged table is rebuilt off the hot path
+    and swapped in with a single reference assignment, so a check never
+    sees a half-updated list and never takes a lock. Until a list is loaded
+    no decision is made and readers get no local feedback.
+    """
+
+    def __init__(self) -> None:
+        self._default: frozenset[int] = frozenset()
+        self._readers: dict[ReaderKey, frozenset[int]] = {}
+        # (default, {reader: default | reader tags}) or None while inactive
+        self._table: tuple[frozenset[int], dict[ReaderKey, frozenset[int]]] | None = None
+
+    @property
+    def active(self) -> bool:
+        return self._table is not None
+
+    def check(self, port: str, address: int, tag_id: int) -> bool | None:
+        """Return whether a tag is allowed on a reader, None if inactive."""
+        table = self._table
+        if table is None:
+            return None
+        default, readers = table
+        return tag_id in readers.get((port, address), default)
+
+    def replace(self, default: Iterable[Any], readers: Mapping[ReaderKey, Iterable[Any]]) -> None:
+        """Replace every list at once."""
+        self._default = _tag_set(default)
+        self._readers = {key: _tag_set(tags) for key, tags in readers.items()}
+        self._publish()
+
+    def set_tags(self, keys: Iterable[ReaderKey] | None, tags: Iterable[Any]) -> None:
+        """Set the list of some readers, or the default list when ``keys`` is None."""
+        tag_set = _tag_set(tags)
+        if keys is None:
+            self._default = tag_set
+        else:
+            readers = dict(self._readers)
+            for key in keys:
+                readers[key] = tag_set
+            self._readers = readers
+        self._publish()
+
+    def clear(self) -> None:
+        """Stop making local decisions."""
+        self._default = frozenset()
+        self._readers = {}
+        self._table = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "active": self.active,
+            "default_tags": len(self._default),
+            "reader_lists": len(self._readers),
+        }
+
+    def _publish(self) -> None:
+        default = self._default
+        self._table = (default, {key: tags | default for key, tags in self._readers.items()})
+
+
+def load_access_file(path: str) -> tuple[list[Any], dict[ReaderKey, list[Any]]]:
+    """Read an access list file; blocking, run in the executor.
+
+    The file is JSON: ``{"default": [tags...], "readers": {port: {address:
+    [tags...]}}}``. Tags are card values as reported in ``tag_id``.
+    """
+    with open(path, encoding="utf-8") as fh:
+        raw = json.load(fh)
+    readers: dict[ReaderKey, list[Any]] = {}
+    for port, addresses in raw.get("readers", {}).items():
+        for address, tags in addresses.items():
+            readers[(port, int(address))] = list(tags)
+    return list(raw.get("default", [])), readers
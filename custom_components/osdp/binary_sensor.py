@@ -1,61 +1,51 @@
 from __future__ import annotations
 
-import logging
+from typing import Any
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.core import HomeAssistant, callback
 
 from .const import DOMAIN
-
-_LOGGER = logging.getLogger(__name__)
+from .entity import OSDPReaderEntity
+from .reader_state import FIELD_ONLINE, ReaderState, ReaderStateStore
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
     """Set up OSDP binary sensors for each reader."""
     domain_data = hass.data[DOMAIN][entry.entry_id]
-    readers = domain_data["readers"]  # list of ints
-    port = domain_data["port"]
+    store: ReaderStateStore = domain_data["readers"]
+
+    @callback
+    def _async_add_readers(port: str, rids: list[int]) -> None:
+        unique_base = domain_data["buses"][port]["coordinator"].unique_base
+        states = store.readers[port]
+        async_add_entities([OSDPReaderOnlineBinarySensor(store, states[rid], unique_base) for rid in rids])
 
-    entities = [OSDPReaderOnlineBinarySensor(entry.entry_id, port, rid) for rid in readers]
-    async_add_entities(entities)
+    for port, runtime in domain_data["buses"].items():
+        _async_add_readers(port, runtime["bus"].readers)
+    domain_data["reader_entity_adders"].append(_async_add_readers)
 
 
-class OSDPReaderOnlineBinarySensor(BinarySensorEntity):
+class OSDPReaderOnlineBinarySensor(OSDPReaderEntity, BinarySensorEntity):
     """Binary sensor indicating if the reader is online."""
 
     _attr_has_entity_name = True
     _attr_name = "Online"
 
-    def __init__(self, entry_id: str, port: str, reader_id: int) -> None:
-        self._entry_id = entry_id
-        self._port = port
-        self._reader_id = reader_id
-        self._attr_unique_id = f"osdp_online_{entry_id}_{reader_id}"
-        self._is_on: bool = False
+    def __init__(self, store: ReaderStateStore, reader: ReaderState, unique_base: str) -> None:
+        super().__init__(store, reader, FIELD_ONLINE)
+        self._attr_unique_id = f"osdp_online_{unique_base}_{reader.address}"
 
     @property
-    def device_info(self) -> DeviceInfo:
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"reader_{self._port}_{self._reader_id}")},
-            name=f"OSDP Reader {self._reader_id}",
-            manufacturer="OSDP",
-            model="Card Reader",
-            via_device=(DOMAIN, f"controller_{self._port}"),
-        )
+    def is_on(self) -> bool | None:
+        # Unknown until the bus has opened and the reader was polled once
+        return self._reader.online
 
     @property
-    def is_on(self) -> bool:
-        return self._is_on
-
-    async def async_update(self) -> None:
-        """Poll ControlPanel for online status."""
-        domain_data = self.hass.data[DOMAIN].get(self._entry_id)
-        cp = domain_data.get("cp") if domain_data else None
-        if cp:
-            try:
-                self._is_on = cp.is_online(self._reader_id)
-            except Exception as exc:
-                _LOGGER.debug("is_online failed for reader %s: %s", self._reader_id, exc)
-                self._is_on = False
+    def extra_state_attributes(self) -> dict[str, Any]:
+        reader = self._reader
+        return {
+            "last_online": reader.last_online.isoformat() if reader.last_online else None,
+            "last_offline": reader.last_offline.isoformat() if reader.last_offline else None,
+        }
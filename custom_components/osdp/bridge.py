@@ -0,0 +1,136 @@
+"""Hand-off of libosdp events from the refresh thread to the event loop."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable
+import logging
+import time
+from typing import Any
+
+from .const import BRIDGE_BATCH_SIZE, OVERFLOW_DROP_NEWEST
+from .metrics import Histogram
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EventBridge:
+    """Bounded queue fed from a foreign thread and drained on the loop in batches.
+
+    ``submit`` runs on libosdp's refresh thread. It only appends to a deque
+    (atomic under the GIL, no lock taken) and schedules a drain with a single
+    ``call_soon_threadsafe`` when none is pending, so a burst of reads costs
+    one loop wakeup per batch instead of one per event.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        handler: Callable[[list[Any]], None],
+        maxlen: int,
+        overflow: str,
+        batch_size: int = BRIDGE_BATCH_SIZE,
+    ) -> None:
+        self._loop = loop
+        self._handler = handler
+        self._queue: deque[Any] = deque()
+        self._maxlen = maxlen
+        self._overflow = overflow
+        self._batch_size = batch_size
+        self._scheduled = False
+        self._closed = False
+
+        # Counters; written by the single producer thread or the loop only
+        self.submitted = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.batches = 0
+        # Time from scheduling a drain on the refresh thread to running it
+        self.latency = Histogram()
+        self._scheduled_at = 0.0
+
+    @property
+    def depth(self) -> int:
+        """Number of events waiting to be drained."""
+        return len(self._queue)
+
+    def configure(self, maxlen: int, overflow: str) -> None:
+        """Change queue bound and overflow policy in place."""
+        self._maxlen = maxlen
+        self._overflow = overflow
+
+    def submit(self, item: Any) -> bool:
+        """Queue an item from any thread. Returns False if it was dropped."""
+        if self._closed:
+            return False
+        queue = self._queue
+        if len(queue) >= self._maxlen:
+            self.dropped += 1
+            if self._overflow == OVERFLOW_DROP_NEWEST:
+                return False
+            try:
+                queue.popleft()
+            except IndexError:
+                pass
+        queue.append(item)
+        self.submitted += 1
+        depth = len(queue)
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if not self._scheduled:
+            self._scheduled = True
+            self._scheduled_at = time.perf_counter()
+            try:
+                self._loop.call_soon_threadsafe(self._drain)
+            except RuntimeError:
+                # Loop already closed (shutdown); nothing left to deliver to
+                self._closed = True
+        return True
+
+    def close(self) -> None:
+        """Stop accepting items and discard anything still queued."""
+        self._closed = True
+        self._queue.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Counters for diagnostics and state attributes."""
+        return {
+            "queue_depth": len(self._queue),
+            "queue_max_depth": self.max_depth,
+            "queue_size": self._maxlen,
+            "overflow_policy": self._overflow,
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "loop_latency_p95_ms": self.latency.as_dict()["p95_ms"],
+        }
+
+    def _drain(self) -> None:
+        """Deliver up to one batch to the handler; runs on the event loop."""
+        # Clear the flag before popping so an item appended while we drain
+        # either gets picked up below or schedules a fresh drain.
+        self._scheduled = False
+        if self._closed:
+            return
+        if self._scheduled_at:
+            self.latency.record(time.perf_counter() - self._scheduled_at)
+            self._scheduled_at = 0.0
+        queue = self._queue
+        batch: list[Any] = []
+        for _ in range(self._batch_size):
+            try:
+                batch.append(queue.popleft())
+            except IndexError:
+                break
+        if not batch:
+            return
+        self.batches += 1
+        if queue and not self._scheduled:
+            # Yield to the loop between batches instead of draining a
+            # backlog in one go
+            self._scheduled = True
+            self._loop.call_soon(self._drain)
+        try:
+            self._handler(batch)
+        except Exception:  # noqa: BLE001
+            _LOGGER.exception("Error dispatching OSDP events")
@@ -0,0 +1,355 @@
+"""One OSDP bus: the channel to the readers and the ControlPanel polling it."""
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+import logging
+import time
+from typing import List
+
+import osdp
+
+from .access import AccessList
+from .bridge import EventBridge
+from .channel import create_channel
+from .commands import LANE_ACCESS, CommandQueue, buzzer_command, led_command
+from .const import BUS_FAILED, BUS_INITIALIZING, BUS_RUNNING, BUS_STOPPED, TCP_SCHEME
+from .dedup import ReadDeduplicator
+from .discovery import DiscoveredPD, scan_bus
+from .keypad import KeypadAssembler
+from .metrics import PROFILE_SAMPLE_EVERY, BusMetrics
+from .scheduler import PollScheduler
+from .worker import RemoteControlPanel
+
+_LOGGER = logging.getLogger(__name__)
+
+# PD status notifications are optional in libosdp builds; without them
+# reader online state falls back to polling only.
+EVENT_NOTIFICATION = getattr(osdp.Event, "Notification", None)
+_NOTIFICATION_PD_STATUS = getattr(
+    getattr(osdp, "EventNotification", None), "PeripheralDeviceStatus", None
+)
+_FLAG_NOTIFICATION = getattr(getattr(osdp, "Flag", None), "EnableNotification", None)
+STATUS_PUSH_SUPPORTED = None not in (
+    EVENT_NOTIFICATION,
+    _NOTIFICATION_PD_STATUS,
+    _FLAG_NOTIFICATION,
+)
+# Reader changes in place and adaptive polling both need these. Asked of
+# the class: a worker proxy always has the methods.
+PD_TOGGLE_SUPPORTED = hasattr(osdp.ControlPanel, "disable_pd") and hasattr(osdp.ControlPanel, "enable_pd")
+
+
+# Access feedback: a two-second LED flash and one (granted) or three
+# (denied) beeps, prebuilt so the callback only has to queue them.
+_GRANTED_FEEDBACK = (led_command("green", on_time=2000, duration=2), buzzer_command(count=1))
+_DENIED_FEEDBACK = (led_command("red", on_time=2000, duration=2), buzzer_command(count=3))
+
+
+class OSDPBus:
+    """A channel (serial or TCP) and the ControlPanel polling the readers on it.
+
+    The channel is opened once and survives reconfiguration. Reader changes
+    are applied in place when libosdp can enable/disable PDs; otherwise the
+    panel is rebuilt once on the same channel. With ``worker`` set, channel
+    and panel live in a worker process instead and ``cp`` is its proxy.
+    All methods block and are meant for the executor.
+    """
+
+    def __init__(
+        self,
+        port: str,
+        baudrate: int,
+        readers: List[int],
+        bridge: EventBridge,
+        access: AccessList | None = None,
+        dedup_window: float = 0.0,
+        profiling: bool = False,
+        keypad: KeypadAssembler | None = None,
+        worker: bool = False,
+        adaptive: bool = False,
+        priorities: Mapping[str, str] | None = None,
+    ) -> None:
+        self.port = port
+        self.baudrate = baudrate
+        self.readers: List[int] = list(readers)
+        self.bridge = bridge
+        self.access = access
+        self.cp: osdp.ControlPanel | None = None
+        self.last_reconfigure_gap: float | None = None
+        self._channel: osdp.Channel | None = None
+        # Addresses the running panel was built with, and those switched off
+        self._pd_addresses: List[int] = []
+        self._disabled: set[int] = set()
+        self.commands = CommandQueue(port, lambda: self.cp, baudrate)
+        self.dedup = ReadDeduplicator(dedup_window)
+        self.metrics = BusMetrics()
+        self.metrics.profiling = profiling
+        self.keypad = keypad
+        # Run the channel and ControlPanel in a worker process
+        self.worker = worker
+        # Restarts of the workers this bus has already stopped
+        self._worker_restarts = 0
+        self.scheduler = PollScheduler(
+            port, lambda: self.cp, lambda: self.readers, priorities, adaptive and PD_TOGGLE_SUPPORTED
+        )
+        self.state = BUS_INITIALIZING
+
+    def start(self) -> None:
+        """Open the channel and start polling the configured readers."""
+        try:
+            if self.readers:
+                self._start_panel()
+        except Exception:
+            self.state = BUS_FAILED
+            self._close_channel()
+            raise
+        self.commands.start()
+        self.scheduler.start()
+        self.state = BUS_RUNNING
+
+    def stop(self) -> None:
+        """Stop polling and release the channel."""
+        self.scheduler.stop()
+        self.commands.stop()
+        self._stop_panel()
+        self._close_channel()
+        self.state = BUS_STOPPED
+
+    def _close_channel(self) -> None:
+        if self._channel is not None:
+            try:
+                self._channel.close()
+            except Exception as exc:
+                _LOGGER.debug("Closing channel %s failed: %s", self.port, exc)
+            self._channel = None
+
+    def reconfigure(self, readers: List[int], baudrate: int) -> float:
+        """Apply a new reader list and speed, touching only what changed.
+
+        Returns the time in seconds the bus was not being polled, which is
+        what the readers that did not change experience.
+        """
+        readers = list(readers)
+        if baudrate != self.baudrate:
+            self.baudrate = baudrate
+            self.commands.set_baudrate(baudrate)
+            if self._channel is not None:
+                self._channel.set_speed(baudrate)
+            elif self.worker and self.cp is not None:
+                self.cp.set_speed(baudrate)
+
+        gap = 0.0
+        # Before self.readers changes, or nothing is ever forgotten
+        removed = set(self.readers) - set(readers)
+        if readers != self.readers and self.state != BUS_RUNNING:
+            # Not open (yet): the readers are polled once the bus is started
+            self.readers = readers
+        elif readers != self.readers:
+            with self.scheduler.paused():
+                if not self._toggle_pds(readers):
+                    # libosdp cannot hot-add PDs: rebuild once, channel stays open
+                    started = time.monotonic()
+                    self._stop_panel()
+                    self.readers = readers
+                    if readers:
+                        self._start_panel()
+                    gap = time.monotonic() - started
+                self.readers = readers
+        self.metrics.forget(removed)
+
+        self.last_reconfigure_gap = gap
+        return gap
+
+    def discover(
+        self, baudrates: List[int], progress: Callable[[float], None] | None = None
+    ) -> list[DiscoveredPD]:
+        """Probe the bus for PDs, pausing polling for the duration.
+
+        The scan runs on the bus's own channel; afterwards the line speed
+        and the configured readers are restored as they were.
+        """
+        with self.scheduler.paused():
+            self._stop_panel()
+            try:
+                if self._channel is None:
+                    self._channel = create_channel(self.port, self.baudrate, self.metrics)
+                if self.port.startswith(TCP_SCHEME):
+                    # The converter sets the line speed, not us
+                    baudrates = [self.baudrate]
+                # Probes of empty addresses are not reader timeouts
+                self._channel.metrics = None
+                return scan_bus(self._channel, baudrates, progress=progress)
+            finally:
+                if self._channel is not None:
+                    self._channel.metrics = self.metrics
+                    self._channel.set_speed(self.baudrate)
+                    if self.worker:
+                        # The worker opens the port itself
+                        self._close_channel()
+                if self.readers and self.state == BUS_RUNNING:
+                    self._start_panel()
+
+    def set_worker(self, enabled: bool) -> None:
+        """Move the channel and ControlPanel into or out of a worker process."""
+        if enabled == self.worker:
+            return
+        with self.scheduler.paused():
+            self._stop_panel()
+            self._close_channel()
+            self.worker = enabled
+            if self.readers and self.state == BUS_RUNNING:
+                self._start_panel()
+
+    @property
+    def worker_restarts(self) -> int:
+        """How often a worker process died and was restarted on this bus."""
+        cp = self.cp
+        if isinstance(cp, RemoteControlPanel):
+            return self._worker_restarts + cp.restarts
+        return self._worker_restarts
+
+    def configure_scheduling(self, priorities: Mapping[str, str] | None, adaptive: bool) -> None:
+        """Apply door priorities and switch adaptive polling on or off."""
+        self.scheduler.configure(priorities, adaptive and PD_TOGGLE_SUPPORTED)
+
+    def sync_metrics(self) -> None:
+        """Fetch the wire metrics from the worker now, instead of waiting for the next push."""
+        if self.worker and self.cp is not None:
+            self._load_worker_metrics(self.cp.metrics())
+
+    def _load_worker_metrics(self, state: dict) -> None:
+        self.metrics.load_wire_state(state, self.readers)
+
+    def _toggle_pds(self, readers: List[int]) -> bool:
+        """Enable/disable PDs of the running panel; False if a rebuild is needed."""
+        cp = self.cp
+        wanted = set(readers)
+        if (
+            cp is None
+            or not wanted
+            or not wanted.issubset(self._pd_addresses)
+            or not PD_TOGGLE_SUPPORTED
+        ):
+            return False
+        for rid in self._pd_addresses:
+            # libosdp refuses while an earlier request for the PD is pending;
+            # the rebuild then applies the list instead
+            if rid in wanted and rid in self._disabled:
+                if not cp.enable_pd(rid):
+                    return False
+                self._disabled.discard(rid)
+            elif rid not in wanted and rid not in self._disabled:
+                if not cp.disable_pd(rid):
+                    return False
+                self._disabled.add(rid)
+        return True
+
+    def _start_panel(self) -> None:
+        bridge = self.bridge
+        access = self.access
+        dedup = self.dedup
+        metrics = self.metrics
+        keypad = self.keypad
+        scheduler = self.scheduler
+        port = self.port
+        # libosdp numbers PDs by their position in the PDInfo list; disabling
+        # them in place keeps that list, so this mapping holds for the panel
+        addresses = list(self.readers)
+
+        # Controller-level callback; runs on libosdp's refresh thread (or the
+        # worker's supervisor thread), so it only hands the event over and
+        # returns. Takes the PD address; the worker maps indexes itself.
+        def _controller_callback(address: int, event: dict) -> int:
+            metrics.callbacks += 1
+            if metrics.profiling and metrics.callbacks % PROFILE_SAMPLE_EVERY == 0:
+                started = time.perf_counter()
+                _handle_event(address, event)
+                metrics.callback_time.record(time.perf_counter() - started)
+            else:
+                _handle_event(address, event)
+            return 0
+
+        def _panel_callback(pd: int, event: dict) -> int:
+            # libosdp passes the PD's index, not its address
+            try:
+                address = addresses[pd]
+            except IndexError:
+                _LOGGER.debug("Event from unknown PD index %s on %s", pd, port)
+                return 0
+            return _controller_callback(address, event)
+
+        def _handle_event(address: int, event: dict) -> None:
+            kind = event["event"]
+            if kind == osdp.Event.CardRead:
+                event["pd"] = address
+                metrics.reader(address).events += 1
+                scheduler.note_activity(address)
+                if access is not None:
+                    # Reader feedback goes out before HA hears about the read
+                    granted = access.check(port, address, int.from_bytes(event["data"], "big"))
+                    if granted is not None:
+                        event["access"] = granted
+                        self._send_feedback(address, granted)
+                if keypad is not None:
+                    keypad.on_card(address, event)
+                # The reader still gets feedback; HA only hears about new reads
+                if not dedup.is_duplicate(address, event["data"]):
+                    bridge.submit(event)
+            elif kind == osdp.Event.KeyPress:
+                scheduler.note_activity(address)
+                # Keys are buffered here; HA only hears about complete entries
+                if keypad is not None:
+                    for entry in keypad.on_keys(address, event["data"]):
+                        metrics.reader(address).events += 1
+                        bridge.submit(entry)
+            elif kind == EVENT_NOTIFICATION and event.get("type") == _NOTIFICATION_PD_STATUS:
+                if address in scheduler.masked:
+                    # Parked for being idle, not offline
+                    return
+                bridge.submit({"event": kind, "pd": address, "online": bool(event.get("arg0"))})
+
+        if self.worker:
+            cp = RemoteControlPanel(
+                self.port,
+                self.baudrate,
+                addresses,
+                STATUS_PUSH_SUPPORTED,
+                _controller_callback,
+                self._load_worker_metrics,
+            )
+            cp.start()
+            self.cp = cp
+            self._pd_addresses = addresses
+            self._disabled = set()
+            return
+
+        if self._channel is None:
+            self._channel = create_channel(self.port, self.baudrate, self.metrics)
+        channel = self._channel
+        if STATUS_PUSH_SUPPORTED:
+            pd_infos = [osdp.PDInfo(rid, channel, flags=[_FLAG_NOTIFICATION]) for rid in addresses]
+        else:
+            pd_infos = [osdp.PDInfo(rid, channel) for rid in addresses]
+        cp = osdp.ControlPanel(pd_infos, osdp.LogLevel.Info, _panel_callback)
+        cp.start()
+        self.cp = cp
+        self._pd_addresses = addresses
+        self._disabled = set()
+
+    def _send_feedback(self, address: int, granted: bool) -> None:
+        """Flash the reader LED and sound the buzzer for an access decision."""
+        for command in _GRANTED_FEEDBACK if granted else _DENIED_FEEDBACK:
+            self.commands.submit(address, command, LANE_ACCESS)
+
+    def _stop_panel(self) -> None:
+        if self.cp is None:
+            return
+        if isinstance(self.cp, RemoteControlPanel):
+            self._worker_restarts += self.cp.restarts
+        try:
+            self.cp.stop()
+        except Exception as exc:
+            _LOGGER.warning("Error stopping ControlPanel: %s", exc)
+        self.cp = None
+        self._pd_addresses = []
+        self._disabled = set()
@@ -0,0 +1,102 @@
+"""Table-driven decoding of Wiegand card data from libosdp card reads."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import NamedTuple
+
+
+class CardLayout(NamedTuple):
+    """Precompiled bit layout of one card format.
+
+    Fields are (shift, mask) pairs against the card value as an integer
+    with the first transmitted bit as MSB. Each parity rule is a mask over
+    the bits it covers, parity bit included, and whether it is odd parity.
+    """
+
+    name: str
+    bits: int
+    facility: tuple[int, int] | None
+    card: tuple[int, int]
+    parity: tuple[tuple[int, bool], ...]
+
+
+class CardData(NamedTuple):
+    """Decoded card read."""
+
+    format: str
+    bits: int
+    facility_code: int | None
+    card_number: int
+    parity_valid: bool | None
+
+
+def _field(bits: int, first: int, length: int) -> tuple[int, int]:
+    """(shift, mask) of ``length`` bits starting at bit ``first`` (0 = MSB)."""
+    return bits - first - length, (1 << length) - 1
+
+
+def _span(bits: int, first: int, last: int) -> int:
+    """Mask covering bits ``first``..``last`` inclusive (0 = MSB)."""
+    shift, mask = _field(bits, first, last - first + 1)
+    return mask << shift
+
+
+def _layout(name: str, bits: int, facility, card, even, odd) -> CardLayout:
+    return CardLayout(
+        name,
+        bits,
+        _field(bits, *facility) if facility else None,
+        _field(bits, *card),
+        ((_span(bits, *even), False), (_span(bits, *odd), True)),
+    )
+
+
+# (first bit, length) for fields, (first, last) for the parity spans
+WIEGAND_26 = _layout("wiegand26", 26, (1, 8), (9, 16), (0, 12), (13, 25))
+WIEGAND_34 = _layout("wiegand34", 34, (1, 16), (17, 16), (0, 16), (17, 33))
+WIEGAND_37 = _layout("wiegand37", 37, None, (1, 35), (0, 18), (18, 36))
+H10304 = _layout("h10304", 37, (1, 16), (17, 19), (0, 18), (18, 36))
+
+FORMAT_AUTO = "auto"
+FORMAT_RAW = "raw"
+LAYOUTS = {layout.name: layout for layout in (WIEGAND_26, WIEGAND_34, WIEGAND_37, H10304)}
+CARD_FORMATS = [FORMAT_AUTO, *LAYOUTS, FORMAT_RAW]
+
+# Bit length -> layout; 37-bit reads default to H10304 (with facility code)
+AUTO_TABLE: Mapping[int, CardLayout] = {26: WIEGAND_26, 34: WIEGAND_34, 37: H10304}
+RAW_TABLE: Mapping[int, CardLayout] = {}
+
+
+def layout_table(card_format: str) -> Mapping[int, CardLayout]:
+    """Resolve a configured format name to its bit length -> layout table."""
+    if card_format == FORMAT_RAW:
+        return RAW_TABLE
+    if (layout := LAYOUTS.get(card_format)) is not None:
+        return {layout.bits: layout}
+    return AUTO_TABLE
+
+
+def decode_card(table: Mapping[int, CardLayout], data: bytes, bits: int) -> CardData:
+    """Decode card bytes (MSB first, left aligned) with a layout table.
+
+    ``bits`` is the bit count reported by the reader; when it is missing or
+    larger than the payload, the whole payload is used. Reads without a
+    matching layout come back as raw with the full value as card number.
+    """
+    total = len(data) * 8
+    if not 0 < bits <= total:
+        bits = total
+    value = int.from_bytes(data, "big") >> (total - bits)
+
+    layout = table.get(bits)
+    if layout is None:
+        return CardData(FORMAT_RAW, bits, None, value, None)
+
+    shift, mask = layout.card
+    card_number = (value >> shift) & mask
+    facility_code = None
+    if layout.facility is not None:
+        shift, mask = layout.facility
+        facility_code = (value >> shift) & mask
+    parity_valid = all((value & span).bit_count() & 1 == odd for span, odd in layout.parity)
+    return CardData(layout.name, bits, facility_code, card_number, parity_valid)
@@ -0,0 +1,228 @@
+"""Transport channels handed to libosdp."""
+from __future__ import annotations
+
+import logging
+import os
+import select
+import socket
+import time
+
+import osdp
+
+from .const import (
+    CHANNEL_READ_TIMEOUT,
+    TCP_CONNECT_TIMEOUT,
+    TCP_RECONNECT_MAX,
+    TCP_RECONNECT_MIN,
+    TCP_SCHEME,
+)
+from .metrics import BusMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+# Largest read libosdp asks for is one packet; keep a little headroom
+_READ_BUFFER_SIZE = 1024
+
+
+class SerialChannel(osdp.Channel):
+    """Serial channel implementing the osdp.Channel interface.
+
+    The port is non-blocking, but ``read`` waits on the file descriptor with
+    ``poll`` for up to ``read_timeout`` before giving up, so libosdp's
+    refresh thread sleeps in the kernel (without the GIL) while a reply is
+    in flight instead of spinning on empty reads. Data is read into a
+    preallocated buffer. Traffic is reported to ``metrics`` when set.
+    """
+
+    def __init__(
+        self,
+        device: str,
+        speed: int,
+        read_timeout: float = CHANNEL_READ_TIMEOUT,
+        metrics: BusMetrics | None = None,
+    ):
+        # pyserial is only needed once a serial bus is opened (in the executor)
+        import serial
+
+        super().__init__()
+        self.metrics = metrics
+        self.dev = serial.Serial(device, speed, timeout=0)
+        self._fd = self.dev.fileno()
+        self._poller = select.poll()
+        self._poller.register(self._fd, select.POLLIN | select.POLLPRI)
+        self._timeout_ms = max(int(read_timeout * 1000), 0)
+        self._buf = bytearray(_READ_BUFFER_SIZE)
+        self._view = memoryview(self._buf)
+
+    def read(self, max_read: int):
+        if not self._poller.poll(self._timeout_ms):
+            return b""
+        try:
+            count = os.readv(self._fd, (self._view[:min(max_read, _READ_BUFFER_SIZE)],))
+        except (BlockingIOError, InterruptedError):
+            return b""
+        if not count:
+            return b""
+        data = bytes(self._view[:count])
+        if self.metrics is not None:
+            self.metrics.on_read(data)
+        return data
+
+    def write(self, data: bytes):
+        if self.metrics is not None:
+            self.metrics.on_write(data)
+        return self.dev.write(data)
+
+    def flush(self):
+        self.dev.flush()
+
+    def set_speed(self, speed: int) -> None:
+        """Change the line speed without reopening the port."""
+        self.dev.baudrate = speed
+
+    def close(self) -> None:
+        try:
+            self._poller.unregister(self._fd)
+        except (KeyError, ValueError):
+            pass
+        self.dev.close()
+
+    def __del__(self):
+        try:
+            self.dev.close()
+        except Exception:
+            pass
+
+
+class TcpChannel(osdp.Channel):
+    """osdp.Channel over TCP to a serial-to-Ethernet converter (ser2net etc.).
+
+    One persistent socket is reused for the life of the channel, with Nagle
+    disabled so each frame libosdp writes leaves in a single segment. When
+    the connection drops, reads and writes fail fast and reconnects are
+    attempted with exponential backoff; the ControlPanel keeps running and
+    the PDs simply go offline until the link is back. The backoff only
+    resets once data arrives, so a converter that accepts connections and
+    drops them straight away is not hammered.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        read_timeout: float = CHANNEL_READ_TIMEOUT,
+        metrics: BusMetrics | None = None,
+    ):
+        super().__init__()
+        self.metrics = metrics
+        self._address = (host, port)
+        self._timeout = read_timeout
+        self._timeout_ms = max(int(read_timeout * 1000), 0)
+        self._sock: socket.socket | None = None
+        self._poller: select.poll | None = None
+        self._backoff = TCP_RECONNECT_MIN
+        self._next_attempt = 0.0
+        # Whether the current connection has delivered any data
+        self._proven = False
+        self._buf = bytearray(_READ_BUFFER_SIZE)
+        self._view = memoryview(self._buf)
+        self._connect()
+
+    def _connect(self) -> bool:
+        """Try to (re)connect unless still backing off from the last failure."""
+        now = time.monotonic()
+        if now < self._next_attempt:
+            return False
+        try:
+            sock = socket.create_connection(self._address, timeout=TCP_CONNECT_TIMEOUT)
+        except OSError as exc:
+            _LOGGER.debug(
+                "Connecting to %s:%s failed, retrying in %.0f s: %s", *self._address, self._backoff, exc
+            )
+            self._next_attempt = now + self._backoff
+            self._backoff = min(self._backoff * 2, TCP_RECONNECT_MAX)
+            return False
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        poller = select.poll()
+        poller.register(sock.fileno(), select.POLLIN | select.POLLPRI)
+        self._sock = sock
+        self._poller = poller
+        self._proven = False
+        _LOGGER.info("Connected to OSDP bus at %s:%s", *self._address)
+        return True
+
+    def _drop(self, reason) -> None:
+        _LOGGER.warning("Lost connection to OSDP bus at %s:%s: %s", *self._address, reason)
+        self._close_socket()
+        self._next_attempt = time.monotonic() + self._backoff
+        if not self._proven:
+            self._backoff = min(self._backoff * 2, TCP_RECONNECT_MAX)
+
+    def _close_socket(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._poller = None
+
+    def read(self, max_read: int):
+        if self._sock is None and not self._connect():
+            # Don't let the refresh loop spin while disconnected
+            time.sleep(self._timeout)
+            return b""
+        if not self._poller.poll(self._timeout_ms):
+            return b""
+        try:
+            count = self._sock.recv_into(self._view, min(max_read, _READ_BUFFER_SIZE))
+        except (BlockingIOError, InterruptedError, socket.timeout):
+            return b""
+        except OSError as exc:
+            self._drop(exc)
+            return b""
+        if not count:
+            self._drop("closed by peer")
+            return b""
+        if not self._proven:
+            self._proven = True
+            self._backoff = TCP_RECONNECT_MIN
+        data = bytes(self._view[:count])
+        if self.metrics is not None:
+            self.metrics.on_read(data)
+        return data
+
+    def write(self, data: bytes):
+        if self.metrics is not None:
+            self.metrics.on_write(data)
+        if self._sock is None and not self._connect():
+            return 0
+        try:
+            self._sock.sendall(data)
+        except OSError as exc:
+            self._drop(exc)
+            return 0
+        return len(data)
+
+    def flush(self):
+        # sendall() has already handed everything to the kernel
+        pass
+
+    def set_speed(self, speed: int) -> None:
+        """Line speed is set on the converter, not over the socket."""
+
+    def close(self) -> None:
+        self._close_socket()
+        self._next_attempt = float("inf")
+
+    def __del__(self):
+        self._close_socket()
+
+
+def create_channel(port: str, speed: int, metrics: BusMetrics | None = None) -> osdp.Channel:
+    """Open the channel for a bus port: a serial device or ``tcp://host:port``."""
+    if port.startswith(TCP_SCHEME):
+        host, _, tcp_port = port[len(TCP_SCHEME):].rpartition(":")
+        return TcpChannel(host.strip("[]"), int(tcp_port), metrics=metrics)
+    return SerialChannel(port, speed, metrics=metrics)
@@ -0,0 +1,244 @@
+"""Outbound command queue in front of a libosdp ControlPanel."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable
+import logging
+import threading
+import time
+from typing import Any
+
+import osdp
+
+_LOGGER = logging.getLogger(__name__)
+
+# Lanes, highest priority first. Access feedback is served before
+# anything an automation asked for.
+LANE_ACCESS = 0
+LANE_NORMAL = 1
+_LANES = (LANE_ACCESS, LANE_NORMAL)
+
+# Bytes on the wire for a typical command and its reply; with 10 bits per
+# byte this sets the minimum spacing of commands to one reader.
+_COMMAND_AIRTIME_BYTES = 64
+
+LED_COLORS = {
+    "black": osdp.CommandLEDColor.Black,
+    "red": osdp.CommandLEDColor.Red,
+    "green": osdp.CommandLEDColor.Green,
+    "amber": osdp.CommandLEDColor.Amber,
+    "blue": osdp.CommandLEDColor.Blue,
+}
+
+
+def led_command(
+    color: str,
+    off_color: str = "black",
+    led_number: int = 0,
+    on_time: int = 500,
+    off_time: int = 0,
+    duration: float | None = None,
+) -> dict:
+    """LED command; times in ms, ``duration`` in seconds for a temporary state."""
+    return {
+        "command": osdp.Command.LED,
+        "reader": 0,
+        "led_number": led_number,
+        "control_code": 2 if duration else 1,
+        "on_count": on_time // 100,
+        "off_count": off_time // 100,
+        "on_color": LED_COLORS[color],
+        "off_color": LED_COLORS[off_color],
+        "timer_count": int(duration * 10) if duration else 0,
+        "temporary": bool(duration),
+    }
+
+
+def buzzer_command(on_time: int = 100, off_time: int = 100, count: int = 1) -> dict:
+    """Buzzer command; times in ms."""
+    return {
+        "command": osdp.Command.Buzzer,
+        "reader": 0,
+        "control_code": 2 if count else 1,
+        "on_count": on_time // 100,
+        "off_count": off_time // 100,
+        "rep_count": count,
+    }
+
+
+def output_command(output: int, state: bool, duration: float | None = None) -> dict:
+    """Output command; a ``duration`` in seconds makes the state temporary."""
+    if duration:
+        control_code = 5 if state else 6
+    else:
+        control_code = 2 if state else 1
+    return {
+        "command": osdp.Command.Output,
+        "output_no": output,
+        "control_code": control_code,
+        "timer_count": int(duration * 10) if duration else 0,
+    }
+
+
+def text_command(text: str, row: int = 1, column: int = 1, duration: int | None = None) -> dict:
+    """Text command; ``duration`` in seconds makes the text temporary."""
+    return {
+        "command": osdp.Command.Text,
+        "reader": 0,
+        "control_code": 3 if duration else 1,
+        "temp_time": duration or 0,
+        "offset_row": row,
+        "offset_col": column,
+        "data": text,
+    }
+
+
+def _coalesce_key(lane: int, command: dict) -> tuple:
+    """Commands with the same key replace each other while still pending."""
+    kind = command["command"]
+    return (lane, kind, command.get("led_number", command.get("output_no", 0)))
+
+
+class CommandQueue:
+    """Per-reader command queues drained by one dispatcher thread per bus.
+
+    A command that is still pending is replaced by a later command of the
+    same kind for the same LED/output (keeping its place in line), so a
+    burst of automations collapses to the last state. Readers are served
+    lane by lane, and commands to one reader are spaced by the time a
+    command and its reply take on the wire at the bus baudrate. Commands
+    that cannot be handed to libosdp (queue stopped, no panel, libosdp's
+    own queue full) are counted as failed.
+    """
+
+    def __init__(self, name: str, get_cp: Callable[[], Any], baudrate: int) -> None:
+        self._name = name
+        self._get_cp = get_cp
+        self._cond = threading.Condition()
+        # reader -> lane -> key -> (command, enqueued at)
+        self._pending: dict[int, dict[int, OrderedDict[tuple, tuple[dict, float]]]] = {}
+        self._next_send: dict[int, float] = {}
+        # Until started, and again once stopped, commands are rejected
+        self._stopped = True
+        self._thread: threading.Thread | None = None
+        self.set_baudrate(baudrate)
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.sent = 0
+        self.failed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def set_baudrate(self, baudrate: int) -> None:
+        self._interval = _COMMAND_AIRTIME_BYTES * 10 / baudrate
+
+    @property
+    def depth(self) -> int:
+        with self._cond:
+            return sum(len(keys) for lanes in self._pending.values() for keys in lanes.values())
+
+    def start(self) -> None:
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name=f"osdp-cmd-{self._name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            # Never sent
+            self.failed += sum(len(keys) for lanes in self._pending.values() for keys in lanes.values())
+            self._pending.clear()
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, address: int, command: dict, lane: int = LANE_NORMAL) -> bool:
+        """Queue a command for a reader; callable from any thread.
+
+        Returns False, counting the command as failed, while the queue is
+        not running (bus not started, failed or stopped).
+        """
+        key = _coalesce_key(lane, command)
+        with self._cond:
+            if self._stopped:
+                self.failed += 1
+                return False
+            keys = self._pending.setdefault(address, {}).setdefault(lane, OrderedDict())
+            if key in keys:
+                # Supersede in place, keep the original enqueue time
+                keys[key] = (command, keys[key][1])
+                self.coalesced += 1
+            else:
+                keys[key] = (command, time.monotonic())
+            self.submitted += 1
+            self._cond.notify()
+        return True
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "commands_pending": self.depth,
+            "commands_submitted": self.submitted,
+            "commands_coalesced": self.coalesced,
+            "commands_sent": self.sent,
+            "commands_failed": self.failed,
+            "command_wait_avg_ms": round(1000 * self.wait_total / self.sent, 1) if self.sent else None,
+            "command_wait_max_ms": round(1000 * self.wait_max, 1),
+        }
+
+    def _next(self) -> tuple[int, dict, float] | float | None:
+        """Pop the next sendable command, or return how long to wait for one."""
+        now = time.monotonic()
+        earliest = None
+        for lane in _LANES:
+            for address, lanes in self._pending.items():
+                keys = lanes.get(lane)
+                if not keys:
+                    continue
+                ready_at = self._next_send.get(address, 0.0)
+                if ready_at > now:
+                    earliest = ready_at if earliest is None else min(earliest, ready_at)
+                    continue
+                _, (command, enqueued) = keys.popitem(last=False)
+                if not keys:
+                    del lanes[lane]
+                    if not lanes:
+                        del self._pending[address]
+                self._next_send[address] = now + self._interval
+                return address, command, enqueued
+        return None if earliest is None else earliest - now
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        return
+                    item = self._next()
+                    if isinstance(item, tuple):
+                        break
+                    self._cond.wait(item)
+            address, command, enqueued = item
+            cp = self._get_cp()
+            if cp is None:
+                # Panel being rebuilt, or no readers left
+                self.failed += 1
+                continue
+            try:
+                # submit_command supersedes the deprecated send_command
+                submit = getattr(cp, "submit_command", None) or cp.send_command
+                queued = submit(address, command)
+            except Exception as exc:
+                self.failed += 1
+                _LOGGER.debug("Command to reader %s on %s failed: %s", address, self._name, exc)
+                continue
+            if not queued:
+                self.failed += 1
+                _LOGGER.debug("libosdp refused a command to reader %s on %s", address, self._name)
+                continue
+            waited = time.monotonic() - enqueued
+            self.sent += 1
+            self.wait_total += waited
+            if waited > self.wait_max:
+                self.wait_max = waited
@@ -1,29 +1,88 @@
+import logging
+
 import voluptuous as vol
-import serial.tools.list_ports
 from homeassistant import config_entries
 from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
 from .const import (
     DOMAIN,
+    CONF_ACCESS_FILE,
     CONF_PORT,
     CONF_BAUDRATE,
     CONF_CONTROLLER_NAME,
+    CONF_BUS,
+    CONF_BUSES,
+    CONF_CARD_FORMAT,
+    CONF_CARD_FORMATS,
+    CONF_HOST,
+    CONF_TCP_PORT,
+    CONF_DEDUP_WINDOW,
+    CONF_KEYPAD_TIMEOUT,
+    CONF_PIN_MAX_LENGTH,
+    CONF_PROFILE,
+    CONF_WORKER,
+    CONF_ADAPTIVE,
+    CONF_PRIORITY,
+    CONF_PRIORITIES,
+    CONF_QUEUE_SIZE,
+    CONF_OVERFLOW_POLICY,
+    BUS_INITIALIZING,
+    DEFAULT_ADAPTIVE,
     DEFAULT_BAUDRATE,
+    DEFAULT_DEDUP_WINDOW,
+    DEFAULT_KEYPAD_TIMEOUT,
+    DEFAULT_PIN_MAX_LENGTH,
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_OVERFLOW_POLICY,
+    DEFAULT_TCP_PORT,
+    OVERFLOW_POLICIES,
+    PRIORITIES,
+    PRIORITY_NORMAL,
+    TCP_SCHEME,
 )
+from .cardformat import CARD_FORMATS, FORMAT_AUTO
+
+_LOGGER = logging.getLogger(__name__)
 
 # Common baudrates for OSDP
 COMMON_BAUDRATES = [9600, 19200, 38400, 57600, 115200]
 
 
 def _available_ports() -> list[str]:
+    """Enumerate serial ports; blocks on sysfs/udev, so it runs in the executor."""
+    import serial.tools.list_ports
+
     return [p.device for p in serial.tools.list_ports.comports()]
 
 
+def _network_port(host: str, tcp_port: int) -> str:
+    """Bus port string for a serial-to-Ethernet converter."""
+    if ":" in host:
+        host = f"[{host}]"
+    return f"{TCP_SCHEME}{host}:{tcp_port}"
+
+
+def _network_schema(with_name: bool = False) -> vol.Schema:
+    fields = {
+        vol.Required(CONF_HOST): str,
+        vol.Required(CONF_TCP_PORT, default=DEFAULT_TCP_PORT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=65535)
+        ),
+    }
+    if with_name:
+        fields[vol.Optional(CONF_CONTROLLER_NAME, default="OSDP Controller")] = str
+    return vol.Schema(fields)
+
+
 class OSDPConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
     async def async_step_user(self, user_input=None):
+        return self.async_show_menu(step_id="user", menu_options=["serial", "network"])
+
+    async def async_step_serial(self, user_input=None):
         if user_input is None:
-            ports = _available_ports()
+            ports = await self.hass.async_add_executor_job(_available_ports)
             if not ports:
                 ports = ["<no serial ports found>"]
 
@@ -34,14 +93,27 @@ class OSDPConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     vol.Optional(CONF_CONTROLLER_NAME, default="OSDP Controller"): str,
                 }
             )
-            return self.async_show_form(step_id="user", data_schema=schema)
+            return self.async_show_form(step_id="serial", data_schema=schema)
 
-        await self.async_set_unique_id(f"{DOMAIN}_{user_input[CONF_PORT]}")
+        return await self._async_create_controller(user_input)
+
+    async def async_step_network(self, user_input=None):
+        if user_input is None:
+            return self.async_show_form(step_id="network", data_schema=_network_schema(with_name=True))
+
+        data = {
+            CONF_PORT: _network_port(user_input[CONF_HOST], user_input[CONF_TCP_PORT]),
+            CONF_CONTROLLER_NAME: user_input[CONF_CONTROLLER_NAME],
+        }
+        return await self._async_create_controller(data)
+
+    async def _async_create_controller(self, data):
+        await self.async_set_unique_id(f"{DOMAIN}_{data[CONF_PORT]}")
         self._abort_if_unique_id_configured()
 
         return self.async_create_entry(
-            title=user_input.get(CONF_CONTROLLER_NAME, f"OSDP ({user_input[CONF_PORT]})"),
-            data=user_input,
+            title=data.get(CONF_CONTROLLER_NAME, f"OSDP ({data[CONF_PORT]})"),
+            data=data,
         )
 
     @staticmethod
@@ -52,12 +124,88 @@ class OSDPConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 class OSDPOptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry):
         self._entry = config_entry
+        self._discover_port: str | None = None
+        self._discover_task = None
+        self._discovered = []
 
     async def async_step_init(self, user_input=None):
-        readers = self._entry.options.get("readers", [])
+        menu_options = ["readers", "discover", "add_bus", "add_network_bus"]
+        if self._entry.options.get(CONF_BUSES):
+            menu_options.append("remove_bus")
+        menu_options.append("settings")
+        return self.async_show_menu(step_id="init", menu_options=menu_options)
+
+    def _ports(self) -> list[str]:
+        """Ports of every bus in this entry, the original one first."""
+        return [self._entry.data[CONF_PORT]] + [bus[CONF_PORT] for bus in self._entry.options.get(CONF_BUSES, [])]
+
+    def _readers_of(self, port: str) -> list[int]:
+        if port == self._entry.data[CONF_PORT]:
+            return list(self._entry.options.get("readers", []))
+        for bus in self._entry.options.get(CONF_BUSES, []):
+            if bus[CONF_PORT] == port:
+                return list(bus.get("readers", []))
+        return []
+
+    def _card_formats_of(self, port: str) -> dict[str, str]:
+        if port == self._entry.data[CONF_PORT]:
+            return dict(self._entry.options.get(CONF_CARD_FORMATS, {}))
+        for bus in self._entry.options.get(CONF_BUSES, []):
+            if bus[CONF_PORT] == port:
+                return dict(bus.get(CONF_CARD_FORMATS, {}))
+        return {}
+
+    def _priorities_of(self, port: str) -> dict[str, str]:
+        if port == self._entry.data[CONF_PORT]:
+            return dict(self._entry.options.get(CONF_PRIORITIES, {}))
+        for bus in self._entry.options.get(CONF_BUSES, []):
+            if bus[CONF_PORT] == port:
+                return dict(bus.get(CONF_PRIORITIES, {}))
+        return {}
+
+    def _baudrate_of(self, port: str) -> int:
+        if port == self._entry.data[CONF_PORT]:
+            return self._entry.options.get(
+                CONF_BAUDRATE, self._entry.data.get(CONF_BAUDRATE, DEFAULT_BAUDRATE)
+            )
+        for bus in self._entry.options.get(CONF_BUSES, []):
+            if bus[CONF_PORT] == port:
+                return bus.get(CONF_BAUDRATE, DEFAULT_BAUDRATE)
+        return DEFAULT_BAUDRATE
+
+    def _options_with_readers(
+        self,
+        port: str,
+        readers: list[int],
+        formats: dict[str, str],
+        baudrate: int | None = None,
+        priorities: dict[str, str] | None = None,
+    ) -> dict:
+        options = dict(self._entry.options)
+        changes = {"readers": readers, CONF_CARD_FORMATS: formats}
+        if baudrate is not None:
+            changes[CONF_BAUDRATE] = baudrate
+        if priorities is not None:
+            changes[CONF_PRIORITIES] = priorities
+        if port == self._entry.data[CONF_PORT]:
+            options.update(changes)
+        else:
+            options[CONF_BUSES] = [
+                {**bus, **changes} if bus[CONF_PORT] == port else bus
+                for bus in options.get(CONF_BUSES, [])
+            ]
+        return options
+
+    async def async_step_readers(self, user_input=None):
+        ports = self._ports()
         errors = {}
 
         if user_input is not None:
+            port = user_input.get(CONF_BUS, ports[0])
+            # Copy: the live options list is shared with the running entry
+            readers = self._readers_of(port)
+            formats = self._card_formats_of(port)
+            priorities = self._priorities_of(port)
             action = user_input.get("action")
             try:
                 reader_id = int(user_input["reader_id"])
@@ -68,7 +216,7 @@ class OSDPOptionsFlowHandler(config_entries.OptionsFlow):
                     errors["reader_id"] = "out_of_range"
                 elif action == "add" and reader_id in readers:
                     errors["reader_id"] = "duplicate"
-                elif action == "remove" and reader_id not in readers:
+                elif action in ("remove", "update") and reader_id not in readers:
                     errors["reader_id"] = "not_found"
 
             if not errors:
@@ -76,15 +224,206 @@ class OSDPOptionsFlowHandler(config_entries.OptionsFlow):
                     readers.append(reader_id)
                 elif action == "remove":
                     readers.remove(reader_id)
+                formats.pop(str(reader_id), None)
+                card_format = user_input.get(CONF_CARD_FORMAT, FORMAT_AUTO)
+                if action != "remove" and card_format != FORMAT_AUTO:
+                    formats[str(reader_id)] = card_format
+                priorities.pop(str(reader_id), None)
+                priority = user_input.get(CONF_PRIORITY, PRIORITY_NORMAL)
+                if action != "remove" and priority != PRIORITY_NORMAL:
+                    priorities[str(reader_id)] = priority
+                return self.async_create_entry(
+                    title="",
+                    data=self._options_with_readers(port, readers, formats, priorities=priorities),
+                )
+
+        fields = {}
+        if len(ports) > 1:
+            fields[vol.Required(CONF_BUS, default=ports[0])] = vol.In(ports)
+        fields[vol.Required("action", default="add")] = vol.In(["add", "remove", "update"])
+        fields[vol.Required("reader_id")] = int
+        fields[vol.Optional(CONF_CARD_FORMAT, default=FORMAT_AUTO)] = vol.In(CARD_FORMATS)
+        fields[vol.Optional(CONF_PRIORITY, default=PRIORITY_NORMAL)] = vol.In(PRIORITIES)
+        return self.async_show_form(step_id="readers", data_schema=vol.Schema(fields), errors=errors)
+
+    async def async_step_discover(self, user_input=None):
+        ports = self._ports()
+        if user_input is None and len(ports) > 1:
+            schema = vol.Schema({vol.Required(CONF_BUS, default=ports[0]): vol.In(ports)})
+            return self.async_show_form(step_id="discover", data_schema=schema)
+        self._discover_port = (user_input or {}).get(CONF_BUS, ports[0])
+        return await self.async_step_discover_scan()
+
+    async def async_step_discover_scan(self, user_input=None):
+        if self._discover_task is None:
+            runtime = (
+                self.hass.data.get(DOMAIN, {}).get(self._entry.entry_id, {}).get("buses", {}).get(self._discover_port)
+            )
+            # A bus still opening in the background cannot be paused yet
+            if runtime is None or runtime["bus"].state == BUS_INITIALIZING:
+                return self.async_abort(reason="not_loaded")
+            loop = self.hass.loop
+
+            def _progress(fraction: float) -> None:
+                loop.call_soon_threadsafe(self.async_update_progress, fraction)
+
+            async def _async_scan():
+                # Polling of this bus pauses while it is probed
+                return await self.hass.async_add_executor_job(runtime["bus"].discover, COMMON_BAUDRATES, _progress)
+
+            self._discover_task = self.hass.async_create_task(_async_scan())
+        if not self._discover_task.done():
+            return self.async_show_progress(
+                step_id="discover_scan",
+                progress_action="discover",
+                progress_task=self._discover_task,
+                description_placeholders={"bus": self._discover_port},
+            )
+        try:
+            self._discovered = self._discover_task.result()
+        except Exception as exc:  # serial, libosdp or worker errors alike
+            _LOGGER.error("OSDP discovery on %s failed: %s", self._discover_port, exc)
+            self._discovered = []
+        return self.async_show_progress_done(next_step_id="discover_results")
+
+    async def async_step_discover_results(self, user_input=None):
+        port = self._discover_port
+        readers = self._readers_of(port)
+        found = {pd.address: pd for pd in self._discovered if pd.address not in readers}
+        if not found:
+            return self.async_abort(reason="nothing_discovered")
+
+        errors = {}
+        if user_input is not None:
+            selected = sorted(int(address) for address in user_input["readers"])
+            baudrates = {found[address].baudrate for address in selected}
+            current = self._baudrate_of(port)
+            if not selected:
+                return self.async_abort(reason="nothing_selected")
+            if len(baudrates) > 1:
+                errors["readers"] = "mixed_baudrates"
+            elif readers and current not in baudrates:
+                errors["readers"] = "baudrate_mismatch"
+            else:
+                # One options update: the bus is reconfigured once for all of them
+                baudrate = baudrates.pop()
                 return self.async_create_entry(
                     title="",
-                    data={"readers": readers},
+                    data=self._options_with_readers(
+                        port,
+                        readers + selected,
+                        self._card_formats_of(port),
+                        baudrate if baudrate != current else None,
+                    ),
                 )
 
+        choices = {str(address): pd.label for address, pd in sorted(found.items())}
+        schema = vol.Schema({vol.Required("readers", default=list(choices)): cv.multi_select(choices)})
+        return self.async_show_form(
+            step_id="discover_results",
+            data_schema=schema,
+            errors=errors,
+            description_placeholders={"bus": port, "count": str(len(found))},
+        )
+
+    def _ports_in_use(self) -> set[str]:
+        in_use = set()
+        for entry in self.hass.config_entries.async_entries(DOMAIN):
+            in_use.add(entry.data[CONF_PORT])
+            in_use.update(bus[CONF_PORT] for bus in entry.options.get(CONF_BUSES, []))
+        return in_use
+
+    def _add_bus(self, port: str, baudrate: int):
+        buses = list(self._entry.options.get(CONF_BUSES, []))
+        buses.append({CONF_PORT: port, CONF_BAUDRATE: baudrate, "readers": []})
+        return self.async_create_entry(title="", data={**self._entry.options, CONF_BUSES: buses})
+
+    async def async_step_add_bus(self, user_input=None):
+        errors = {}
+        in_use = self._ports_in_use()
+
+        if user_input is not None:
+            if user_input[CONF_PORT] in in_use:
+                errors[CONF_PORT] = "port_in_use"
+            else:
+                return self._add_bus(user_input[CONF_PORT], user_input[CONF_BAUDRATE])
+
+        ports = [
+            port for port in await self.hass.async_add_executor_job(_available_ports) if port not in in_use
+        ]
+        if not ports:
+            ports = ["<no serial ports found>"]
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_PORT): vol.In(ports),
+                vol.Optional(CONF_BAUDRATE, default=DEFAULT_BAUDRATE): vol.In(COMMON_BAUDRATES),
+            }
+        )
+        return self.async_show_form(step_id="add_bus", data_schema=schema, errors=errors)
+
+    async def async_step_add_network_bus(self, user_input=None):
+        errors = {}
+
+        if user_input is not None:
+            port = _network_port(user_input[CONF_HOST], user_input[CONF_TCP_PORT])
+            if port in self._ports_in_use():
+                errors[CONF_HOST] = "port_in_use"
+            else:
+                return self._add_bus(port, DEFAULT_BAUDRATE)
+
+        return self.async_show_form(step_id="add_network_bus", data_schema=_network_schema(), errors=errors)
+
+    async def async_step_remove_bus(self, user_input=None):
+        buses = self._entry.options.get(CONF_BUSES, [])
+
+        if user_input is not None:
+            return self.async_create_entry(
+                title="",
+                data={
+                    **self._entry.options,
+                    CONF_BUSES: [bus for bus in buses if bus[CONF_PORT] != user_input[CONF_BUS]],
+                },
+            )
+
+        schema = vol.Schema({vol.Required(CONF_BUS): vol.In([bus[CONF_PORT] for bus in buses])})
+        return self.async_show_form(step_id="remove_bus", data_schema=schema)
+
+    async def async_step_settings(self, user_input=None):
+        options = self._entry.options
+
+        if user_input is not None:
+            data = {**options, **user_input}
+            if not user_input.get(CONF_ACCESS_FILE):
+                data.pop(CONF_ACCESS_FILE, None)
+            return self.async_create_entry(title="", data=data)
+
+        baudrate = options.get(CONF_BAUDRATE, self._entry.data.get(CONF_BAUDRATE, DEFAULT_BAUDRATE))
         schema = vol.Schema(
             {
-                vol.Required("action", default="add"): vol.In(["add", "remove"]),
-                vol.Required("reader_id"): int,
+                vol.Optional(CONF_BAUDRATE, default=baudrate): vol.In(COMMON_BAUDRATES),
+                vol.Optional(
+                    CONF_QUEUE_SIZE, default=options.get(CONF_QUEUE_SIZE, DEFAULT_QUEUE_SIZE)
+                ): vol.All(vol.Coerce(int), vol.Range(min=16, max=65536)),
+                vol.Optional(
+                    CONF_OVERFLOW_POLICY,
+                    default=options.get(CONF_OVERFLOW_POLICY, DEFAULT_OVERFLOW_POLICY),
+                ): vol.In(OVERFLOW_POLICIES),
+                vol.Optional(
+                    CONF_DEDUP_WINDOW, default=options.get(CONF_DEDUP_WINDOW, DEFAULT_DEDUP_WINDOW)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+                vol.Optional(
+                    CONF_KEYPAD_TIMEOUT, default=options.get(CONF_KEYPAD_TIMEOUT, DEFAULT_KEYPAD_TIMEOUT)
+                ): vol.All(vol.Coerce(float), vol.Range(min=1, max=60)),
+                vol.Optional(
+                    CONF_PIN_MAX_LENGTH, default=options.get(CONF_PIN_MAX_LENGTH, DEFAULT_PIN_MAX_LENGTH)
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=32)),
+                vol.Optional(CONF_ADAPTIVE, default=options.get(CONF_ADAPTIVE, DEFAULT_ADAPTIVE)): bool,
+                vol.Optional(CONF_WORKER, default=options.get(CONF_WORKER, False)): bool,
+                vol.Optional(CONF_PROFILE, default=options.get(CONF_PROFILE, False)): bool,
+                vol.Optional(
+                    CONF_ACCESS_FILE,
+                    description={"suggested_value": options.get(CONF_ACCESS_FILE)},
+                ): str,
             }
         )
-        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
\ No newline at end of file
+        return self.async_show_form(step_id="settings", data_schema=schema)
\ No newline at end of file
@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 DOMAIN = "osdp"
 
 PLATFORMS = ["sensor", "binary_sensor"]
@@ -5,5 +7,116 @@ PLATFORMS = ["sensor", "binary_sensor"]
 CONF_PORT = "port"
 CONF_BAUDRATE = "baudrate"
 CONF_CONTROLLER_NAME = "controller_name"
+CONF_BUSES = "buses"
+CONF_BUS = "bus"
+CONF_HOST = "host"
+CONF_TCP_PORT = "tcp_port"
+CONF_CARD_FORMAT = "card_format"
+CONF_CARD_FORMATS = "card_formats"
+CONF_ACCESS_FILE = "access_list_file"
+CONF_DEDUP_WINDOW = "dedup_window"
+CONF_PROFILE = "profile_callbacks"
+CONF_WORKER = "isolated_worker"
+CONF_KEYPAD_TIMEOUT = "keypad_timeout"
+CONF_PIN_MAX_LENGTH = "pin_max_length"
 
 DEFAULT_BAUDRATE = 115200
+# Seconds a repeated read of the same card on the same reader is ignored
+DEFAULT_DEDUP_WINDOW = 2.0
+# Keypad: longest pause between keys of one PIN, and the longest PIN
+DEFAULT_KEYPAD_TIMEOUT = 5.0
+DEFAULT_PIN_MAX_LENGTH = 8
+# A PIN completed this long after a card read on the reader is paired with it
+CARD_PIN_WINDOW = 15.0
+
+CONF_QUEUE_SIZE = "queue_size"
+CONF_OVERFLOW_POLICY = "overflow_policy"
+
+# Event bridge between the libosdp refresh thread and the event loop
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_POLICIES = [OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST]
+
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_OVERFLOW_POLICY = OVERFLOW_DROP_OLDEST
+BRIDGE_BATCH_SIZE = 64
+
+# User attributed to events fired for card reads
+EVENT_USER_ID = "80136773bd514db4a8b1631fd33194ad"
+
+# How often reader online state (and, when needed, PD ID) is polled
+SCAN_INTERVAL = timedelta(seconds=30)
+# Fallback poll when libosdp pushes PD status notifications
+PUSH_SCAN_INTERVAL = timedelta(minutes=5)
+# How often the controller status sensor rewrites its counters
+STATUS_REFRESH_INTERVAL = timedelta(seconds=30)
+
+# Longest a channel read waits for data. A tenth of the 200 ms OSDP reply
+# timeout: short enough that libosdp's refresh loop stays responsive, long
+# enough that an idle bus does not spin on empty reads.
+CHANNEL_READ_TIMEOUT = 0.02
+
+# Network buses are stored with a port of the form tcp://host:port
+TCP_SCHEME = "tcp://"
+DEFAULT_TCP_PORT = 4001
+TCP_CONNECT_TIMEOUT = 3.0
+TCP_RECONNECT_MIN = 1.0
+TCP_RECONNECT_MAX = 60.0
+
+# Card read journal: rows are written in batches from the executor
+JOURNAL_FILE = "osdp_journal.db"
+JOURNAL_BATCH_SIZE = 500
+JOURNAL_FLUSH_INTERVAL = 5.0
+JOURNAL_RETENTION = timedelta(days=90)
+JOURNAL_MAX_ROWS = 2_000_000
+JOURNAL_PRUNE_INTERVAL = timedelta(hours=1)
+
+SERVICE_SET_ALLOWED_TAGS = "set_allowed_tags"
+SERVICE_RELOAD_ACCESS_LIST = "reload_access_list"
+SERVICE_SET_LED = "set_led"
+SERVICE_BUZZER = "buzzer"
+SERVICE_SET_OUTPUT = "set_output"
+SERVICE_SEND_TEXT = "send_text"
+SERVICE_QUERY_JOURNAL = "query_journal"
+SERVICE_TRANSFER_FILE = "transfer_file"
+
+# File transfers: status poll interval and attempts per reader
+FILE_TRANSFER_POLL_INTERVAL = timedelta(seconds=2)
+FILE_TRANSFER_MAX_ATTEMPTS = 3
+
+# Bus lifecycle as shown by the controller status sensor. Buses open in the
+# background after the entities exist, so they start out initializing.
+BUS_INITIALIZING = "initializing"
+BUS_RUNNING = "running"
+BUS_FAILED = "failed"
+BUS_STOPPED = "stopped"
+
+# Adaptive polling, off unless enabled. Readers offline for OFFLINE_GRACE
+# are parked (disabled in libosdp) and re-enabled for PROBE_WINDOW, long
+# enough for libosdp's ~8 s of retries of an unanswered ID, one reader at a
+# time, at intervals doubling from PROBE_MIN up to PROBE_MAX, or
+# PROBE_MAX_HIGH for high-priority doors: that is how long a returning
+# reader may still show offline, plus the windows of other offline readers
+# ahead of it. Low-priority doors idle for LOW_IDLE_AFTER are parked for
+# LOW_PARK_TIME at a time. Disabling a PD ends its session, so each wake is
+# a full reconnect (ID, capabilities, secure channel), given up after
+# LOW_WAKE_TIMEOUT; the LOW_POLL_SLICE of polling that follows counts from
+# when it is online.
+CONF_ADAPTIVE = "adaptive_polling"
+DEFAULT_ADAPTIVE = False
+CONF_PRIORITY = "priority"
+CONF_PRIORITIES = "priorities"
+PRIORITY_HIGH = "high"
+PRIORITY_NORMAL = "normal"
+PRIORITY_LOW = "low"
+PRIORITIES = [PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW]
+SCHEDULER_TICK = 1.0
+OFFLINE_GRACE = 10.0
+PROBE_WINDOW = 10.0
+PROBE_MIN = 5.0
+PROBE_MAX = 60.0
+PROBE_MAX_HIGH = 30.0
+LOW_IDLE_AFTER = 60.0
+LOW_PARK_TIME = 6.0
+LOW_POLL_SLICE = 3.0
+LOW_WAKE_TIMEOUT = 10.0
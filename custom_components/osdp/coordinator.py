@@ -0,0 +1,144 @@
+"""Shared polling of reader online state and PD ID for one OSDP bus."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+
+from .bus import OSDPBus
+from .const import PUSH_SCAN_INTERVAL, SCAN_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ReaderStatus:
+    """Snapshot of one reader as seen by the last poll."""
+
+    online: bool
+    pd_id: Any | None = None
+    last_online: datetime | None = None
+    last_offline: datetime | None = None
+
+
+class OSDPCoordinator(DataUpdateCoordinator[dict[int, ReaderStatus]]):
+    """Poll every reader of one bus once per cycle for all entities.
+
+    The libosdp calls block, so a cycle runs in the executor. PD ID never
+    changes while a reader stays on the bus; it is fetched once and kept
+    until the reader drops offline.
+
+    With ``push`` set, online transitions arrive from libosdp PD status
+    notifications through ``async_set_reader_online`` and polling drops to
+    a slow safety net. Listeners are only called when a reader changes.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        bus: OSDPBus,
+        name: str,
+        unique_base: str,
+        push: bool = False,
+    ) -> None:
+        # Passed explicitly: buses added from the options listener are
+        # built outside any config entry context
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=entry,
+            name=f"OSDP {name} ({bus.port})",
+            update_interval=PUSH_SCAN_INTERVAL if push else SCAN_INTERVAL,
+            always_update=False,
+        )
+        self.bus = bus
+        # Prefix for unique ids of the entities fed by this coordinator
+        self.unique_base = unique_base
+        self.push = push
+        self._pd_ids: dict[int, Any] = {}
+
+    @callback
+    def async_set_reader_online(self, rid: int, online: bool) -> None:
+        """Apply a pushed online/offline transition for one reader."""
+        data = self.data or {}
+        prev = data.get(rid)
+        if prev is not None and prev.online == online:
+            return
+        if not online:
+            self._pd_ids.pop(rid, None)
+        status = self._transition(rid, prev, ReaderStatus(online, prev.pd_id if prev and online else None))
+        self.async_set_updated_data({**data, rid: status})
+        if online and status.pd_id is None:
+            # PD ID is only read by a poll cycle
+            self.hass.async_create_task(self.async_request_refresh())
+
+    async def _async_update_data(self) -> dict[int, ReaderStatus]:
+        cp = self.bus.cp
+        readers = list(self.bus.readers)
+        prev = self.data or {}
+        if cp is None:
+            self._pd_ids.clear()
+            fetched = {rid: ReaderStatus(False) for rid in readers}
+        else:
+            # Idle doors parked by the scheduler are not polled: they were
+            # online when parked and are reported as last seen
+            masked = self.bus.scheduler.masked
+            fetched = await self.hass.async_add_executor_job(
+                self._fetch, cp, [rid for rid in readers if rid not in masked]
+            )
+            for rid in readers:
+                if rid in masked:
+                    fetched[rid] = prev.get(rid) or ReaderStatus(True, self._pd_ids.get(rid))
+
+        return {rid: self._transition(rid, prev.get(rid), status) for rid, status in fetched.items()}
+
+    def _transition(self, rid: int, prev: ReaderStatus | None, status: ReaderStatus) -> ReaderStatus:
+        """Carry transition timestamps over, stamping the one that changed."""
+        if prev is not None:
+            status.last_online = prev.last_online
+            status.last_offline = prev.last_offline
+            if prev.online == status.online:
+                return status
+        if status.online:
+            status.last_online = dt_util.utcnow()
+        else:
+            status.last_offline = dt_util.utcnow()
+            if prev is not None:
+                self.bus.metrics.reader(rid).offline += 1
+        return status
+
+    def _fetch(self, cp: Any, readers: list[int]) -> dict[int, ReaderStatus]:
+        """Query libosdp for each reader; runs in the executor."""
+        data: dict[int, ReaderStatus] = {}
+        for rid in readers:
+            try:
+                online = bool(cp.is_online(rid))
+            except Exception as exc:
+                _LOGGER.debug("is_online failed for reader %s: %s", rid, exc)
+                online = False
+
+            if not online:
+                self._pd_ids.pop(rid, None)
+                data[rid] = ReaderStatus(False)
+                continue
+
+            pd_id = self._pd_ids.get(rid)
+            if pd_id is None:
+                try:
+                    pd_id = cp.get_pd_id(rid)
+                except Exception as exc:
+                    _LOGGER.debug("get_pd_id failed for reader %s: %s", rid, exc)
+                    pd_id = None
+                if pd_id:
+                    self._pd_ids[rid] = pd_id
+                else:
+                    pd_id = None
+            data[rid] = ReaderStatus(True, pd_id)
+        return data
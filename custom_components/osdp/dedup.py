@@ -0,0 +1,73 @@
+"""Suppression of repeated card reads from a card held against a reader."""
+from __future__ import annotations
+
+from collections import OrderedDict
+import time
+from typing import Any
+
+# Distinct cards remembered per reader; older entries are evicted first
+MAX_TAGS_PER_READER = 16
+
+
+class ReadDeduplicator:
+    """Time-windowed per-reader cache of recently read cards.
+
+    A read is suppressed when the same card was seen on the same reader
+    less than ``window`` seconds before. Every read, suppressed or not,
+    refreshes the card's timestamp, so a card held against the reader
+    stays quiet until it has been away for a full window. Only called from
+    libosdp's refresh thread; a window of 0 turns suppression off.
+    """
+
+    def __init__(self, window: float = 0.0, max_tags: int = MAX_TAGS_PER_READER) -> None:
+        self.window = window
+        self._max_tags = max_tags
+        # reader address -> card data -> last seen, oldest first
+        self._seen: dict[int, OrderedDict[bytes, float]] = {}
+        self.passed = 0
+        self.suppressed = 0
+        self.suppressed_by_reader: dict[int, int] = {}
+
+    def configure(self, window: float) -> None:
+        self.window = window
+        if not window:
+            self._seen = {}
+
+    def is_duplicate(self, address: int, data: bytes) -> bool:
+        """Record a read and return True if it repeats a recent one."""
+        window = self.window
+        if not window:
+            self.passed += 1
+            return False
+        now = time.monotonic()
+        seen = self._seen.get(address)
+        if seen is None:
+            seen = self._seen[address] = OrderedDict()
+        else:
+            # Entries are ordered by last seen: drop the expired head
+            while seen:
+                oldest = next(iter(seen.values()))
+                if now - oldest < window:
+                    break
+                seen.popitem(last=False)
+
+        duplicate = data in seen
+        seen[data] = now
+        seen.move_to_end(data)
+        if len(seen) > self._max_tags:
+            seen.popitem(last=False)
+
+        if duplicate:
+            self.suppressed += 1
+            self.suppressed_by_reader[address] = self.suppressed_by_reader.get(address, 0) + 1
+        else:
+            self.passed += 1
+        return duplicate
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "dedup_window": self.window,
+            "reads_passed": self.passed,
+            "reads_suppressed": self.suppressed,
+            "reads_suppressed_by_reader": dict(self.suppressed_by_reader),
+        }
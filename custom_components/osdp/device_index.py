@@ -0,0 +1,68 @@
+"""Reader address to Home Assistant device id index for one OSDP bus."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from homeassistant.core import CALLBACK_TYPE, Context, Event, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+
+from .const import DOMAIN, EVENT_USER_ID
+
+
+class ReaderDeviceIndex:
+    """Resolve a reader (PD) address to a device id with a single dict lookup.
+
+    Built once at setup and kept current from device registry update events,
+    so the event path never touches the registry.
+    """
+
+    def __init__(self, hass: HomeAssistant, port: str) -> None:
+        self._hass = hass
+        self._prefix = f"reader_{port}_"
+        self._devices: dict[int, str] = {}
+        # Shared by every event fired for this bus
+        self.context = Context(user_id=EVENT_USER_ID)
+
+    def get(self, address: int) -> str | None:
+        """Return the device id for a reader, if it is registered."""
+        return self._devices.get(address)
+
+    @callback
+    def async_rebuild(self, readers: Iterable[int]) -> None:
+        """Resolve every configured reader against the device registry."""
+        devreg = dr.async_get(self._hass)
+        devices: dict[int, str] = {}
+        for rid in readers:
+            dev = devreg.async_get_device({(DOMAIN, f"{self._prefix}{rid}")})
+            if dev is not None:
+                devices[rid] = dev.id
+        self._devices = devices
+
+    @callback
+    def async_listen(self) -> CALLBACK_TYPE:
+        """Follow device registry changes; returns the unsubscribe callback."""
+        return self._hass.bus.async_listen(
+            dr.EVENT_DEVICE_REGISTRY_UPDATED, self._async_registry_updated
+        )
+
+    @callback
+    def _async_registry_updated(self, event: Event) -> None:
+        action = event.data["action"]
+        device_id = event.data["device_id"]
+
+        if action == "remove":
+            for rid, dev_id in list(self._devices.items()):
+                if dev_id == device_id:
+                    del self._devices[rid]
+            return
+
+        dev = dr.async_get(self._hass).async_get(device_id)
+        if dev is None:
+            return
+        for ident_domain, ident in dev.identifiers:
+            if ident_domain == DOMAIN and ident.startswith(self._prefix):
+                try:
+                    rid = int(ident[len(self._prefix):])
+                except ValueError:
+                    continue
+                self._devices[rid] = device_id
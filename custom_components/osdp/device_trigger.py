@@ -13,7 +13,7 @@ from homeassistant.helpers.typing import ConfigType
 from .const import DOMAIN
 
 # Supported trigger types
-TRIGGER_TYPES = {"tag_scanned"}
+TRIGGER_TYPES = {"tag_scanned", "pin_entered", "card_and_pin"}
 
 TRIGGER_SCHEMA = DEVICE_TRIGGER_BASE_SCHEMA.extend(
     {
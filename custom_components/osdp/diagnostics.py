@@ -0,0 +1,46 @@
+"""Diagnostics download for the OSDP integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_ACCESS_FILE, DOMAIN
+
+TO_REDACT = {CONF_ACCESS_FILE}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return the configuration and the runtime metrics of every bus."""
+    domain_data = hass.data[DOMAIN][entry.entry_id]
+    buses: dict[str, Any] = {}
+    store = domain_data["readers"]
+    for port, runtime in domain_data["buses"].items():
+        bus = runtime["bus"]
+        buses[port] = {
+            "baudrate": bus.baudrate,
+            "readers": bus.readers,
+            "state": bus.state,
+            "running": bus.cp is not None,
+            "worker": bus.worker,
+            "worker_restarts": bus.worker_restarts,
+            "last_reconfigure_gap_ms": (
+                round(bus.last_reconfigure_gap * 1000) if bus.last_reconfigure_gap is not None else None
+            ),
+            "reader_status": {rid: state.as_dict() for rid, state in store.readers.get(port, {}).items()},
+            "wire": bus.metrics.as_dict(buckets=True),
+            "bridge": {**runtime["bridge"].as_dict(), "loop_latency": runtime["bridge"].latency.as_dict(True)},
+            "commands": bus.commands.as_dict(),
+            "dedup": bus.dedup.as_dict(),
+            "scheduler": bus.scheduler.as_dict(),
+            "file_transfers": runtime["transfers"].as_dict(),
+        }
+    return {
+        "data": dict(entry.data),
+        "options": async_redact_data(dict(entry.options), TO_REDACT),
+        "access_list": domain_data["access"].as_dict(),
+        "startup": domain_data["startup"],
+        "buses": buses,
+    }
@@ -0,0 +1,155 @@
+"""Discovery of the PDs on a bus with raw osdp_ID probes."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+_MARK = 0xFF
+_SOM = 0x53
+_CTRL_CRC = 0x04
+_CMD_ID = 0x61
+_REPLY_PDID = 0x45
+BROADCAST_ADDRESS = 0x7F
+MAX_ADDRESS = 126
+
+# A PD answers within a few ms; allow some slack on top of the wire time.
+_REPLY_SLACK = 0.04
+# Wait for the broadcast probe, which every PD on the line answers
+_BROADCAST_TIMEOUT = 0.2
+# Header (5) + reply code + PDID data (12) + CRC (2)
+_PDID_REPLY_LEN = 20
+
+
+def _crc_table() -> tuple[int, ...]:
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else crc << 1
+        table.append(crc & 0xFFFF)
+    return tuple(table)
+
+
+_CRC_TABLE = _crc_table()
+
+
+def crc16(data: bytes) -> int:
+    """CRC-16/AUG-CCITT as used by OSDP (poly 0x1021, init 0x1D0F)."""
+    crc = 0x1D0F
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC_TABLE[(crc >> 8) ^ byte]
+    return crc
+
+
+def id_command(address: int) -> bytes:
+    """osdp_ID (standard report) to one address, sequence 0, with CRC."""
+    body = bytes((_SOM, address, 9, 0, _CTRL_CRC, _CMD_ID, 0x00))
+    crc = crc16(body)
+    return bytes((_MARK,)) + body + bytes((crc & 0xFF, crc >> 8))
+
+
+@dataclass(slots=True, frozen=True)
+class DiscoveredPD:
+    """A PD that answered osdp_ID."""
+
+    address: int
+    baudrate: int
+    vendor_code: str
+    model: int
+    version: int
+    serial_number: int
+    firmware: str
+
+    @property
+    def label(self) -> str:
+        return (
+            f"{self.address} @ {self.baudrate} baud: vendor {self.vendor_code}, "
+            f"model {self.model:02X}/{self.version:02X}, serial {self.serial_number:08X}, "
+            f"firmware {self.firmware}"
+        )
+
+
+def parse_pdid(buf: bytes, baudrate: int) -> DiscoveredPD | None:
+    """Parse the first valid osdp_PDID reply in ``buf``."""
+    start = buf.find(_SOM)
+    while start != -1 and len(buf) - start >= _PDID_REPLY_LEN:
+        frame = buf[start:start + _PDID_REPLY_LEN]
+        length = frame[2] | frame[3] << 8
+        if (
+            length == _PDID_REPLY_LEN
+            and frame[1] & 0x80
+            and frame[5] == _REPLY_PDID
+            and crc16(frame[:-2]) == frame[-2] | frame[-1] << 8
+        ):
+            data = frame[6:18]
+            return DiscoveredPD(
+                address=frame[1] & 0x7F,
+                baudrate=baudrate,
+                vendor_code=":".join(f"{b:02X}" for b in data[0:3]),
+                model=data[3],
+                version=data[4],
+                serial_number=int.from_bytes(data[5:9], "little"),
+                firmware=f"{data[9]}.{data[10]}.{data[11]}",
+            )
+        start = buf.find(_SOM, start + 1)
+    return None
+
+
+def _probe(channel, address: int, timeout: float) -> bytes:
+    """Send osdp_ID and collect whatever comes back within ``timeout``."""
+    while channel.read(256):
+        pass  # stale bytes from before the probe
+    channel.write(id_command(address))
+    channel.flush()
+    received = bytearray()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        received += channel.read(256)
+        if len(received) >= _PDID_REPLY_LEN and parse_pdid(bytes(received), 0) is not None:
+            break
+    return bytes(received)
+
+
+def scan_bus(
+    channel,
+    baudrates: Iterable[int],
+    addresses: Iterable[int] = range(MAX_ADDRESS + 1),
+    progress: Callable[[float], None] | None = None,
+) -> list[DiscoveredPD]:
+    """Probe every address at every baudrate on an open channel. Blocks.
+
+    Each speed is first checked with one broadcast osdp_ID: PDs configured
+    for it answer (possibly colliding, which still shows the speed is in
+    use), and speeds where nothing answers are skipped without probing
+    the addresses one by one. The line is half duplex, so the probes at
+    one speed are necessarily sequential; each only waits for the wire
+    time of the exchange plus a short slack.
+    """
+    baudrates = list(baudrates)
+    addresses = list(addresses)
+    found: dict[int, DiscoveredPD] = {}
+    for step, baudrate in enumerate(baudrates):
+        channel.set_speed(baudrate)
+        if progress is not None:
+            progress(step / len(baudrates))
+        if not _probe(channel, BROADCAST_ADDRESS, _BROADCAST_TIMEOUT):
+            _LOGGER.debug("No PD answers at %s baud", baudrate)
+            continue
+
+        timeout = (len(id_command(0)) + _PDID_REPLY_LEN) * 10 / baudrate + _REPLY_SLACK
+        for done, address in enumerate(addresses):
+            if address in found:
+                continue
+            pd = parse_pdid(_probe(channel, address, timeout), baudrate)
+            if pd is not None and pd.address == address:
+                _LOGGER.debug("Discovered %s", pd.label)
+                found[address] = pd
+            if progress is not None and done % 8 == 0:
+                progress((step + done / len(addresses)) / len(baudrates))
+    if progress is not None:
+        progress(1.0)
+    return sorted(found.values(), key=lambda pd: pd.address)
@@ -0,0 +1,25 @@
+"""Base entity for the per-reader entities of the OSDP integration."""
+from __future__ import annotations
+
+from homeassistant.helpers.entity import Entity
+
+from .reader_state import ReaderState, ReaderStateStore
+
+
+class OSDPReaderEntity(Entity):
+    """Entity showing one field of a reader's state.
+
+    The state is written only when the store reports that field changed,
+    not on every coordinator update of the bus.
+    """
+
+    _attr_should_poll = False
+
+    def __init__(self, store: ReaderStateStore, reader: ReaderState, field: str) -> None:
+        self._store = store
+        self._reader = reader
+        self._field = field
+        self._attr_device_info = reader.device_info
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(self._store.async_listen(self._reader, self._field, self.async_write_ha_state))
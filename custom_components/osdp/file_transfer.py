@@ -0,0 +1,273 @@
+"""File (firmware) transfers to readers through libosdp's file transfer support."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+import mmap
+import os
+import time
+from typing import Any
+
+import osdp
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .bus import OSDPBus
+from .const import FILE_TRANSFER_MAX_ATTEMPTS, FILE_TRANSFER_POLL_INTERVAL
+from .device_index import ReaderDeviceIndex
+
+_LOGGER = logging.getLogger(__name__)
+
+_COMMAND_FILE_TRANSFER = getattr(osdp.Command, "FileTransfer", None)
+FILE_TRANSFER_SUPPORTED = _COMMAND_FILE_TRANSFER is not None and hasattr(
+    osdp.ControlPanel, "register_file_ops"
+)
+
+# libosdp reports no status until the queued command has gone out
+_START_GRACE = 5.0
+
+STATE_RUNNING = "running"
+STATE_INTERRUPTED = "interrupted"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+
+class MmapFileSource:
+    """Read-only file ops over a memory-mapped file.
+
+    libosdp pulls chunks with ``read(size, offset)`` from its refresh
+    thread as the transfer advances; each chunk is sliced straight out of
+    the mapping (one copy, into the bytes handed back), so the image is
+    never read into memory as a whole and readers on several buses share
+    the same page cache.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            # mmap cannot map an empty file, and there is nothing to send
+            if not os.fstat(file.fileno()).st_size:
+                raise ValueError("the file is empty")
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self.size = len(self._map)
+
+    def open(self, file_id: int, *_: Any) -> int:
+        return self.size
+
+    def read(self, size: int, offset: int) -> bytes:
+        return self._view[offset:offset + size].tobytes()
+
+    def write(self, data: bytes, offset: int) -> int:
+        return -1  # outgoing transfers only
+
+    def close(self, *_: Any) -> int:
+        return 0
+
+    def release(self) -> None:
+        self._view.release()
+        self._map.close()
+
+
+@dataclass(slots=True)
+class FileTransfer:
+    """Progress of one transfer to one reader."""
+
+    address: int
+    source: MmapFileSource
+    file_id: int
+    state: str = STATE_RUNNING
+    offset: int = 0
+    attempts: int = 0
+    started: float = 0.0
+    finished: float | None = None
+
+    @property
+    def active(self) -> bool:
+        return self.state in (STATE_RUNNING, STATE_INTERRUPTED)
+
+    def as_dict(self) -> dict[str, Any]:
+        elapsed = (self.finished or time.monotonic()) - self.started
+        return {
+            "state": self.state,
+            "file_id": self.file_id,
+            "size": self.source.size,
+            "offset": self.offset,
+            "progress": round(100 * self.offset / self.source.size, 1) if self.source.size else 100.0,
+            "bytes_per_second": round(self.offset / elapsed) if elapsed > 0 else None,
+            "attempts": self.attempts,
+        }
+
+
+class FileTransferManager:
+    """File transfers on one bus.
+
+    libosdp sends the file from the bus's refresh thread, interleaved with
+    the regular polls, so card reads keep flowing during a transfer and
+    each bus transfers independently of the others. Progress is polled
+    every few seconds in the executor and each change is fired as an
+    ``osdp_file_transfer`` event. A transfer cut short (reader
+    offline, NAKed chunk) is started again once the reader is back, up to
+    FILE_TRANSFER_MAX_ATTEMPTS times; libosdp has no way to resume at an
+    offset, so a retry sends the file from the start.
+    """
+
+    def __init__(self, hass: HomeAssistant, bus: OSDPBus, index: ReaderDeviceIndex) -> None:
+        self._hass = hass
+        self._bus = bus
+        self._index = index
+        self.transfers: dict[int, FileTransfer] = {}
+        self._unsub_poll: CALLBACK_TYPE | None = None
+
+    async def async_start(self, readers: list[int], path: str, file_id: int) -> None:
+        """Start sending ``path`` to ``readers``; returns once started."""
+        source = await self._hass.async_add_executor_job(MmapFileSource, path)
+        transfers = []
+        for address in readers:
+            current = self.transfers.get(address)
+            if current is not None and current.active:
+                _LOGGER.warning("Reader %s on %s is already receiving a file", address, self._bus.port)
+                continue
+            transfers.append(FileTransfer(address, source, file_id))
+        if not transfers:
+            source.release()
+            return
+        for transfer in transfers:
+            self.transfers[transfer.address] = transfer
+        await self._hass.async_add_executor_job(self._begin, transfers)
+        for transfer in transfers:
+            self._async_fire(transfer)
+        if self._unsub_poll is None:
+            self._unsub_poll = async_track_time_interval(
+                self._hass, self._async_poll, FILE_TRANSFER_POLL_INTERVAL
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop tracking transfers; the files stay mapped until async_release."""
+        if self._unsub_poll is not None:
+            self._unsub_poll()
+            self._unsub_poll = None
+        for transfer in self.transfers.values():
+            if transfer.active:
+                transfer.state = STATE_FAILED
+
+    @callback
+    def async_release(self) -> None:
+        """Unmap the files of stopped transfers.
+
+        Only once the bus has stopped: until then libosdp's refresh thread
+        may still read a chunk through the registered file ops.
+        """
+        self._release_unused()
+
+    def _begin(self, transfers: list[FileTransfer]) -> None:
+        """Hand the file ops to libosdp and queue the transfer command."""
+        cp = self._bus.cp
+        for transfer in transfers:
+            transfer.attempts += 1
+            transfer.offset = 0
+            transfer.started = time.monotonic()
+            if cp is None:
+                transfer.state = STATE_INTERRUPTED
+                continue
+            if self._bus.worker:
+                _LOGGER.error(
+                    "Reader %s cannot take file transfers while its bus runs in a worker process",
+                    transfer.address,
+                )
+                transfer.state = STATE_FAILED
+                continue
+            try:
+                cp.register_file_ops(transfer.address, transfer.source)
+            except Exception as exc:
+                _LOGGER.error("Reader %s cannot take file transfers: %s", transfer.address, exc)
+                transfer.state = STATE_FAILED
+                continue
+            queued = self._bus.commands.submit(
+                transfer.address,
+                {"command": _COMMAND_FILE_TRANSFER, "id": transfer.file_id, "flags": 0},
+            )
+            # A bus that is not running is retried like an offline reader
+            transfer.state = STATE_RUNNING if queued else STATE_INTERRUPTED
+
+    def _poll(self) -> list[FileTransfer]:
+        """Update progress from libosdp and retry interrupted transfers; executor."""
+        cp = self._bus.cp
+        changed = []
+        retry = []
+        # A snapshot: async_start adds transfers on the loop meanwhile
+        for transfer in list(self.transfers.values()):
+            if not transfer.active:
+                continue
+            previous = (transfer.state, transfer.offset)
+            if transfer.state == STATE_RUNNING:
+                try:
+                    status = cp.get_file_tx_status(transfer.address) if cp is not None else None
+                except Exception:
+                    status = None
+                # Only a status for a file of our size is our transfer
+                ours = bool(status) and status.get("size") == transfer.source.size
+                if ours:
+                    transfer.offset = status.get("offset", transfer.offset)
+                if transfer.offset >= transfer.source.size:
+                    transfer.state = STATE_DONE
+                    transfer.finished = time.monotonic()
+                elif not ours and time.monotonic() - transfer.started > _START_GRACE:
+                    # No transfer in progress any more, yet not complete
+                    transfer.state = STATE_INTERRUPTED
+            if transfer.state == STATE_INTERRUPTED:
+                if transfer.attempts >= FILE_TRANSFER_MAX_ATTEMPTS:
+                    transfer.state = STATE_FAILED
+                    transfer.finished = time.monotonic()
+                elif cp is not None and self._is_online(cp, transfer.address):
+                    retry.append(transfer)
+            if (transfer.state, transfer.offset) != previous:
+                changed.append(transfer)
+        if retry:
+            self._begin(retry)
+            changed.extend(t for t in retry if t not in changed)
+        return changed
+
+    def _is_online(self, cp: Any, address: int) -> bool:
+        try:
+            return bool(cp.is_online(address))
+        except (ConnectionError, TimeoutError) as exc:
+            # Worker restarting: try again on the next poll
+            _LOGGER.debug("Cannot tell whether reader %s on %s is online: %s", address, self._bus.port, exc)
+            return False
+
+    async def _async_poll(self, _now: datetime) -> None:
+        changed = await self._hass.async_add_executor_job(self._poll)
+        for transfer in changed:
+            self._async_fire(transfer)
+        if not any(transfer.active for transfer in self.transfers.values()):
+            if self._unsub_poll is not None:
+                self._unsub_poll()
+                self._unsub_poll = None
+            self._release_unused()
+
+    def _release_unused(self) -> None:
+        active = {id(t.source) for t in self.transfers.values() if t.active}
+        for transfer in self.transfers.values():
+            if id(transfer.source) not in active:
+                try:
+                    transfer.source.release()
+                except (BufferError, ValueError):
+                    pass
+
+    @callback
+    def _async_fire(self, transfer: FileTransfer) -> None:
+        self._hass.bus.async_fire(
+            "osdp_file_transfer",
+            {
+                "device_id": self._index.get(transfer.address),
+                "port": self._bus.port,
+                "reader": transfer.address,
+                **transfer.as_dict(),
+            },
+        )
+
+    def as_dict(self) -> dict[int, dict[str, Any]]:
+        return {address: transfer.as_dict() for address, transfer in self.transfers.items()}
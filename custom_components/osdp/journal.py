@@ -0,0 +1,321 @@
+"""Persistent journal of card reads in an SQLite database."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Sequence
+from datetime import datetime
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.const import ATTR_DEVICE_ID, EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    JOURNAL_BATCH_SIZE,
+    JOURNAL_FILE,
+    JOURNAL_FLUSH_INTERVAL,
+    JOURNAL_MAX_ROWS,
+    JOURNAL_PRUNE_INTERVAL,
+    JOURNAL_RETENTION,
+    SERVICE_QUERY_JOURNAL,
+)
+from .services import async_resolve_readers
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_JOURNAL = "osdp_journal"
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS reads (
+        id INTEGER PRIMARY KEY,
+        ts REAL NOT NULL,
+        port TEXT NOT NULL,
+        reader INTEGER NOT NULL,
+        tag_id INTEGER NOT NULL,
+        format TEXT,
+        bits INTEGER,
+        facility_code INTEGER,
+        card_number INTEGER,
+        access TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS reads_ts ON reads (ts)",
+    "CREATE INDEX IF NOT EXISTS reads_reader_ts ON reads (port, reader, ts)",
+    "CREATE INDEX IF NOT EXISTS reads_tag_ts ON reads (tag_id, ts)",
+)
+_INSERT = (
+    "INSERT INTO reads (ts, port, reader, tag_id, format, bits, facility_code, card_number, access)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_COLUMNS = ("ts", "port", "reader", "tag_id", "format", "bits", "facility_code", "card_number", "access")
+
+
+def _tag_key(tag_id: int) -> int | str:
+    """SQLite integers are 64-bit signed; longer raw reads are stored as hex
+    text, which (unlike decimal text) column affinity leaves alone."""
+    return tag_id if tag_id < 1 << 63 else hex(tag_id)
+
+
+def _tag_id(value: int | str) -> int:
+    return value if isinstance(value, int) else int(value, 16)
+
+
+class AccessJournal:
+    """Append-only journal of card reads, shared by all entries.
+
+    Reads are buffered on the loop and written in one transaction per
+    batch from the executor, either every few seconds or as soon as a
+    batch fills up. The database runs in WAL mode so queries do not block
+    writes. Rows older than the retention period, and the oldest rows
+    beyond the row limit, are pruned periodically.
+    """
+
+    def __init__(self, hass: HomeAssistant, path: str) -> None:
+        self._hass = hass
+        self._path = path
+        self._conn: sqlite3.Connection | None = None
+        # The connection is used from executor threads, one at a time
+        self._lock = threading.Lock()
+        self._pending: list[tuple] = []
+        self._flush_scheduled: CALLBACK_TYPE | None = None
+        # Write in flight, awaited by anyone flushing meanwhile
+        self._flush_task: asyncio.Task | None = None
+        self._unsub_prune: CALLBACK_TYPE | None = None
+        self.written = 0
+
+    def _open(self) -> None:
+        conn = sqlite3.connect(self._path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+        self._conn = conn
+
+    async def async_open(self) -> None:
+        await self._hass.async_add_executor_job(self._open)
+        self._unsub_prune = async_track_time_interval(self._hass, self._async_prune, JOURNAL_PRUNE_INTERVAL)
+
+    async def async_close(self, *_: Any) -> None:
+        if self._unsub_prune is not None:
+            self._unsub_prune()
+            self._unsub_prune = None
+        await self.async_flush()
+        await self._hass.async_add_executor_job(self._close)
+
+    def _close(self) -> None:
+        with self._lock:
+            conn, self._conn = self._conn, None
+            if conn is not None:
+                conn.close()
+
+    @callback
+    def async_record(self, port: str, reader: int, tag_id: int, event_data: dict[str, Any]) -> None:
+        """Buffer one card read; written with the next batch."""
+        self._pending.append(
+            (
+                time.time(),
+                port,
+                reader,
+                _tag_key(tag_id),
+                event_data["format"],
+                event_data["bits"],
+                event_data["facility_code"],
+                event_data["card_number"],
+                event_data["access"],
+            )
+        )
+        if len(self._pending) >= JOURNAL_BATCH_SIZE:
+            self._hass.async_create_task(self.async_flush())
+        elif self._flush_scheduled is None:
+            self._flush_scheduled = async_call_later(self._hass, JOURNAL_FLUSH_INTERVAL, self._async_flush_later)
+
+    async def _async_flush_later(self, _now: datetime) -> None:
+        self._flush_scheduled = None
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Write the buffered reads in one transaction off the loop.
+
+        Returns once every read buffered before the call is written,
+        including those of a flush already in flight.
+        """
+        while self._flush_task is not None:
+            # Shielded: a cancelled caller must not cancel the write
+            await asyncio.shield(self._flush_task)
+        if not self._pending or self._conn is None:
+            return
+        if self._flush_scheduled is not None:
+            self._flush_scheduled()
+            self._flush_scheduled = None
+        rows, self._pending = self._pending, []
+        self._flush_task = self._hass.async_create_task(self._async_write(rows))
+        await asyncio.shield(self._flush_task)
+        if len(self._pending) >= JOURNAL_BATCH_SIZE:
+            self._hass.async_create_task(self.async_flush())
+        elif self._pending and self._flush_scheduled is None:
+            self._flush_scheduled = async_call_later(self._hass, JOURNAL_FLUSH_INTERVAL, self._async_flush_later)
+
+    async def _async_write(self, rows: list[tuple]) -> None:
+        try:
+            await self._hass.async_add_executor_job(self._write, rows)
+        except sqlite3.Error as exc:
+            _LOGGER.error("Writing %d reads to the OSDP journal failed: %s", len(rows), exc)
+        finally:
+            self._flush_task = None
+
+    def _write(self, rows: list[tuple]) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+            with self._conn:
+                self._conn.executemany(_INSERT, rows)
+        self.written += len(rows)
+
+    async def _async_prune(self, _now: datetime | None = None) -> None:
+        try:
+            removed = await self._hass.async_add_executor_job(self._prune)
+        except sqlite3.Error as exc:
+            _LOGGER.error("Pruning the OSDP journal failed: %s", exc)
+            return
+        if removed:
+            _LOGGER.debug("Pruned %d reads from the OSDP journal", removed)
+
+    def _prune(self) -> int:
+        cutoff = time.time() - JOURNAL_RETENTION.total_seconds()
+        with self._lock:
+            if self._conn is None:
+                return 0
+            with self._conn:
+                removed = self._conn.execute("DELETE FROM reads WHERE ts < ?", (cutoff,)).rowcount
+                # ids only grow, so the row limit keeps the newest ids
+                removed += self._conn.execute(
+                    "DELETE FROM reads WHERE id <= (SELECT MAX(id) FROM reads) - ?", (JOURNAL_MAX_ROWS,)
+                ).rowcount
+        return removed
+
+    async def async_query(
+        self,
+        readers: Sequence[tuple[str, int]] | None = None,
+        tag_id: int | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 100,
+    ) -> list[dict[str, Any]]:
+        """Return the newest matching reads, newest first."""
+        # Includes reads buffered or being written right now
+        await self.async_flush()
+        clauses: list[str] = []
+        params: list[Any] = []
+        if readers:
+            clauses.append("(" + " OR ".join("(port = ? AND reader = ?)" for _ in readers) + ")")
+            for port, reader in readers:
+                params.extend((port, reader))
+        if tag_id is not None:
+            clauses.append("tag_id = ?")
+            params.append(_tag_key(tag_id))
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(start.timestamp())
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(end.timestamp())
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM reads"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY ts DESC LIMIT ?"
+        params.append(limit)
+        rows = await self._hass.async_add_executor_job(self._select, sql, params)
+        return [
+            {
+                **dict(zip(_COLUMNS, row)),
+                "ts": dt_util.utc_from_timestamp(row[0]).isoformat(),
+                "tag_id": _tag_id(row[3]),
+            }
+            for row in rows
+        ]
+
+    def _select(self, sql: str, params: list[Any]) -> list[tuple]:
+        with self._lock:
+            if self._conn is None:
+                return []
+            return self._conn.execute(sql, params).fetchall()
+
+
+# Filters shared by the query service and the websocket command
+QUERY_FIELDS = {
+    vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("tag_id"): vol.Coerce(int),
+    vol.Optional("start"): cv.datetime,
+    vol.Optional("end"): cv.datetime,
+    vol.Optional("limit", default=100): vol.All(vol.Coerce(int), vol.Range(min=1, max=10000)),
+}
+
+
+async def async_query_journal(hass: HomeAssistant, data: dict[str, Any]) -> list[dict[str, Any]]:
+    """Run a query given validated QUERY_FIELDS data."""
+    readers = None
+    if ATTR_DEVICE_ID in data:
+        readers = [
+            reader
+            for entry_readers in async_resolve_readers(hass, data[ATTR_DEVICE_ID]).values()
+            for reader in entry_readers
+        ]
+    start = data.get("start")
+    end = data.get("end")
+    return await hass.data[DATA_JOURNAL].async_query(
+        readers,
+        data.get("tag_id"),
+        dt_util.as_utc(start) if start else None,
+        dt_util.as_utc(end) if end else None,
+        data["limit"],
+    )
+
+
+@websocket_api.websocket_command({vol.Required("type"): "osdp/journal", **QUERY_FIELDS})
+@websocket_api.async_response
+async def websocket_query_journal(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict) -> None:
+    """Return journaled card reads."""
+    try:
+        reads = await async_query_journal(hass, msg)
+    except ServiceValidationError as exc:
+        connection.send_error(msg["id"], websocket_api.ERR_INVALID_FORMAT, str(exc))
+        return
+    connection.send_result(msg["id"], {"reads": reads})
+
+
+async def async_setup_journal(hass: HomeAssistant) -> AccessJournal:
+    """Open the shared journal and register its query service and command."""
+    journal = hass.data[DATA_JOURNAL] = AccessJournal(hass, hass.config.path(JOURNAL_FILE))
+    await journal.async_open()
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, journal.async_close)
+
+    async def _async_query(call: ServiceCall) -> ServiceResponse:
+        return {"reads": await async_query_journal(hass, call.data)}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_JOURNAL,
+        _async_query,
+        schema=vol.Schema(QUERY_FIELDS),
+        supports_response=SupportsResponse.ONLY,
+    )
+    websocket_api.async_register_command(hass, websocket_query_journal)
+    return journal
@@ -0,0 +1,86 @@
+"""Assembly of keypad presses into PIN entries."""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+# OSDP sends '#' as 0x0D and '*' as 0x7F; some readers send them as ASCII
+KEYS_ENTER = frozenset((0x0D, 0x23))
+KEYS_CLEAR = frozenset((0x7F, 0x2A))
+
+# Event kind handed to the bridge for a completed entry
+KEYPAD_EVENT = "keypad"
+
+
+class _Entry:
+    __slots__ = ("digits", "last_key", "card", "card_at")
+
+    def __init__(self) -> None:
+        self.digits = bytearray()
+        self.last_key = 0.0
+        self.card: dict | None = None
+        self.card_at = 0.0
+
+
+class KeypadAssembler:
+    """Per-reader PIN buffers, fed from libosdp's refresh thread.
+
+    Digits are appended to the reader's buffer until the terminator key or
+    ``max_length`` digits complete the entry; ``*`` clears it and a pause
+    longer than ``timeout`` between keys discards it. Timeouts are checked
+    when the next key arrives, so each key is O(1) work with no timers and
+    nothing is sent on the bus. A completed entry within ``card_window``
+    seconds of a card read on the same reader is reported together with
+    that card.
+    """
+
+    def __init__(self, timeout: float, max_length: int, card_window: float) -> None:
+        self.timeout = timeout
+        self.max_length = max_length
+        self.card_window = card_window
+        self._entries: dict[int, _Entry] = {}
+
+    def configure(self, timeout: float, max_length: int) -> None:
+        self.timeout = timeout
+        self.max_length = max_length
+
+    def _entry(self, address: int) -> _Entry:
+        entry = self._entries.get(address)
+        if entry is None:
+            entry = self._entries[address] = _Entry()
+        return entry
+
+    def on_card(self, address: int, event: dict) -> None:
+        """Remember a card read so a PIN typed next can be paired with it."""
+        entry = self._entry(address)
+        entry.card = event
+        entry.card_at = time.monotonic()
+        entry.digits.clear()
+
+    def on_keys(self, address: int, keys: bytes) -> list[dict[str, Any]]:
+        """Feed key presses; return the entries they complete, in order."""
+        now = time.monotonic()
+        entry = self._entry(address)
+        if entry.digits and now - entry.last_key > self.timeout:
+            entry.digits.clear()
+        entry.last_key = now
+
+        completed = []
+        for key in keys:
+            if key in KEYS_CLEAR:
+                entry.digits.clear()
+                continue
+            if key not in KEYS_ENTER:
+                if not 0x30 <= key <= 0x39:
+                    continue
+                entry.digits.append(key)
+                if len(entry.digits) < self.max_length:
+                    continue
+            if not entry.digits:
+                continue
+            # Complete: the terminator, or the longest PIN allowed
+            card = entry.card if entry.card is not None and now - entry.card_at <= self.card_window else None
+            completed.append({"event": KEYPAD_EVENT, "pd": address, "pin": entry.digits.decode(), "card": card})
+            entry.digits.clear()
+            entry.card = None
+        return completed
@@ -0,0 +1,259 @@
+"""Fixed-size latency histograms and per-bus/per-reader counters."""
+from __future__ import annotations
+
+from bisect import bisect_left
+import time
+from typing import Any
+
+from .discovery import crc16
+
+# Bucket upper bounds in seconds: 0.25 ms doubling up to ~8 s, plus overflow
+_BOUNDS = tuple(0.00025 * 2**i for i in range(16))
+
+_SOM = 0x53
+_BROADCAST = 0x7F
+
+# With profiling on, one callback in this many is timed
+PROFILE_SAMPLE_EVERY = 16
+
+
+class Histogram:
+    """Log-spaced histogram with a fixed number of buckets.
+
+    Recording is a bisect and two additions, so it is cheap enough for the
+    refresh thread. Percentiles are reported as the upper bound of the
+    bucket they fall in.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        self.counts[bisect_left(_BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def state(self) -> list:
+        return [list(self.counts), self.count, self.total, self.max]
+
+    def merge(self, state: list, since: list | None = None) -> None:
+        """Add the samples in another histogram's ``state`` that ``since`` lacks."""
+        counts, count, total, maximum = state
+        if since is not None:
+            counts = [now - before for now, before in zip(counts, since[0])]
+            count -= since[1]
+            total -= since[2]
+        self.counts = [mine + new for mine, new in zip(self.counts, counts)]
+        self.count += count
+        self.total += total
+        if maximum > self.max:
+            self.max = maximum
+
+    def percentile(self, fraction: float) -> float | None:
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(_BOUNDS, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self, buckets: bool = False) -> dict[str, Any]:
+        """Summary in milliseconds; with ``buckets``, the raw bucket counts."""
+
+        def _ms(value: float | None) -> float | None:
+            return None if value is None else round(value * 1000, 2)
+
+        summary = {
+            "count": self.count,
+            "mean_ms": _ms(self.total / self.count) if self.count else None,
+            "p50_ms": _ms(self.percentile(0.5)),
+            "p95_ms": _ms(self.percentile(0.95)),
+            "p99_ms": _ms(self.percentile(0.99)),
+            "max_ms": _ms(self.max) if self.count else None,
+        }
+        if buckets:
+            summary["buckets_ms"] = {
+                **{f"<={_ms(bound)}": count for bound, count in zip(_BOUNDS, self.counts)},
+                "overflow": self.counts[-1],
+            }
+        return summary
+
+
+class ReaderMetrics:
+    """Counters of one PD, as seen on the wire and in the callback."""
+
+    __slots__ = ("reply_latency", "timeouts", "crc_errors", "offline", "events")
+
+    def __init__(self) -> None:
+        self.reply_latency = Histogram()
+        self.timeouts = 0
+        self.crc_errors = 0
+        self.offline = 0
+        self.events = 0
+
+    def as_dict(self, buckets: bool = False) -> dict[str, Any]:
+        return {
+            "reply_latency": self.reply_latency.as_dict(buckets),
+            "timeouts": self.timeouts,
+            "crc_errors": self.crc_errors,
+            "offline_count": self.offline,
+            "events": self.events,
+        }
+
+
+class BusMetrics:
+    """Wire-level metrics of one bus, fed by its channel.
+
+    libosdp writes one command frame per ``write`` and waits for the reply
+    before addressing the next PD, so each write closes the previous
+    exchange: no reply bytes means a timeout, otherwise the reply frame is
+    counted and its CRC checked. The time from a write to the first reply
+    byte is the reply latency; the time between two writes to the same PD
+    is the poll cycle. Channel calls all come from the refresh thread.
+    """
+
+    def __init__(self) -> None:
+        self.frames_sent = 0
+        self.frames_received = 0
+        self.timeouts = 0
+        self.crc_errors = 0
+        self.poll_cycle = Histogram()
+        self.callback_time = Histogram()
+        self.callbacks = 0
+        self.profiling = False
+        self.readers: dict[int, ReaderMetrics] = {}
+        self._last_send: dict[int, float] = {}
+        # The worker state last loaded, what the next load is counted from
+        self._worker_state: dict[str, Any] | None = None
+        self._address: int | None = None
+        self._sent_at = 0.0
+        self._reply = bytearray()
+
+    def reader(self, address: int) -> ReaderMetrics:
+        metrics = self.readers.get(address)
+        if metrics is None:
+            metrics = self.readers[address] = ReaderMetrics()
+        return metrics
+
+    def on_write(self, data: bytes) -> None:
+        now = time.perf_counter()
+        self._settle()
+        start = data.find(_SOM)
+        if start == -1 or len(data) < start + 2:
+            return
+        address = data[start + 1] & 0x7F
+        self.frames_sent += 1
+        self._address = address
+        self._sent_at = now
+        if address == _BROADCAST:
+            return
+        last = self._last_send.get(address)
+        if last is not None:
+            self.poll_cycle.record(now - last)
+        self._last_send[address] = now
+
+    def on_read(self, data: bytes) -> None:
+        if self._address is None:
+            return
+        if not self._reply and self._address != _BROADCAST:
+            self.reader(self._address).reply_latency.record(time.perf_counter() - self._sent_at)
+        self._reply += data
+
+    def _settle(self) -> None:
+        """Account for the reply (or its absence) to the last command."""
+        address, self._address = self._address, None
+        if address is None or address == _BROADCAST:
+            self._reply.clear()
+            return
+        reader = self.reader(address)
+        reply = self._reply
+        if not reply:
+            self.timeouts += 1
+            reader.timeouts += 1
+            return
+        self.frames_received += 1
+        start = reply.find(_SOM)
+        if start != -1 and len(reply) >= start + 5:
+            frame = reply[start:]
+            length = frame[2] | frame[3] << 8
+            if frame[4] & 0x04 and len(frame) >= length >= 8:
+                if crc16(frame[:length - 2]) != frame[length - 2] | frame[length - 1] << 8:
+                    self.crc_errors += 1
+                    reader.crc_errors += 1
+        reply.clear()
+
+    def wire_state(self) -> dict[str, Any]:
+        """Raw wire-level state, for handing over from a worker process."""
+        return {
+            "frames_sent": self.frames_sent,
+            "frames_received": self.frames_received,
+            "timeouts": self.timeouts,
+            "crc_errors": self.crc_errors,
+            "poll_cycle": self.poll_cycle.state(),
+            "readers": {
+                address: [reader.reply_latency.state(), reader.timeouts, reader.crc_errors]
+                for address, reader in self.readers.items()
+            },
+        }
+
+    def load_wire_state(self, state: dict[str, Any], readers=None) -> None:
+        """Add what a worker's metrics counted since they were last loaded.
+
+        Each worker process counts from zero and tags its state with a
+        ``run`` of its own, so a restarted worker starts a new baseline and
+        the totals here keep growing. Readers not in ``readers`` are skipped,
+        so the metrics of removed readers stay forgotten.
+        """
+        last = self._worker_state
+        if last is not None and last["run"] != state["run"]:
+            last = None
+        self._worker_state = state
+        self.frames_sent += state["frames_sent"] - (last["frames_sent"] if last else 0)
+        self.frames_received += state["frames_received"] - (last["frames_received"] if last else 0)
+        self.timeouts += state["timeouts"] - (last["timeouts"] if last else 0)
+        self.crc_errors += state["crc_errors"] - (last["crc_errors"] if last else 0)
+        self.poll_cycle.merge(state["poll_cycle"], last["poll_cycle"] if last else None)
+        for address, (latency, timeouts, crc_errors) in state["readers"].items():
+            if readers is not None and address not in readers:
+                continue
+            before = last["readers"].get(address) if last else None
+            reader = self.reader(address)
+            if before is None:
+                reader.reply_latency.merge(latency)
+                reader.timeouts += timeouts
+                reader.crc_errors += crc_errors
+            else:
+                reader.reply_latency.merge(latency, before[0])
+                reader.timeouts += timeouts - before[1]
+                reader.crc_errors += crc_errors - before[2]
+
+    def forget(self, addresses) -> None:
+        """Drop the metrics of readers removed from the bus."""
+        for address in addresses:
+            self.readers.pop(address, None)
+            self._last_send.pop(address, None)
+
+    def as_dict(self, buckets: bool = False) -> dict[str, Any]:
+        data = {
+            "frames_sent": self.frames_sent,
+            "frames_received": self.frames_received,
+            "timeouts": self.timeouts,
+            "crc_errors": self.crc_errors,
+            "poll_cycle": self.poll_cycle.as_dict(buckets),
+            "callbacks": self.callbacks,
+            "profiling": self.profiling,
+            "readers": {address: metrics.as_dict(buckets) for address, metrics in sorted(self.readers.items())},
+        }
+        if self.callback_time.count:
+            data["callback_time"] = self.callback_time.as_dict(buckets)
+        return data
@@ -0,0 +1,226 @@
+"""Per-entry store of reader state shared by the entity platforms."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime
+import logging
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .vendor import OuiVendorIndex
+
+_LOGGER = logging.getLogger(__name__)
+
+# PD ID fields shown by the reader info sensors; each is a ReaderState slot
+# and the field name entities listen for
+PD_ID_FIELDS = ("version", "model", "vendor_code", "serial_number", "firmware_version")
+FIELD_ONLINE = "online"
+
+
+def format_pd_id_field(pd_info, field: str, vendors: OuiVendorIndex | None = None) -> str | None:
+    """Render one PD ID field the way the reader info sensors display it."""
+    tmpint = getattr(pd_info, field, None)
+    if tmpint is None:
+        return None
+    match field:
+        case "version" | "model":
+            return '{:0>2X}'.format(tmpint)
+        case "vendor_code":
+            # Vendor code is sent least significant byte first
+            oui = ((tmpint & 0xFF) << 16) | (tmpint & 0xFF00) | ((tmpint >> 16) & 0xFF)
+            if vendors is None:
+                return '{:0>6X}'.format(oui)
+            return vendors.resolve(oui)
+        case "serial_number":
+            if tmpint < 0:
+                tmpint = tmpint + 2**32
+            tmphex = '{:0>8X}'.format(tmpint)
+            return "%s%s%s%s" % (tmphex[6:8], tmphex[4:6], tmphex[2:4], tmphex[0:2])
+        case "firmware_version":
+            tmphex = '{:0>6X}'.format(tmpint)
+            return "%s.%s.%s" % (tmphex[0:2], tmphex[2:4], tmphex[4:6])
+    return None
+
+
+class ReaderState:
+    """Everything the entities of one reader show, kept in one place.
+
+    ``online`` is None until the reader was polled once. The PD ID fields
+    hold their rendered values and keep them while the reader is offline.
+    """
+
+    __slots__ = (
+        "port",
+        "address",
+        "device_info",
+        "online",
+        "last_online",
+        "last_offline",
+        "pd_id",
+        *PD_ID_FIELDS,
+        "last_event",
+        "last_event_at",
+        "reads",
+        "pins",
+    )
+
+    def __init__(self, port: str, address: int) -> None:
+        self.port = port
+        self.address = address
+        self.device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"reader_{port}_{address}")},
+            name=f"OSDP Reader {address}",
+            manufacturer="OSDP",
+            model="Card Reader",
+            via_device=(DOMAIN, f"controller_{port}"),
+        )
+        self.online: bool | None = None
+        self.last_online: datetime | None = None
+        self.last_offline: datetime | None = None
+        self.pd_id: Any | None = None
+        self.version: str | None = None
+        self.model: str | None = None
+        self.vendor_code: str | None = None
+        self.serial_number: str | None = None
+        self.firmware_version: str | None = None
+        self.last_event: str | None = None
+        self.last_event_at: datetime | None = None
+        self.reads = 0
+        self.pins = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "online": self.online,
+            "last_online": self.last_online.isoformat() if self.last_online else None,
+            "last_offline": self.last_offline.isoformat() if self.last_offline else None,
+            **{field: getattr(self, field) for field in PD_ID_FIELDS},
+            "last_event": self.last_event,
+            "last_event_at": self.last_event_at.isoformat() if self.last_event_at else None,
+            "reads": self.reads,
+            "pins": self.pins,
+        }
+
+
+class ReaderStateStore:
+    """Reader state of every bus of one entry, fed by the bus coordinators.
+
+    Each coordinator update is diffed into the ReaderState objects and only
+    the listeners of fields that changed are called, so an entity writes
+    its state when its own value changes rather than on every poll.
+    DeviceInfo of readers and controllers is built once here and shared.
+    """
+
+    def __init__(self, vendors: OuiVendorIndex | None = None) -> None:
+        self.vendors = vendors
+        # port -> address -> state
+        self.readers: dict[str, dict[int, ReaderState]] = {}
+        self.controllers: dict[str, DeviceInfo] = {}
+        self._listeners: dict[tuple[str, int, str], list[CALLBACK_TYPE]] = {}
+
+    @callback
+    def async_add_bus(
+        self, port: str, name: str, coordinator: DataUpdateCoordinator, readers: Iterable[int]
+    ) -> CALLBACK_TYPE:
+        """Track a bus and its readers; returns the coordinator unsubscribe."""
+        self.controllers[port] = DeviceInfo(
+            identifiers={(DOMAIN, f"controller_{port}")},
+            manufacturer="OSDP",
+            name=name,
+            model="OSDP Bus",
+        )
+        self.readers[port] = {}
+        self.async_set_readers(port, readers)
+
+        @callback
+        def _async_coordinator_updated() -> None:
+            self._async_apply(port, coordinator.data)
+
+        return coordinator.async_add_listener(_async_coordinator_updated)
+
+    @callback
+    def async_remove_bus(self, port: str) -> None:
+        self.controllers.pop(port, None)
+        self.readers.pop(port, None)
+
+    @callback
+    def async_set_readers(self, port: str, readers: Iterable[int]) -> None:
+        """Add state for new readers of a bus and drop that of removed ones."""
+        states = self.readers[port]
+        wanted = set(readers)
+        for address in [address for address in states if address not in wanted]:
+            del states[address]
+        for address in wanted:
+            if address not in states:
+                states[address] = ReaderState(port, address)
+
+    def get(self, port: str, address: int) -> ReaderState | None:
+        return self.readers.get(port, {}).get(address)
+
+    @callback
+    def async_listen(self, state: ReaderState, field: str, update: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Call ``update`` whenever ``field`` of the reader changes."""
+        key = (state.port, state.address, field)
+        self._listeners.setdefault(key, []).append(update)
+
+        @callback
+        def _remove() -> None:
+            listeners = self._listeners[key]
+            listeners.remove(update)
+            if not listeners:
+                del self._listeners[key]
+
+        return _remove
+
+    @callback
+    def async_record_event(self, port: str, address: int, event: str) -> None:
+        """Count a card read or PIN entry of a reader."""
+        state = self.get(port, address)
+        if state is None:
+            return
+        state.last_event = event
+        state.last_event_at = dt_util.utcnow()
+        if event != "pin_entered":
+            state.reads += 1
+        if event != "tag_scanned":
+            state.pins += 1
+
+    @callback
+    def _async_apply(self, port: str, data: dict[int, Any] | None) -> None:
+        """Diff coordinator data (ReaderStatus per reader) into the reader states."""
+        states = self.readers.get(port)
+        if not states or not data:
+            return
+        for address, status in data.items():
+            state = states.get(address)
+            if state is None:
+                continue
+            changed: list[str] = []
+            if status.online != state.online:
+                state.online = status.online
+                state.last_online = status.last_online
+                state.last_offline = status.last_offline
+                changed.append(FIELD_ONLINE)
+
+            # The coordinator keeps one PD ID object per reader while it
+            # stays online, so identity tells whether there is anything new
+            pd_id = status.pd_id
+            if pd_id is not None and pd_id is not state.pd_id:
+                state.pd_id = pd_id
+                for field in PD_ID_FIELDS:
+                    try:
+                        value = format_pd_id_field(pd_id, field, self.vendors)
+                    except Exception as exc:
+                        _LOGGER.debug("Formatting %s failed for reader %s: %s", field, address, exc)
+                        value = None
+                    if value != getattr(state, field):
+                        setattr(state, field, value)
+                        changed.append(field)
+
+            for field in changed:
+                for update in self._listeners.get((port, address, field), ()):
+                    update()
@@ -0,0 +1,290 @@
+"""Adaptive scheduling of the readers a ControlPanel polls."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+import logging
+import threading
+import time
+from typing import Any
+
+from .const import (
+    LOW_IDLE_AFTER,
+    LOW_PARK_TIME,
+    LOW_POLL_SLICE,
+    LOW_WAKE_TIMEOUT,
+    OFFLINE_GRACE,
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    PROBE_MAX,
+    PROBE_MAX_HIGH,
+    PROBE_MIN,
+    PROBE_WINDOW,
+    SCHEDULER_TICK,
+)
+from .metrics import Histogram
+
+_LOGGER = logging.getLogger(__name__)
+
+# Reader states. Parked readers are disabled in libosdp and not polled.
+_ACTIVE = "active"
+_PROBING = "probing"  # offline reader enabled again for a probe window
+_PARKED_OFFLINE = "parked_offline"
+_PARKED_IDLE = "parked_idle"
+_WAKING = "waking"  # idle low-priority reader enabled, reconnecting
+_SLICE = "slice"  # woken reader back online, polled for a slice
+
+
+class _Reader:
+    __slots__ = ("priority", "state", "until", "offline_since", "backoff", "active_at", "woken_at")
+
+    def __init__(self, priority: str, now: float) -> None:
+        self.priority = priority
+        self.state = _ACTIVE
+        # End of the current park, probe or slice
+        self.until = 0.0
+        self.offline_since: float | None = None
+        self.backoff = PROBE_MIN
+        self.active_at = now
+        self.woken_at = 0.0
+
+
+class PollScheduler:
+    """Weight the polling of one bus by disabling and re-enabling PDs.
+
+    libosdp polls every enabled PD in turn, giving each the same share of
+    the line, and retries a PD that does not answer for several seconds,
+    a reply timeout each time, before it leaves it alone for minutes. Once
+    a tick the scheduler:
+
+    - parks readers that stayed offline for ``offline_grace`` and enables
+      each again for a probe window at doubling intervals, capped lower for
+      high-priority doors. Every probe is a full run of those retries, so
+      only one reader of the bus is probed at a time;
+    - parks low-priority doors that saw no card or key for
+      ``low_idle_after``, ``low_park_time`` at a time. Disabling a PD ends
+      its session, so each wake is a full reconnect (ID, capabilities,
+      secure channel); the polling slice that follows starts once the
+      reader is online again, and the reconnect times are kept in
+      ``wake_time``. A read made while parked only arrives if the reader
+      still reports it after reconnecting, which many readers do not.
+
+    Doors parked for being idle are in ``masked``: their online state,
+    including the offline and online notifications each park and wake
+    cause, is reported as last seen so their entities do not flap. The timing
+    attributes default to the constants and may be tuned per instance.
+    """
+
+    offline_grace = OFFLINE_GRACE
+    low_idle_after = LOW_IDLE_AFTER
+    low_park_time = LOW_PARK_TIME
+
+    def __init__(
+        self,
+        name: str,
+        get_cp: Callable[[], Any],
+        get_readers: Callable[[], list[int]],
+        priorities: Mapping[str, str] | None = None,
+        enabled: bool = True,
+    ) -> None:
+        self._name = name
+        self._get_cp = get_cp
+        self._get_readers = get_readers
+        self._priorities = dict(priorities or {})
+        self.enabled = enabled
+        # Held while a tick runs; the bus holds it while the panel changes
+        self._lock = threading.RLock()
+        self._readers: dict[int, _Reader] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.masked: frozenset[int] = frozenset()
+
+        self.parks = 0
+        self.probes = 0
+        self.recoveries = 0
+        self.wake_time = Histogram()
+
+    def _priority(self, address: int) -> str:
+        return self._priorities.get(str(address), PRIORITY_NORMAL)
+
+    def configure(self, priorities: Mapping[str, str] | None, enabled: bool) -> None:
+        with self._lock:
+            self._priorities = dict(priorities or {})
+            if not enabled:
+                self._release()
+            self.enabled = enabled
+            for address, reader in self._readers.items():
+                reader.priority = self._priority(address)
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"osdp-sched-{self._name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            self._readers.clear()
+            self.masked = frozenset()
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """Hold off scheduling, with every parked reader enabled, while the panel changes."""
+        with self._lock:
+            self._release()
+            yield
+
+    def note_activity(self, address: int) -> None:
+        """Record a card or key on a reader; called from libosdp's refresh thread."""
+        reader = self._readers.get(address)
+        if reader is not None:
+            reader.active_at = time.monotonic()
+
+    def as_dict(self) -> dict[str, Any]:
+        states = [reader.state for reader in list(self._readers.values())]
+        return {
+            "adaptive_polling": self.enabled,
+            "parked_offline": states.count(_PARKED_OFFLINE) + states.count(_PROBING),
+            "parked_idle": states.count(_PARKED_IDLE) + states.count(_WAKING) + states.count(_SLICE),
+            "parks": self.parks,
+            "probes": self.probes,
+            "recoveries": self.recoveries,
+            "wake_p95_ms": self.wake_time.as_dict()["p95_ms"],
+        }
+
+    def _run(self) -> None:
+        while not self._stop.wait(SCHEDULER_TICK):
+            with self._lock:
+                cp = self._get_cp()
+                if cp is None or not self.enabled:
+                    continue
+                try:
+                    self._tick(cp, time.monotonic())
+                except Exception:
+                    _LOGGER.exception("Poll scheduling on %s failed", self._name)
+
+    def _release(self) -> None:
+        """Enable every parked reader and forget all state; lock held."""
+        cp = self._get_cp()
+        for address, reader in self._readers.items():
+            if cp is not None and reader.state in (_PARKED_OFFLINE, _PARKED_IDLE):
+                self._set_enabled(cp, address, True)
+        self._readers.clear()
+        self.masked = frozenset()
+
+    def _tick(self, cp: Any, now: float) -> None:
+        readers = self._get_readers()
+        for address in [address for address in self._readers if address not in readers]:
+            del self._readers[address]
+            self.masked = self.masked - {address}
+        for address in readers:
+            reader = self._readers.get(address)
+            if reader is None:
+                reader = self._readers[address] = _Reader(self._priority(address), now)
+            self._step(cp, address, reader, now)
+
+    def _step(self, cp: Any, address: int, reader: _Reader, now: float) -> None:
+        state = reader.state
+        if state in (_PARKED_OFFLINE, _PARKED_IDLE):
+            if state == _PARKED_OFFLINE and self._probing():
+                # One probe at a time: each costs libosdp's full ID retry run
+                return
+            if now >= reader.until and self._set_enabled(cp, address, True):
+                if state == _PARKED_OFFLINE:
+                    reader.state = _PROBING
+                    reader.until = now + PROBE_WINDOW
+                    self.probes += 1
+                else:
+                    reader.state = _WAKING
+                    reader.woken_at = now
+                    reader.until = now + LOW_WAKE_TIMEOUT
+            return
+
+        online = self._is_online(cp, address)
+        if state == _PROBING:
+            if online:
+                reader.state = _ACTIVE
+                reader.offline_since = None
+                reader.backoff = PROBE_MIN
+                reader.active_at = now
+                self.recoveries += 1
+                _LOGGER.info("Reader %s on %s answered a probe, polling it again", address, self._name)
+            elif now >= reader.until:
+                cap = PROBE_MAX_HIGH if reader.priority == PRIORITY_HIGH else PROBE_MAX
+                reader.backoff = min(reader.backoff * 2, cap)
+                self._park(cp, address, reader, _PARKED_OFFLINE, now + reader.backoff)
+            return
+
+        if state == _WAKING:
+            if online:
+                # Reconnected: the slice counts from here
+                self.wake_time.record(now - reader.woken_at)
+                reader.state = _SLICE
+                reader.until = now + LOW_POLL_SLICE
+                return
+            if now < reader.until:
+                return
+            # Gone while parked: unmasked, it goes the offline way
+            reader.state = _ACTIVE
+            self.masked = self.masked - {address}
+
+        if state == _SLICE:
+            if now < reader.until:
+                return
+            reader.state = _ACTIVE
+            self.masked = self.masked - {address}
+
+        if not online:
+            if reader.offline_since is None:
+                reader.offline_since = now
+            elif now - reader.offline_since >= self.offline_grace:
+                if self._park(cp, address, reader, _PARKED_OFFLINE, now + reader.backoff):
+                    _LOGGER.info(
+                        "Reader %s on %s offline for %.0f s, probing it at growing intervals",
+                        address,
+                        self._name,
+                        now - reader.offline_since,
+                    )
+            return
+
+        reader.offline_since = None
+        if reader.priority == PRIORITY_LOW and now - reader.active_at >= self.low_idle_after:
+            self._park(cp, address, reader, _PARKED_IDLE, now + self.low_park_time)
+
+    def _probing(self) -> bool:
+        return any(reader.state == _PROBING for reader in self._readers.values())
+
+    def _park(self, cp: Any, address: int, reader: _Reader, state: str, until: float) -> bool:
+        if state == _PARKED_IDLE:
+            # Masked first: disabling may push an offline notification
+            self.masked = self.masked | {address}
+        if not self._set_enabled(cp, address, False):
+            self.masked = self.masked - {address}
+            return False
+        reader.state = state
+        reader.until = until
+        self.parks += 1
+        return True
+
+    def _set_enabled(self, cp: Any, address: int, enabled: bool) -> bool:
+        # libosdp refuses (False) while an earlier request for the PD is
+        # pending, or when it is already in that state
+        try:
+            if enabled:
+                return bool(cp.enable_pd(address))
+            return bool(cp.disable_pd(address))
+        except Exception as exc:
+            _LOGGER.debug(
+                "%s reader %s on %s failed: %s", "Enabling" if enabled else "Disabling", address, self._name, exc
+            )
+            return False
+
+    def _is_online(self, cp: Any, address: int) -> bool:
+        try:
+            return bool(cp.is_online(address))
+        except Exception:
+            return False
@@ -1,147 +1,237 @@
 from __future__ import annotations
 
+from datetime import datetime
 import logging
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import EntityCategory
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
-from ouilookup import OuiLookup
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .bridge import EventBridge
+from .const import BUS_RUNNING, BUS_STOPPED, DOMAIN, STATUS_REFRESH_INTERVAL
+from .coordinator import OSDPCoordinator
+from .entity import OSDPReaderEntity
+from .file_transfer import FileTransferManager
+from .metrics import Histogram
+from .reader_state import ReaderState, ReaderStateStore
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
-    """Set up OSDP sensors for each reader and the controller diagnostic sensor."""
+    """Set up OSDP sensors for each reader and the diagnostic sensors of each bus."""
     domain_data = hass.data[DOMAIN][entry.entry_id]
-    readers = domain_data["readers"]  # list of ints
-    port = domain_data["port"]
-    baudrate = domain_data["baudrate"]
-    name = domain_data["name"]
-
-    entities = []
-
-    # Per-reader sensors
-    for rid in readers:
-        entities.append(OSDPReaderInfoSensor(entry.entry_id, port, rid, "version", "Version"))
-        entities.append(OSDPReaderInfoSensor(entry.entry_id, port, rid, "model", "Model"))
-        entities.append(OSDPReaderInfoSensor(entry.entry_id, port, rid, "vendor_code", "Vendor"))
-        entities.append(OSDPReaderInfoSensor(entry.entry_id, port, rid, "serial_number", "Serial Number"))
-        entities.append(OSDPReaderInfoSensor(entry.entry_id, port, rid, "firmware_version", "Firmware"))
-
-    # Controller diagnostic sensor
-    entities.append(OSDPControllerStatusSensor(entry.entry_id, port, baudrate, name))
-
-    async_add_entities(entities)
-
-class OSDPReaderInfoSensor(SensorEntity):
-    """Base class for reader info sensors populated from get_pd_id."""
-
-    def __init__(self, entry_id: str, port: str, reader_id: int, field: str, name: str):
-        self._entry_id = entry_id
-        self._port = port
-        self._reader_id = reader_id
-        self._field = field
+    store: ReaderStateStore = domain_data["readers"]
+    # Controller device each port's diagnostic sensors were made for; the
+    # store builds a new one when a removed port is added again
+    controllers: dict[str, DeviceInfo] = {}
+
+    @callback
+    def _async_add_readers(port: str, rids: list[int]) -> None:
+        runtime = domain_data["buses"][port]
+        coordinator = runtime["coordinator"]
+        unique_base = coordinator.unique_base
+        states = store.readers[port]
+        entities = []
+        for rid in rids:
+            reader = states[rid]
+            entities.append(OSDPReaderInfoSensor(store, reader, unique_base, "version", "Version"))
+            entities.append(OSDPReaderInfoSensor(store, reader, unique_base, "model", "Model"))
+            entities.append(OSDPReaderInfoSensor(store, reader, unique_base, "vendor_code", "Vendor"))
+            entities.append(OSDPReaderInfoSensor(store, reader, unique_base, "serial_number", "Serial Number"))
+            entities.append(OSDPReaderInfoSensor(store, reader, unique_base, "firmware_version", "Firmware"))
+            entities.append(OSDPReplyLatencySensor(coordinator, reader))
+
+        # Controller diagnostic sensors, one set per bus
+        device = store.controllers[port]
+        if controllers.get(port) is not device:
+            controllers[port] = device
+            bridge = runtime["bridge"]
+            metrics = runtime["bus"].metrics
+            entities.append(OSDPControllerStatusSensor(coordinator, bridge, runtime["transfers"], device))
+            entities.append(OSDPBusLatencySensor(coordinator, device, "poll_cycle", "Poll Cycle", metrics.poll_cycle))
+            entities.append(OSDPBusLatencySensor(coordinator, device, "event_latency", "Event Latency", bridge.latency))
+            entities.append(OSDPFrameTimeoutsSensor(coordinator, device))
+        async_add_entities(entities)
+
+    for port, runtime in domain_data["buses"].items():
+        _async_add_readers(port, runtime["bus"].readers)
+    domain_data["reader_entity_adders"].append(_async_add_readers)
+
+
+class OSDPReaderInfoSensor(OSDPReaderEntity, SensorEntity):
+    """Reader info sensor showing one field of the reader's PD ID.
+
+    The value is rendered by the store when a new PD ID is fetched and is
+    kept while the reader is offline.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, store: ReaderStateStore, reader: ReaderState, unique_base: str, field: str, name: str):
+        super().__init__(store, reader, field)
         self._attr_name = name
-        self._attr_unique_id = f"osdp_{field}_{entry_id}_{reader_id}"
-        self._attr_entity_category = EntityCategory.DIAGNOSTIC
-        self._value: str | None = None
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"reader_{self._port}_{self._reader_id}")},
-            name=f"OSDP Reader {self._reader_id}",
-            manufacturer="OSDP",
-            model="Card Reader",
-            via_device=(DOMAIN, f"controller_{self._port}"),
-        )
+        self._attr_unique_id = f"osdp_{field}_{unique_base}_{reader.address}"
 
     @property
     def native_value(self) -> str | None:
-        return self._value
-
-    async def async_update(self) -> None:
-        """Poll ControlPanel for PD ID info."""
-        domain_data = self.hass.data[DOMAIN].get(self._entry_id)
-        cp = domain_data.get("cp") if domain_data else None
-        if cp:
-            try:
-                pd_info = cp.get_pd_id(self._reader_id)
-                if pd_info:
-                    match self._field:
-                        case "version":
-                            tmpint = getattr(pd_info, self._field, None)
-                            tmphex = '{:0>2X}'.format(tmpint)
-                            self._value = tmphex
-                        case "model":
-                            tmpint = getattr(pd_info, self._field, None)
-                            tmphex = '{:0>2X}'.format(tmpint)
-                            self._value = tmphex
-                        case "vendor_code":
-                            tmpint = getattr(pd_info, self._field, None)
-                            tmphex = '{:0>6X}'.format(tmpint)
-                            self._value = list(OuiLookup().query("%s:%s:%s" % (tmphex[4:6], tmphex[2:4], tmphex[0:2]))[0].values())[0]
-                        case "serial_number":
-                            tmpint = getattr(pd_info, self._field, None)
-                            if tmpint < 0:
-                                tmpint = tmpint + 2**32
-                            tmphex = '{:0>8X}'.format(tmpint)
-                            self._value = "%s%s%s%s" % (tmphex[6:8], tmphex[4:6], tmphex[2:4], tmphex[0:2])
-                        case "firmware_version":
-                            tmpint = getattr(pd_info, self._field, None)
-                            tmphex = '{:0>6X}'.format(tmpint)
-                            self._value = "%s.%s.%s" % (tmphex[0:2], tmphex[2:4], tmphex[4:6])
-
-            except Exception as exc:
-                _LOGGER.debug("get_pd_id failed for reader %s: %s", self._reader_id, exc)
-                self._value = None
-
-class OSDPControllerStatusSensor(SensorEntity):
-    """Diagnostic sensor for the OSDP controller hub."""
+        return getattr(self._reader, self._field)
+
+
+class OSDPControllerStatusSensor(CoordinatorEntity[OSDPCoordinator], SensorEntity):
+    """Diagnostic sensor for one OSDP bus of the controller hub.
+
+    Besides coordinator updates, which only come on reader changes, the
+    state is rewritten every STATUS_REFRESH_INTERVAL so the queue, dedup
+    and scheduler counters in the attributes stay current.
+    """
 
     _attr_has_entity_name = True
     _attr_name = "Controller Status"
 
-    def __init__(self, entry_id: str, port: str, baudrate: int, name: str):
-        self._entry_id = entry_id
-        self._port = port
-        self._baudrate = baudrate
-        self._name = name
-        self._attr_unique_id = f"osdp_controller_status_{entry_id}"
-        self._status = "running"
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"controller_{self._port}")},
-            manufacturer="OSDP",
-            name=self._name,
-            model="OSDP Bus",
+    def __init__(
+        self, coordinator: OSDPCoordinator, bridge: EventBridge, transfers: FileTransferManager, device: DeviceInfo
+    ):
+        super().__init__(coordinator)
+        self._bus = coordinator.bus
+        self._bridge = bridge
+        self._transfers = transfers
+        self._port = self._bus.port
+        self._attr_device_info = device
+        self._attr_unique_id = f"osdp_controller_status_{coordinator.unique_base}"
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_interval(self.hass, self._async_refresh_counters, STATUS_REFRESH_INTERVAL)
         )
 
+    @callback
+    def _async_refresh_counters(self, _now: datetime) -> None:
+        self.async_write_ha_state()
+
     @property
     def native_value(self):
-        return f"{self._status} @ {self._baudrate} baud"
+        status = self._bus.state
+        if status == BUS_RUNNING and self._bus.cp is None:
+            # Open, but without readers there is no panel polling
+            status = BUS_STOPPED
+        return f"{status} @ {self._bus.baudrate} baud"
 
     @property
     def extra_state_attributes(self):
-        domain_data = self.hass.data[DOMAIN].get(self._entry_id)
-        readers = domain_data.get("readers", []) if domain_data else []
-        return {
-            "baudrate": self._baudrate,
+        readers = self._bus.readers
+        attrs = {
+            "baudrate": self._bus.baudrate,
             "port": self._port,
             "reader_count": len(readers),
             "readers": readers,
+            "online_count": sum(1 for status in (self.coordinator.data or {}).values() if status.online),
+            "status_push": self.coordinator.push,
+        }
+        if self._bus.last_reconfigure_gap is not None:
+            attrs["last_reconfigure_gap_ms"] = round(self._bus.last_reconfigure_gap * 1000)
+        if self._bus.worker:
+            attrs["worker_restarts"] = self._bus.worker_restarts
+        attrs.update(self._bridge.as_dict())
+        attrs.update(self._bus.commands.as_dict())
+        attrs.update(self._bus.dedup.as_dict())
+        attrs.update(self._bus.scheduler.as_dict())
+        if self._transfers.transfers:
+            attrs["file_transfers"] = self._transfers.as_dict()
+        return attrs
+
+
+class _OSDPMetricSensor(SensorEntity):
+    """Diagnostic sensor reading in-memory metrics; polled, never written from the hot path."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator: OSDPCoordinator):
+        self._bus = coordinator.bus
+
+
+class _OSDPBusMetricSensor(_OSDPMetricSensor):
+    """Metric sensor of the controller device of a bus."""
+
+    def __init__(self, coordinator: OSDPCoordinator, device: DeviceInfo):
+        super().__init__(coordinator)
+        self._attr_device_info = device
+
+
+class OSDPBusLatencySensor(_OSDPBusMetricSensor):
+    """95th percentile of one latency histogram of a bus."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+
+    def __init__(
+        self, coordinator: OSDPCoordinator, device: DeviceInfo, key: str, label: str, histogram: Histogram
+    ):
+        super().__init__(coordinator, device)
+        self._histogram = histogram
+        self._attr_name = label
+        self._attr_unique_id = f"osdp_{key}_{coordinator.unique_base}"
+
+    @property
+    def native_value(self) -> float | None:
+        return self._histogram.as_dict()["p95_ms"]
+
+    @property
+    def extra_state_attributes(self):
+        return self._histogram.as_dict()
+
+
+class OSDPFrameTimeoutsSensor(_OSDPBusMetricSensor):
+    """Commands on a bus that got no reply, with the other frame counters."""
+
+    _attr_name = "Frame Timeouts"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(self, coordinator: OSDPCoordinator, device: DeviceInfo):
+        super().__init__(coordinator, device)
+        self._attr_unique_id = f"osdp_frame_timeouts_{coordinator.unique_base}"
+
+    @property
+    def native_value(self) -> int:
+        return self._bus.metrics.timeouts
+
+    @property
+    def extra_state_attributes(self):
+        metrics = self._bus.metrics
+        return {
+            "frames_sent": metrics.frames_sent,
+            "frames_received": metrics.frames_received,
+            "crc_errors": metrics.crc_errors,
         }
 
-    async def async_update(self):
-        domain_data = self.hass.data[DOMAIN].get(self._entry_id)
-        if domain_data and domain_data.get("cp"):
-            self._status = "running"
-            self._baudrate = domain_data.get("baudrate", self._baudrate)
-        else:
-            self._status = "stopped"
\ No newline at end of file
+
+class OSDPReplyLatencySensor(_OSDPMetricSensor):
+    """95th percentile reply latency of one reader, with its counters."""
+
+    _attr_name = "Reply Latency"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator: OSDPCoordinator, reader: ReaderState):
+        super().__init__(coordinator)
+        self._reader_id = reader.address
+        self._attr_device_info = reader.device_info
+        self._attr_unique_id = f"osdp_reply_latency_{coordinator.unique_base}_{reader.address}"
+
+    @property
+    def native_value(self) -> float | None:
+        return self._bus.metrics.reader(self._reader_id).reply_latency.as_dict()["p95_ms"]
+
+    @property
+    def extra_state_attributes(self):
+        return self._bus.metrics.reader(self._reader_id).as_dict()
@@ -0,0 +1,217 @@
+"""Services of the OSDP integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+
+from .access import AccessList, load_access_file
+from .commands import LED_COLORS, buzzer_command, led_command, output_command, text_command
+from .const import (
+    CONF_ACCESS_FILE,
+    DOMAIN,
+    SERVICE_BUZZER,
+    SERVICE_RELOAD_ACCESS_LIST,
+    SERVICE_SEND_TEXT,
+    SERVICE_SET_ALLOWED_TAGS,
+    SERVICE_SET_LED,
+    SERVICE_SET_OUTPUT,
+    SERVICE_TRANSFER_FILE,
+)
+from .file_transfer import FILE_TRANSFER_SUPPORTED
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_TAGS = "tags"
+
+SET_ALLOWED_TAGS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required(ATTR_TAGS): vol.All(cv.ensure_list, [vol.Coerce(int)]),
+    }
+)
+
+TRANSFER_FILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required("path"): cv.string,
+        vol.Optional("file_id", default=1): vol.All(vol.Coerce(int), vol.Range(min=0, max=255)),
+    }
+)
+
+_TARGET = {vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string])}
+_TIME_MS = vol.All(vol.Coerce(int), vol.Range(min=0, max=25500))
+_DURATION = vol.All(vol.Coerce(float), vol.Range(min=0, max=6553))
+
+# Service -> (schema, command builder taking the remaining service data)
+COMMAND_SERVICES = {
+    SERVICE_SET_LED: (
+        vol.Schema(
+            {
+                **_TARGET,
+                vol.Required("color"): vol.In(LED_COLORS),
+                vol.Optional("off_color", default="black"): vol.In(LED_COLORS),
+                vol.Optional("led_number", default=0): vol.All(vol.Coerce(int), vol.Range(min=0, max=255)),
+                vol.Optional("on_time", default=500): _TIME_MS,
+                vol.Optional("off_time", default=0): _TIME_MS,
+                vol.Optional("duration"): _DURATION,
+            }
+        ),
+        led_command,
+    ),
+    SERVICE_BUZZER: (
+        vol.Schema(
+            {
+                **_TARGET,
+                vol.Optional("on_time", default=100): _TIME_MS,
+                vol.Optional("off_time", default=100): _TIME_MS,
+                vol.Optional("count", default=1): vol.All(vol.Coerce(int), vol.Range(min=0, max=255)),
+            }
+        ),
+        buzzer_command,
+    ),
+    SERVICE_SET_OUTPUT: (
+        vol.Schema(
+            {
+                **_TARGET,
+                vol.Required("output"): vol.All(vol.Coerce(int), vol.Range(min=0, max=255)),
+                vol.Required("state"): cv.boolean,
+                vol.Optional("duration"): _DURATION,
+            }
+        ),
+        output_command,
+    ),
+    SERVICE_SEND_TEXT: (
+        vol.Schema(
+            {
+                **_TARGET,
+                vol.Required("text"): vol.All(cv.string, vol.Length(max=32)),
+                vol.Optional("row", default=1): vol.All(vol.Coerce(int), vol.Range(min=1, max=255)),
+                vol.Optional("column", default=1): vol.All(vol.Coerce(int), vol.Range(min=1, max=255)),
+                vol.Optional("duration"): vol.All(vol.Coerce(int), vol.Range(min=0, max=255)),
+            }
+        ),
+        text_command,
+    ),
+}
+
+
+async def async_load_access_list(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """(Re)load the entry's access list from its configured file, if any."""
+    domain_data = hass.data[DOMAIN][entry.entry_id]
+    access: AccessList = domain_data["access"]
+    path = domain_data["access_file"] = entry.options.get(CONF_ACCESS_FILE)
+    if not path:
+        access.clear()
+        return
+    try:
+        default, readers = await hass.async_add_executor_job(load_access_file, path)
+    except (OSError, ValueError) as exc:
+        _LOGGER.error("Could not load OSDP access list %s: %s", path, exc)
+        return
+    access.replace(default, readers)
+    _LOGGER.info("Loaded OSDP access list %s (%d reader lists)", path, len(readers))
+
+
+@callback
+def async_resolve_readers(hass: HomeAssistant, device_ids: list[str]) -> dict[str, list[tuple[str, int]]]:
+    """Map reader device ids to entry id -> [(port, address)]."""
+    devreg = dr.async_get(hass)
+    targets: dict[str, list[tuple[str, int]]] = {}
+    for device_id in device_ids:
+        device = devreg.async_get(device_id)
+        reader = None
+        if device is not None:
+            for ident_domain, ident in device.identifiers:
+                if ident_domain == DOMAIN and ident.startswith("reader_"):
+                    port, _, address = ident[len("reader_"):].rpartition("_")
+                    reader = (port, int(address))
+        entry_id = next(
+            (eid for eid in (device.config_entries if device else ()) if eid in hass.data.get(DOMAIN, {})),
+            None,
+        )
+        if reader is None or entry_id is None:
+            raise ServiceValidationError(f"{device_id} is not a loaded OSDP reader")
+        targets.setdefault(entry_id, []).append(reader)
+    return targets
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the OSDP services."""
+
+    async def _async_set_allowed_tags(call: ServiceCall) -> None:
+        tags = call.data[ATTR_TAGS]
+        if ATTR_DEVICE_ID in call.data:
+            for entry_id, readers in async_resolve_readers(hass, call.data[ATTR_DEVICE_ID]).items():
+                hass.data[DOMAIN][entry_id]["access"].set_tags(readers, tags)
+        else:
+            for domain_data in hass.data.get(DOMAIN, {}).values():
+                domain_data["access"].set_tags(None, tags)
+
+    async def _async_reload_access_list(call: ServiceCall) -> None:
+        for entry_id in list(hass.data.get(DOMAIN, {})):
+            entry = hass.config_entries.async_get_entry(entry_id)
+            if entry is not None and entry.options.get(CONF_ACCESS_FILE):
+                await async_load_access_list(hass, entry)
+
+    def _command_handler(build):
+        async def _async_send(call: ServiceCall) -> None:
+            data = dict(call.data)
+            targets = async_resolve_readers(hass, data.pop(ATTR_DEVICE_ID))
+            command = build(**data)
+            for entry_id, readers in targets.items():
+                buses = hass.data[DOMAIN][entry_id]["buses"]
+                for port, address in readers:
+                    if port not in buses:
+                        raise ServiceValidationError(f"OSDP bus {port} is not running")
+                    # Queued, coalesced and rate limited per reader
+                    if not buses[port]["bus"].commands.submit(address, command):
+                        raise ServiceValidationError(f"OSDP bus {port} is not running")
+
+        return _async_send
+
+    for service, (schema, build) in COMMAND_SERVICES.items():
+        hass.services.async_register(DOMAIN, service, _command_handler(build), schema=schema)
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_ALLOWED_TAGS, _async_set_allowed_tags, schema=SET_ALLOWED_TAGS_SCHEMA
+    )
+    hass.services.async_register(DOMAIN, SERVICE_RELOAD_ACCESS_LIST, _async_reload_access_list)
+
+    async def _async_transfer_file(call: ServiceCall) -> None:
+        if not FILE_TRANSFER_SUPPORTED:
+            raise ServiceValidationError("The installed libosdp does not support file transfers")
+        path = call.data["path"]
+        if not hass.config.is_allowed_path(path):
+            raise ServiceValidationError(f"{path} is not in an allowed directory")
+        starts = []
+        for entry_id, readers in async_resolve_readers(hass, call.data[ATTR_DEVICE_ID]).items():
+            buses = hass.data[DOMAIN][entry_id]["buses"]
+            by_port: dict[str, list[int]] = {}
+            for port, address in readers:
+                if port not in buses:
+                    raise ServiceValidationError(f"OSDP bus {port} is not running")
+                if buses[port]["bus"].worker:
+                    # The file ops would have to live in the worker process
+                    raise ServiceValidationError(
+                        f"OSDP bus {port} runs in a worker process, which does not support file transfers"
+                    )
+                by_port.setdefault(port, []).append(address)
+            for port, addresses in by_port.items():
+                starts.append(buses[port]["transfers"].async_start(addresses, path, call.data["file_id"]))
+        # Buses transfer concurrently, each from its own refresh thread
+        try:
+            await asyncio.gather(*starts)
+        except (OSError, ValueError) as exc:
+            raise ServiceValidationError(f"Cannot read {path}: {exc}") from exc
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_TRANSFER_FILE, _async_transfer_file, schema=TRANSFER_FILE_SCHEMA
+    )
@@ -0,0 +1,93 @@
+"""Vendor name resolution for OSDP vendor codes (IEEE OUIs)."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+import json
+import logging
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_VENDOR_INDEX = "osdp_vendor_index"
+
+_HEX_DIGITS = frozenset("0123456789ABCDEF")
+
+
+class OuiVendorIndex:
+    """Sorted OUI -> vendor table with an LRU in front of the lookup.
+
+    OUIs are kept as a packed ``array`` of 24-bit integers with a parallel
+    tuple of names, which is a fraction of the size of the JSON dict the
+    database ships as. An empty index still resolves, to the OUI itself.
+    """
+
+    def __init__(self, ouis: array, names: tuple[str, ...]) -> None:
+        self._ouis = ouis
+        self._names = names
+        self.resolve = lru_cache(maxsize=256)(self._resolve)
+
+    def __len__(self) -> int:
+        return len(self._ouis)
+
+    def _resolve(self, oui: int) -> str:
+        """Return the vendor registered for a 24-bit OUI."""
+        pos = bisect_left(self._ouis, oui)
+        if pos < len(self._ouis) and self._ouis[pos] == oui:
+            return self._names[pos]
+        return "{:02X}:{:02X}:{:02X}".format(oui >> 16, (oui >> 8) & 0xFF, oui & 0xFF)
+
+
+def _find_data_file() -> str | None:
+    """Locate the ouilookup JSON database, if one is installed."""
+    try:
+        import ouilookup
+        from ouilookup import OuiLookup
+    except ImportError:
+        return None
+    try:
+        path = getattr(OuiLookup(), "data_file", None)
+    except Exception as exc:
+        _LOGGER.debug("OuiLookup could not locate its data file: %s", exc)
+        path = None
+    if path and os.path.isfile(path):
+        return path
+    path = os.path.join(os.path.dirname(ouilookup.__file__), "data", "ouilookup.json")
+    return path if os.path.isfile(path) else None
+
+
+def load_vendor_index() -> OuiVendorIndex:
+    """Build the index from the OUI database; blocking, run in the executor."""
+    path = _find_data_file()
+    if path is None:
+        _LOGGER.warning("OUI database not found, vendors will be shown as OUIs")
+        return OuiVendorIndex(array("I"), ())
+    try:
+        with open(path, encoding="utf-8") as fh:
+            raw = json.load(fh)
+    except (OSError, ValueError) as exc:
+        _LOGGER.warning("Could not load OUI database %s: %s", path, exc)
+        return OuiVendorIndex(array("I"), ())
+
+    entries: dict[int, str] = {}
+    # ouilookup keeps the table under "vendors"; accept a bare or "data" mapping too
+    table = raw.get("vendors") or raw.get("data") or raw
+    for key, vendor in table.items():
+        digits = "".join(c for c in str(key).upper() if c in _HEX_DIGITS)
+        if len(digits) == 6 and isinstance(vendor, str):
+            entries[int(digits, 16)] = vendor
+    ordered = sorted(entries.items())
+    _LOGGER.debug("Loaded %d OUIs from %s", len(ordered), path)
+    return OuiVendorIndex(array("I", (k for k, _ in ordered)), tuple(v for _, v in ordered))
+
+
+async def async_get_vendor_index(hass: HomeAssistant) -> OuiVendorIndex:
+    """Return the shared vendor index, loading it on first use."""
+    if (future := hass.data.get(DATA_VENDOR_INDEX)) is None:
+        future = hass.data[DATA_VENDOR_INDEX] = hass.async_add_executor_job(load_vendor_index)
+    return await future
@@ -0,0 +1,399 @@
+"""ControlPanel in a worker process, and the proxy that stands in for it.
+
+With the isolated worker enabled, the channel and libosdp's ControlPanel
+run in a child process with an interpreter (and GIL) of their own, so bus
+timing no longer depends on how busy Home Assistant is. The two sides
+talk over a socketpair with length-prefixed ``marshal`` frames:
+
+* ``CONFIG`` (HA -> worker): port, speed, PD addresses, flags, and the
+  PDs to keep disabled
+* ``CALL`` / ``REPLY``: a ControlPanel method call and its result
+* ``EVENT`` (worker -> HA): a libosdp event and its PD address, passed to
+  the bus callback
+* ``METRICS`` (worker -> HA): the wire metrics, every few seconds
+
+This module only imports the standard library at the top, because the
+worker runs it as a script, outside the package.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+import enum
+import importlib
+import itertools
+import logging
+import marshal
+import os
+from pathlib import Path
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+import types
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+MSG_CONFIG = 1
+MSG_CALL = 2
+MSG_REPLY = 3
+MSG_EVENT = 4
+MSG_METRICS = 5
+
+_HEADER = struct.Struct("!BI")
+
+CALL_TIMEOUT = 5.0
+METRICS_INTERVAL = 5.0
+RESTART_MIN = 1.0
+RESTART_MAX = 60.0
+# A worker that ran this long before dying restarts without backoff
+_STABLE_RUN = 60.0
+
+_PD_ID_FIELDS = ("version", "model", "vendor_code", "serial_number", "firmware_version")
+
+
+def _plain(value: Any) -> Any:
+    """Reduce enums (and containers of them) to what marshal can carry."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+
+def _send(sock: socket.socket, lock: threading.Lock, kind: int, payload: Any) -> None:
+    data = marshal.dumps(payload)
+    with lock:
+        sock.sendall(_HEADER.pack(kind, len(data)) + data)
+
+
+class _FrameReader:
+    """Reads whole frames from a blocking socket."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+        self._header = bytearray(_HEADER.size)
+
+    def _fill(self, buf: bytearray) -> bool:
+        view = memoryview(buf)
+        got = 0
+        while got < len(buf):
+            try:
+                count = self._sock.recv_into(view[got:])
+            except OSError:
+                return False
+            if not count:
+                return False
+            got += count
+        return True
+
+    def read(self) -> tuple[int, Any] | None:
+        """Next (kind, payload), or None once the peer is gone."""
+        if not self._fill(self._header):
+            return None
+        kind, length = _HEADER.unpack(self._header)
+        body = bytearray(length)
+        if not self._fill(body):
+            return None
+        return kind, marshal.loads(body)
+
+
+class RemoteControlPanel:
+    """Stands in for osdp.ControlPanel, with the real one in a worker process.
+
+    Method calls are forwarded and answered synchronously, from whichever
+    thread makes them; events arrive on the supervisor thread and are
+    passed to ``callback`` there. When the worker exits unexpectedly the
+    supervisor starts a new one, backing off exponentially while it keeps
+    failing; calls made in between raise ConnectionError. The speed and the
+    disabled PDs are replayed to each new worker.
+    """
+
+    def __init__(
+        self,
+        port: str,
+        baudrate: int,
+        addresses: list[int],
+        notifications: bool,
+        callback: Callable[[int, dict], int],
+        on_metrics: Callable[[dict], None] | None = None,
+    ) -> None:
+        self._config = {
+            "port": port,
+            "baudrate": baudrate,
+            "addresses": list(addresses),
+            "notifications": notifications,
+        }
+        self._callback = callback
+        self._on_metrics = on_metrics
+        self._sock: socket.socket | None = None
+        self._proc: subprocess.Popen | None = None
+        self._send_lock = threading.Lock()
+        self._pending: dict[int, list] = {}
+        self._pending_lock = threading.Lock()
+        self._seq = itertools.count()
+        self._stopping = threading.Event()
+        self._supervisor: threading.Thread | None = None
+        self._disabled: set[int] = set()
+        self.restarts = 0
+
+    def start(self) -> None:
+        self._spawn()
+        self._supervisor = threading.Thread(
+            target=self._supervise, name=f"osdp-worker-{self._config['port']}", daemon=True
+        )
+        self._supervisor.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        try:
+            self._call("stop")
+        except (ConnectionError, TimeoutError, RuntimeError):
+            pass
+        self._close()
+        if self._supervisor is not None:
+            self._supervisor.join()
+            self._supervisor = None
+
+    def _spawn(self) -> None:
+        parent, child = socket.socketpair()
+        try:
+            self._proc = subprocess.Popen(
+                [sys.executable, str(Path(__file__).resolve()), str(child.fileno())],
+                pass_fds=(child.fileno(),),
+                stdin=subprocess.DEVNULL,
+            )
+        except OSError:
+            parent.close()
+            raise
+        finally:
+            child.close()
+        self._sock = parent
+        _send(parent, self._send_lock, MSG_CONFIG, {**self._config, "disabled": sorted(self._disabled)})
+
+    def _close(self) -> None:
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        proc, self._proc = self._proc, None
+        if proc is not None:
+            try:
+                proc.wait(timeout=3)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+    def _supervise(self) -> None:
+        backoff = RESTART_MIN
+        while True:
+            started = time.monotonic()
+            if self._sock is not None:
+                self._read_loop(_FrameReader(self._sock))
+            self._fail_pending()
+            if self._stopping.is_set():
+                return
+            self._close()
+            if time.monotonic() - started > _STABLE_RUN:
+                backoff = RESTART_MIN
+            _LOGGER.warning(
+                "OSDP worker for %s exited, restarting in %.0f s", self._config["port"], backoff
+            )
+            if self._stopping.wait(backoff):
+                return
+            backoff = min(backoff * 2, RESTART_MAX)
+            try:
+                self._spawn()
+            except OSError as exc:
+                _LOGGER.error("Starting the OSDP worker for %s failed: %s", self._config["port"], exc)
+                continue
+            self.restarts += 1
+
+    def _read_loop(self, reader: _FrameReader) -> None:
+        while (frame := reader.read()) is not None:
+            kind, payload = frame
+            if kind == MSG_EVENT:
+                address, event = payload
+                try:
+                    self._callback(address, event)
+                except Exception:  # noqa: BLE001
+                    _LOGGER.exception("Error handling OSDP event from the worker")
+            elif kind == MSG_REPLY:
+                seq, result = payload
+                with self._pending_lock:
+                    waiter = self._pending.pop(seq, None)
+                if waiter is not None:
+                    waiter[1] = result
+                    waiter[0].set()
+            elif kind == MSG_METRICS and self._on_metrics is not None:
+                self._on_metrics(payload)
+
+    def _fail_pending(self) -> None:
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for waiter in pending.values():
+            waiter[0].set()
+
+    def _call(self, method: str, *args: Any) -> Any:
+        sock = self._sock
+        if sock is None:
+            raise ConnectionError("OSDP worker is not running")
+        seq = next(self._seq)
+        waiter = [threading.Event(), None]
+        with self._pending_lock:
+            self._pending[seq] = waiter
+        try:
+            _send(sock, self._send_lock, MSG_CALL, (seq, method, _plain(list(args))))
+        except OSError as exc:
+            with self._pending_lock:
+                self._pending.pop(seq, None)
+            raise ConnectionError(f"OSDP worker is not reachable: {exc}") from exc
+        if not waiter[0].wait(CALL_TIMEOUT):
+            with self._pending_lock:
+                self._pending.pop(seq, None)
+            raise TimeoutError(f"OSDP worker did not answer {method}")
+        if waiter[1] is None:
+            raise ConnectionError("OSDP worker exited")
+        ok, result = waiter[1]
+        if not ok:
+            raise RuntimeError(result)
+        return result
+
+    # The subset of osdp.ControlPanel the integration uses
+
+    def is_online(self, address: int) -> bool:
+        return self._call("is_online", address)
+
+    def get_pd_id(self, address: int):
+        fields = self._call("get_pd_id", address)
+        return types.SimpleNamespace(**fields) if fields else None
+
+    def submit_command(self, address: int, command: dict) -> bool:
+        return self._call("submit_command", address, command)
+
+    def enable_pd(self, address: int) -> bool:
+        if not self._call("enable_pd", address):
+            return False
+        self._disabled.discard(address)
+        return True
+
+    def disable_pd(self, address: int) -> bool:
+        if not self._call("disable_pd", address):
+            return False
+        self._disabled.add(address)
+        return True
+
+    def set_speed(self, baudrate: int) -> None:
+        self._config["baudrate"] = baudrate
+        self._call("set_speed", baudrate)
+
+    def metrics(self) -> dict:
+        return self._call("metrics")
+
+
+def _worker_main(fd: int) -> None:
+    """Run the channel and ControlPanel for one bus; the worker process."""
+    # Load the integration's modules without running the package __init__
+    # (which needs Home Assistant), as the scripts in scripts/ do.
+    package = types.ModuleType("osdp_worker")
+    package.__path__ = [str(Path(__file__).resolve().parent)]
+    sys.modules["osdp_worker"] = package
+    channel_mod = importlib.import_module("osdp_worker.channel")
+    metrics_mod = importlib.import_module("osdp_worker.metrics")
+    import osdp
+
+    sock = socket.socket(fileno=fd)
+    send_lock = threading.Lock()
+    reader = _FrameReader(sock)
+    frame = reader.read()
+    if frame is None or frame[0] != MSG_CONFIG:
+        return
+    config = frame[1]
+
+    metrics = metrics_mod.BusMetrics()
+    # Tells this process's counters from those of an earlier worker
+    run = os.urandom(8).hex()
+
+    def _wire_state() -> dict:
+        return {**metrics.wire_state(), "run": run}
+
+    channel = channel_mod.create_channel(config["port"], config["baudrate"], metrics)
+
+    addresses = config["addresses"]
+
+    def _callback(pd: int, event: dict) -> int:
+        # libosdp passes the PD's index; the supervisor side gets the address
+        try:
+            _send(sock, send_lock, MSG_EVENT, (addresses[pd], _plain(event)))
+        except (IndexError, OSError):
+            pass
+        return 0
+
+    flag = getattr(getattr(osdp, "Flag", None), "EnableNotification", None)
+    if config["notifications"] and flag is not None:
+        pd_infos = [osdp.PDInfo(a, channel, flags=[flag]) for a in addresses]
+    else:
+        pd_infos = [osdp.PDInfo(a, channel) for a in addresses]
+    cp = osdp.ControlPanel(pd_infos, osdp.LogLevel.Info, _callback)
+    cp.start()
+    for address in config["disabled"]:
+        cp.disable_pd(address)
+
+    # submit_command supersedes the deprecated send_command
+    submit_command = getattr(cp, "submit_command", None) or cp.send_command
+
+    def _pd_id(address: int) -> dict | None:
+        pd_id = cp.get_pd_id(address)
+        return {field: getattr(pd_id, field, None) for field in _PD_ID_FIELDS} if pd_id else None
+
+    calls: dict[str, Callable[..., Any]] = {
+        "is_online": lambda address: bool(cp.is_online(address)),
+        "get_pd_id": _pd_id,
+        "submit_command": lambda address, command: bool(submit_command(address, command)),
+        "enable_pd": lambda address: bool(cp.enable_pd(address)),
+        "disable_pd": lambda address: bool(cp.disable_pd(address)),
+        "set_speed": channel.set_speed,
+        "metrics": _wire_state,
+    }
+
+    stopped = threading.Event()
+
+    def _push_metrics() -> None:
+        while not stopped.wait(METRICS_INTERVAL):
+            try:
+                _send(sock, send_lock, MSG_METRICS, _wire_state())
+            except OSError:
+                return
+
+    threading.Thread(target=_push_metrics, daemon=True).start()
+    try:
+        while (frame := reader.read()) is not None:
+            seq, method, args = frame[1]
+            if method == "stop":
+                _send(sock, send_lock, MSG_REPLY, (seq, (True, None)))
+                break
+            try:
+                result = (True, _plain(calls[method](*args)))
+            except Exception as exc:  # noqa: BLE001
+                result = (False, f"{type(exc).__name__}: {exc}")
+            _send(sock, send_lock, MSG_REPLY, (seq, result))
+    finally:
+        stopped.set()
+        cp.stop()
+        channel.close()
+        sock.close()
+
+
+if __name__ == "__main__":
+    # Don't let the integration's module names shadow anything
+    sys.path.pop(0)
+    logging.basicConfig(level=logging.WARNING, format="osdp-worker %(levelname)s %(message)s")
+    _worker_main(int(sys.argv[1]))
+    os._exit(0)
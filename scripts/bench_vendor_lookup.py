@@ -0,0 +1,91 @@
+"""Benchmark vendor name resolution for reader vendor codes.
+
+Compares the integration's OuiVendorIndex (cold and through its LRU) with
+the previous per-lookup ``OuiLookup().query``, on a stream of OUIs drawn
+from the installed database with the repetition a real bus has (few
+vendors, many readers). Results are printed as JSON::
+
+    python scripts/bench_vendor_lookup.py --lookups 20000
+
+Requires ouilookup; Home Assistant itself is not needed.
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+from pathlib import Path
+import random
+import sys
+import time
+import types
+
+from ouilookup import OuiLookup
+
+# Load the integration modules without its Home Assistant dependent __init__
+_PKG = "osdp_integration"
+_pkg = types.ModuleType(_PKG)
+_pkg.__path__ = [str(Path(__file__).resolve().parent.parent / "custom_components" / "osdp")]
+sys.modules[_PKG] = _pkg
+vendor = importlib.import_module(f"{_PKG}.vendor")
+
+
+def _legacy_resolve(oui: int) -> str:
+    """Vendor lookup as the sensor did it before the index."""
+    tmphex = "{:0>6X}".format(oui)
+    return list(OuiLookup().query("%s:%s:%s" % (tmphex[0:2], tmphex[2:4], tmphex[4:6]))[0].values())[0]
+
+
+def _time(resolve, ouis: list[int]) -> float:
+    started = time.perf_counter()
+    for oui in ouis:
+        resolve(oui)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--vendors", type=int, default=16, help="distinct vendors on the simulated buses")
+    parser.add_argument(
+        "--legacy-lookups", type=int, default=200, help="lookups timed for OuiLookup, which is slow"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = vendor.load_vendor_index()
+    load_seconds = time.perf_counter() - started
+    if not len(index):
+        sys.exit("OUI database not found")
+
+    rnd = random.Random(args.seed)
+    known = [index._ouis[rnd.randrange(len(index))] for _ in range(args.vendors)]
+    ouis = [rnd.choice(known) for _ in range(args.lookups)]
+
+    cold = _time(index._resolve, ouis)
+    cached = _time(index.resolve, ouis)
+    legacy = _time(_legacy_resolve, ouis[: args.legacy_lookups])
+    mismatches = sum(1 for oui in known if index.resolve(oui) != _legacy_resolve(oui))
+
+    print(
+        json.dumps(
+            {
+                "ouis_indexed": len(index),
+                "index_load_seconds": load_seconds,
+                "lookups": args.lookups,
+                "distinct_vendors": args.vendors,
+                "us_per_lookup": {
+                    "legacy_ouilookup": legacy * 1e6 / args.legacy_lookups,
+                    "index_cold": cold * 1e6 / args.lookups,
+                    "index_cached": cached * 1e6 / args.lookups,
+                },
+                "mismatches": mismatches,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+"""Simulate an OSDP bus and benchmark the integration's event path.
+
+N libosdp PeripheralDevices are attached to a pty pair that stands in for
+the RS-485 bus. The integration's own channel, OSDPBus and EventBridge run
+the ControlPanel side, so what is measured is the code Home Assistant runs,
+up to the point where events are dispatched on the event loop. Card reads
+are injected at a fixed rate and timed from ``submit_event`` on the PD to
+the bridge handler.
+
+Results are written as JSON so runs can be compared over time::
+
+    python scripts/bus_simulator.py --readers 32 --rate 50 --duration 30 \\
+        --baudrate 115200 --output bench.json
+
+Poll-cycle jitter with and without the isolated worker, while other
+Python threads compete for the GIL::
+
+    python scripts/bus_simulator.py --load-threads 4 --output inproc.json
+    python scripts/bus_simulator.py --load-threads 4 --worker --output worker.json
+
+Card-read latency on busy doors of a long 9600 baud bus with idle and dead
+readers, before and after adaptive polling. Idle doors are marked low
+priority; the warmup lets offline readers be parked before reads start::
+
+    python scripts/bus_simulator.py --baudrate 9600 --readers 16 --active 2 \\
+        --offline 8 --rate 2 --duration 60 --warmup 20 --output static.json
+    python scripts/bus_simulator.py --baudrate 9600 --readers 16 --active 2 \\
+        --offline 8 --rate 2 --duration 60 --adaptive --low-idle \\
+        --idle-after 5 --warmup 20 --output adaptive.json
+
+Idle-bus CPU and reply latency of the channel against the old one, which
+read with ``timeout=0`` and had the refresh thread spin on empty reads::
+
+    python scripts/bus_simulator.py --rate 0 --duration 30 --channel legacy \
+        --output legacy.json
+    python scripts/bus_simulator.py --rate 0 --duration 30 --channel poll \
+        --output poll.json
+
+Requires libosdp and pyserial; Home Assistant itself is not needed.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+from pathlib import Path
+import platform
+import resource
+import select
+import sys
+import threading
+import time
+import tty
+import types
+
+import osdp
+
+# The integration package __init__ pulls in Home Assistant, the bus stack
+# does not: expose the package directory without running __init__.
+_PKG = "osdp_integration"
+_pkg = types.ModuleType(_PKG)
+_pkg.__path__ = [str(Path(__file__).resolve().parent.parent / "custom_components" / "osdp")]
+sys.modules[_PKG] = _pkg
+bridge_mod = importlib.import_module(f"{_PKG}.bridge")
+bus_mod = importlib.import_module(f"{_PKG}.bus")
+const = importlib.import_module(f"{_PKG}.const")
+
+FIRST_ADDRESS = 1
+
+
+class LegacySerialChannel(osdp.Channel):
+    """The serial channel as it was before reads waited with ``poll``.
+
+    ``read`` returns at once, empty or not, so libosdp's refresh thread
+    spins while it waits for a reply. Traffic is still reported to
+    ``metrics`` so reply latency compares with the current channel.
+    """
+
+    def __init__(self, device: str, speed: int, metrics=None):
+        import serial
+
+        super().__init__()
+        self.metrics = metrics
+        self.dev = serial.Serial(device, speed, timeout=0)
+
+    def read(self, max_read: int):
+        data = self.dev.read(max_read)
+        if data and self.metrics is not None:
+            self.metrics.on_read(data)
+        return data
+
+    def write(self, data: bytes):
+        if self.metrics is not None:
+            self.metrics.on_write(data)
+        return self.dev.write(data)
+
+    def flush(self):
+        self.dev.flush()
+
+    def set_speed(self, speed: int) -> None:
+        self.dev.baudrate = speed
+
+    def close(self) -> None:
+        self.dev.close()
+
+
+class _PdChannel(osdp.Channel):
+    """PD side of the simulated bus; sees every byte the CP sends."""
+
+    def __init__(self, hub: BusHub) -> None:
+        super().__init__()
+        self._hub = hub
+        self._rx = bytearray()
+        self._lock = threading.Lock()
+
+    def feed(self, data: bytes) -> None:
+        with self._lock:
+            self._rx += data
+
+    def read(self, max_read: int):
+        with self._lock:
+            data = bytes(self._rx[:max_read])
+            del self._rx[:max_read]
+        return data
+
+    def write(self, data: bytes):
+        return self._hub.write(data)
+
+    def flush(self):
+        pass
+
+
+class BusHub:
+    """Multi-drop bus on top of a pty master: fan CP bytes out to every PD."""
+
+    def __init__(self) -> None:
+        self.master, slave = os.openpty()
+        tty.setraw(self.master)
+        tty.setraw(slave)
+        self.device = os.ttyname(slave)
+        self._slave = slave
+        self._channels: list[_PdChannel] = []
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="osdp-sim-bus", daemon=True)
+
+    def channel(self) -> _PdChannel:
+        ch = _PdChannel(self)
+        self._channels.append(ch)
+        return ch
+
+    def write(self, data: bytes) -> int:
+        with self._write_lock:
+            return os.write(self.master, data)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        os.close(self.master)
+        os.close(self._slave)
+
+    def _run(self) -> None:
+        poller = select.poll()
+        poller.register(self.master, select.POLLIN)
+        while not self._stop.is_set():
+            if not poller.poll(50):
+                continue
+            data = os.read(self.master, 4096)
+            for ch in self._channels:
+                ch.feed(data)
+
+
+def _start_pds(hub: BusHub, addresses: list[int]) -> list:
+    caps = osdp.PDCapabilities(
+        [
+            (osdp.Capability.OutputControl, 1, 1),
+            (osdp.Capability.LEDControl, 1, 1),
+            (osdp.Capability.AudibleControl, 1, 1),
+            (osdp.Capability.TextOutput, 1, 1),
+        ]
+    )
+    pds = []
+    for address in addresses:
+        info = osdp.PDInfo(address, hub.channel(), name=f"sim-{address}")
+        pd = osdp.PeripheralDevice(info, caps, log_level=osdp.LogLevel.Error)
+        pd.start()
+        pds.append(pd)
+    return pds
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    loop = asyncio.get_running_loop()
+    addresses = list(range(FIRST_ADDRESS, FIRST_ADDRESS + args.readers))
+    # Configured on the panel, but nothing answers
+    dead = list(range(addresses[-1] + 1, addresses[-1] + 1 + args.offline))
+    active = args.active or args.readers
+    # seq -> (injected at, address of the PD it was presented at)
+    injected: dict[int, tuple[float, int]] = {}
+    latencies: list[float] = []
+    misattributed: list[int] = []
+    # Reads the PD's own event queue had no room for
+    refused = 0
+
+    def _handler(events: list[dict]) -> None:
+        now = time.perf_counter()
+        for event in events:
+            if event["event"] != osdp.Event.CardRead:
+                continue
+            seq = int.from_bytes(event["data"], "big")
+            sent = injected.get(seq)
+            if sent is None:
+                continue
+            latencies.append(now - sent[0])
+            # A read must come from the reader it was presented at
+            if event["pd"] != sent[1]:
+                misattributed.append(seq)
+
+    if args.channel == "legacy":
+        # OSDPBus opens its channel through this name in bus.py
+        bus_mod.create_channel = lambda port, speed, metrics=None: LegacySerialChannel(port, speed, metrics)
+
+    bridge = bridge_mod.EventBridge(loop, _handler, args.queue_size, const.DEFAULT_OVERFLOW_POLICY)
+    hub = BusHub()
+    hub.start()
+    pds = _start_pds(hub, addresses)
+    priorities = {str(a): const.PRIORITY_LOW for a in addresses[active:]} if args.low_idle else None
+    bus = bus_mod.OSDPBus(
+        hub.device,
+        args.baudrate,
+        addresses + dead,
+        bridge,
+        worker=args.worker,
+        adaptive=args.adaptive,
+        priorities=priorities,
+    )
+    if args.idle_after is not None:
+        bus.scheduler.low_idle_after = args.idle_after
+    await loop.run_in_executor(None, bus.start)
+
+    def _online(address: int) -> bool:
+        # Idle doors parked by the scheduler were online when parked
+        return address in bus.scheduler.masked or bus.cp.is_online(address)
+
+    # Let every PD come online before injecting
+    deadline = time.monotonic() + args.settle
+    while time.monotonic() < deadline:
+        if all(_online(a) for a in addresses):
+            break
+        await asyncio.sleep(0.1)
+    online = sum(1 for a in addresses if _online(a))
+    await asyncio.sleep(args.warmup)
+
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    reconfigure_gap = None
+    stop = threading.Event()
+
+    def _inject() -> None:
+        nonlocal refused
+        if not args.rate:
+            # Idle bus: polling only
+            return
+        interval = 1.0 / args.rate
+        seq = 0
+        next_at = time.perf_counter()
+        while not stop.is_set():
+            pd = pds[seq % active]
+            injected[seq] = (time.perf_counter(), addresses[seq % active])
+            if not pd.submit_event(
+                {
+                    "event": osdp.Event.CardRead,
+                    "reader_no": 0,
+                    "direction": 0,
+                    "format": osdp.CardFormat.Wiegand,
+                    "length": 32,
+                    "data": seq.to_bytes(4, "big"),
+                }
+            ):
+                del injected[seq]
+                refused += 1
+            seq += 1
+            next_at += interval
+            stop.wait(max(0.0, next_at - time.perf_counter()))
+
+    def _load() -> None:
+        # Pure-Python busy work standing in for a busy Home Assistant
+        while not stop.is_set():
+            sum(range(10000))
+
+    loaders = [threading.Thread(target=_load, daemon=True) for _ in range(args.load_threads)]
+    for loader in loaders:
+        loader.start()
+    injector = threading.Thread(target=_inject, name="osdp-sim-inject", daemon=True)
+    injector.start()
+    if args.reconfigure_at is not None and args.reconfigure_at < args.duration:
+        await asyncio.sleep(args.reconfigure_at)
+        extra = addresses[-1] + 1
+        _start_pds(hub, [extra])
+        reconfigure_gap = await loop.run_in_executor(None, bus.reconfigure, addresses + [extra], args.baudrate)
+        await asyncio.sleep(args.duration - args.reconfigure_at)
+    else:
+        await asyncio.sleep(args.duration)
+    stop.set()
+    injector.join()
+    for loader in loaders:
+        loader.join()
+    # Grace period for reads still on the wire
+    deadline = time.monotonic() + 5.0
+    while len(latencies) < len(injected) and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+    elapsed = time.perf_counter() - started
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+
+    await loop.run_in_executor(None, bus.sync_metrics)
+    wire = bus.metrics.as_dict()
+    scheduler = bus.scheduler.as_dict()
+    poll_cycle = wire["poll_cycle"]
+    await loop.run_in_executor(None, bus.stop)
+    for pd in pds:
+        pd.stop()
+    hub.stop()
+
+    cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+    ms = [v * 1000 for v in latencies]
+    replies = [reader["reply_latency"] for reader in wire["readers"].values() if reader["reply_latency"]["count"]]
+    reply_count = sum(r["count"] for r in replies)
+    return {
+        "params": {
+            "readers": args.readers,
+            "rate": args.rate,
+            "duration": args.duration,
+            "baudrate": args.baudrate,
+            "queue_size": args.queue_size,
+            "reconfigure_at": args.reconfigure_at,
+            "worker": args.worker,
+            "load_threads": args.load_threads,
+            "active": active,
+            "offline": args.offline,
+            "adaptive": args.adaptive,
+            "low_idle": args.low_idle,
+            "idle_after": args.idle_after,
+            "warmup": args.warmup,
+            "channel": args.channel,
+        },
+        "host": {"python": platform.python_version(), "machine": platform.machine()},
+        "readers_online": online,
+        "reads_injected": len(injected),
+        "reads_received": len(latencies),
+        "reads_lost": len(injected) - len(latencies),
+        "reads_refused_by_pd": refused,
+        "reads_misattributed": len(misattributed),
+        "bridge": bridge.as_dict(),
+        "wire": wire,
+        "scheduler": scheduler,
+        # Spread of the poll cycle: what GIL contention does to bus timing
+        "poll_cycle_jitter_ms": (
+            poll_cycle["p99_ms"] - poll_cycle["p50_ms"] if poll_cycle["count"] else None
+        ),
+        "latency_ms": {
+            "min": min(ms) if ms else None,
+            "p50": _percentile(ms, 50),
+            "p95": _percentile(ms, 95),
+            "p99": _percentile(ms, 99),
+            "max": max(ms) if ms else None,
+        },
+        # Command to first reply byte, over every reader
+        "reply_latency_ms": {
+            "count": reply_count,
+            "mean": sum(r["mean_ms"] * r["count"] for r in replies) / reply_count if reply_count else None,
+            "worst_p99": max((r["p99_ms"] for r in replies), default=None),
+        },
+        "reconfigure_gap_ms": reconfigure_gap * 1000 if reconfigure_gap is not None else None,
+        "cpu_seconds": cpu,
+        "cpu_percent_per_reader": 100 * cpu / elapsed / args.readers,
+        # ru_maxrss is KiB on Linux
+        "max_rss_kib_per_reader": usage_after.ru_maxrss / args.readers,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--readers", type=int, default=8, help="simulated PDs on the bus")
+    parser.add_argument(
+        "--rate", type=float, default=10.0, help="card reads per second, whole bus (0: idle bus)"
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of injection")
+    parser.add_argument("--baudrate", type=int, default=const.DEFAULT_BAUDRATE)
+    parser.add_argument("--queue-size", type=int, default=const.DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--settle", type=float, default=15.0, help="max seconds to wait for PDs to come online")
+    parser.add_argument(
+        "--reconfigure-at", type=float, default=None, help="add one reader this many seconds into the run"
+    )
+    parser.add_argument("--worker", action="store_true", help="run the ControlPanel in a worker process")
+    parser.add_argument(
+        "--load-threads", type=int, default=0, help="busy Python threads competing for the GIL"
+    )
+    parser.add_argument("--active", type=int, default=0, help="readers cards are presented at (default: all)")
+    parser.add_argument("--offline", type=int, default=0, help="configured readers that never answer")
+    parser.add_argument("--adaptive", action="store_true", help="enable adaptive poll scheduling")
+    parser.add_argument("--low-idle", action="store_true", help="give the idle readers low priority")
+    parser.add_argument(
+        "--idle-after", type=float, default=None, help="seconds before an idle low-priority door is parked"
+    )
+    parser.add_argument("--warmup", type=float, default=0.0, help="seconds to run before injecting")
+    parser.add_argument(
+        "--channel",
+        choices=("poll", "legacy"),
+        default="poll",
+        help="serial channel: the integration's, or the old timeout=0 one",
+    )
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+    if args.channel == "legacy" and args.worker:
+        parser.error("--channel legacy runs in process; it cannot be combined with --worker")
+
+    result = asyncio.run(_run(args))
+    text = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""Load the integration's pure-Python modules without Home Assistant."""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import types
+
+# The integration package __init__ pulls in Home Assistant, these modules
+# do not: expose the package directory without running __init__.
+PKG = "osdp_integration"
+_pkg = types.ModuleType(PKG)
+_pkg.__path__ = [str(Path(__file__).resolve().parent.parent / "custom_components" / "osdp")]
+sys.modules.setdefault(PKG, _pkg)
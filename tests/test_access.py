@@ -0,0 +1,49 @@
+"""Tests for the local access allow-list."""
+from __future__ import annotations
+
+from osdp_integration.access import AccessList
+
+PORT = "/dev/ttyUSB0"
+
+
+def test_no_decision_until_loaded():
+    access = AccessList()
+    assert not access.active
+    assert access.check(PORT, 1, 42) is None
+
+
+def test_default_list_applies_to_every_reader():
+    access = AccessList()
+    access.replace([42, "43"], {})
+    assert access.check(PORT, 1, 42) is True
+    assert access.check("tcp://other:4001", 9, 43) is True
+    assert access.check(PORT, 1, 44) is False
+
+
+def test_reader_list_adds_to_default():
+    access = AccessList()
+    access.replace([42], {(PORT, 2): [7]})
+    assert access.check(PORT, 2, 7) is True
+    assert access.check(PORT, 2, 42) is True
+    assert access.check(PORT, 1, 7) is False
+    # Same address on another bus is another reader
+    assert access.check("/dev/ttyUSB1", 2, 7) is False
+
+
+def test_set_tags_updates_default_or_readers():
+    access = AccessList()
+    access.set_tags(None, [1])
+    access.set_tags([(PORT, 3)], [2])
+    assert access.check(PORT, 3, 1) is True
+    assert access.check(PORT, 3, 2) is True
+    access.set_tags(None, [5])
+    assert access.check(PORT, 3, 1) is False
+    assert access.check(PORT, 3, 5) is True
+
+
+def test_clear_stops_decisions():
+    access = AccessList()
+    access.replace([1], {})
+    access.clear()
+    assert access.check(PORT, 1, 1) is None
+    assert access.as_dict() == {"active": False, "default_tags": 0, "reader_lists": 0}
@@ -0,0 +1,85 @@
+"""Tests for the thread-to-loop event bridge."""
+from __future__ import annotations
+
+import asyncio
+
+from osdp_integration.bridge import EventBridge
+from osdp_integration.const import OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST
+
+
+class _Loop:
+    """Records scheduled drains instead of running them."""
+
+    def __init__(self) -> None:
+        self.calls: list = []
+
+    def call_soon_threadsafe(self, callback) -> None:
+        self.calls.append(callback)
+
+    def call_soon(self, callback) -> None:
+        self.calls.append(callback)
+
+    def run(self) -> None:
+        while self.calls:
+            self.calls.pop(0)()
+
+
+def _bridge(maxlen: int, overflow: str, batch_size: int = 64):
+    loop = _Loop()
+    batches: list[list] = []
+    return loop, batches, EventBridge(loop, batches.append, maxlen, overflow, batch_size)
+
+
+def test_burst_is_delivered_in_one_wakeup():
+    loop, batches, bridge = _bridge(16, OVERFLOW_DROP_OLDEST)
+    for item in range(5):
+        assert bridge.submit(item)
+    assert len(loop.calls) == 1
+    loop.run()
+    assert batches == [[0, 1, 2, 3, 4]]
+
+
+def test_drop_oldest_keeps_newest_items():
+    loop, batches, bridge = _bridge(3, OVERFLOW_DROP_OLDEST)
+    assert all(bridge.submit(item) for item in range(5))
+    loop.run()
+    assert batches == [[2, 3, 4]]
+    assert bridge.dropped == 2
+
+
+def test_drop_newest_rejects_new_items():
+    loop, batches, bridge = _bridge(3, OVERFLOW_DROP_NEWEST)
+    assert [bridge.submit(item) for item in range(5)] == [True, True, True, False, False]
+    loop.run()
+    assert batches == [[0, 1, 2]]
+    assert bridge.dropped == 2
+
+
+def test_backlog_is_drained_batch_by_batch():
+    loop, batches, bridge = _bridge(100, OVERFLOW_DROP_OLDEST, batch_size=4)
+    for item in range(10):
+        bridge.submit(item)
+    loop.run()
+    assert batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    assert bridge.batches == 3
+
+
+def test_closed_bridge_drops_everything():
+    loop, batches, bridge = _bridge(10, OVERFLOW_DROP_OLDEST)
+    bridge.submit(1)
+    bridge.close()
+    assert not bridge.submit(2)
+    loop.run()
+    assert batches == []
+
+
+def test_real_loop_from_another_thread():
+    async def _run() -> list:
+        batches: list[list] = []
+        bridge = EventBridge(asyncio.get_running_loop(), batches.append, 10, OVERFLOW_DROP_OLDEST)
+        await asyncio.to_thread(lambda: [bridge.submit(item) for item in range(3)])
+        await asyncio.sleep(0)
+        return batches
+
+    # How the items split into batches depends on when the loop wakes
+    assert [item for batch in asyncio.run(_run()) for item in batch] == [0, 1, 2]
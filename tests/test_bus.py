@@ -0,0 +1,135 @@
+"""Tests for event handling on one bus, against a fake ControlPanel."""
+from __future__ import annotations
+
+import pytest
+
+osdp = pytest.importorskip("osdp")
+
+from osdp_integration import bus as bus_mod  # noqa: E402
+from osdp_integration.access import AccessList  # noqa: E402
+from osdp_integration.bus import OSDPBus  # noqa: E402
+
+# Addresses as configured; libosdp calls back with positions in this list
+ADDRESSES = [5, 7, 9]
+
+
+class FakeBridge:
+    def __init__(self) -> None:
+        self.items: list = []
+
+    def submit(self, item) -> bool:
+        self.items.append(item)
+        return True
+
+
+class FakeControlPanel:
+    instances: list[FakeControlPanel] = []
+
+    def __init__(self, pd_infos, log_level, callback) -> None:
+        self.addresses = [address for address, _ in pd_infos]
+        self.callback = callback
+        self.disabled: set[int] = set()
+        self.refuse = False
+        FakeControlPanel.instances.append(self)
+
+    def start(self) -> None:
+        pass
+
+    def enable_pd(self, address: int) -> bool:
+        if self.refuse or address not in self.disabled:
+            return False
+        self.disabled.discard(address)
+        return True
+
+    def disable_pd(self, address: int) -> bool:
+        if self.refuse or address in self.disabled:
+            return False
+        self.disabled.add(address)
+        return True
+
+    def stop(self) -> None:
+        pass
+
+
+@pytest.fixture
+def panel(monkeypatch):
+    FakeControlPanel.instances.clear()
+    monkeypatch.setattr(bus_mod.osdp, "ControlPanel", FakeControlPanel)
+    monkeypatch.setattr(bus_mod.osdp, "PDInfo", lambda address, channel, flags=None: (address, channel))
+    monkeypatch.setattr(bus_mod, "create_channel", lambda port, speed, metrics=None: object())
+
+
+def _card(data: bytes) -> dict:
+    return {"event": osdp.Event.CardRead, "reader_no": 0, "format": 0, "length": 32, "data": data}
+
+
+@pytest.fixture
+def bus(panel):
+    access = AccessList()
+    access.replace([], {("/dev/test", 7): [0x11223344]})
+    bus = OSDPBus("/dev/test", 9600, ADDRESSES, FakeBridge(), access)
+    bus.start()
+    yield bus
+    bus.stop()
+
+
+def test_events_are_attributed_to_the_pd_address(bus):
+    (cp,) = FakeControlPanel.instances
+    assert cp.addresses == ADDRESSES
+    feedback = []
+    bus.commands.submit = lambda address, command, lane=0: feedback.append(address)
+
+    for index, address in enumerate(ADDRESSES):
+        cp.callback(index, _card(bytes([0x11, 0x22, 0x33, index])))
+    assert [item["pd"] for item in bus.bridge.items] == ADDRESSES
+    assert {address: bus.metrics.reader(address).events for address in ADDRESSES} == {5: 1, 7: 1, 9: 1}
+    # LED and buzzer feedback goes to the reader the card was read at
+    assert feedback == [5, 5, 7, 7, 9, 9]
+
+
+def test_access_list_of_the_right_reader_is_checked(bus):
+    (cp,) = FakeControlPanel.instances
+    bus.commands.submit = lambda address, command, lane=0: None
+    cp.callback(1, _card(bytes.fromhex("11223344")))
+    cp.callback(0, _card(bytes.fromhex("11223344")))
+    granted = {item["pd"]: item["access"] for item in bus.bridge.items}
+    assert granted == {7: True, 5: False}
+
+
+def test_keypad_entry_is_attributed_to_the_pd_address(panel):
+    bus = OSDPBus(
+        "/dev/test", 9600, ADDRESSES, FakeBridge(), keypad=bus_mod.KeypadAssembler(5.0, 8, 10.0)
+    )
+    bus.start()
+    try:
+        (cp,) = FakeControlPanel.instances
+        cp.callback(2, {"event": osdp.Event.KeyPress, "reader_no": 0, "data": b"42#"})
+        assert [(item["pd"], item["pin"]) for item in bus.bridge.items] == [(9, "42")]
+    finally:
+        bus.stop()
+
+
+def test_unknown_pd_index_is_dropped(bus):
+    (cp,) = FakeControlPanel.instances
+    assert cp.callback(len(ADDRESSES), _card(b"\x01")) == 0
+    assert bus.bridge.items == []
+
+
+def test_removed_reader_is_disabled_in_place(bus):
+    if not bus_mod.PD_TOGGLE_SUPPORTED:
+        pytest.skip("libosdp cannot disable PDs")
+    (cp,) = FakeControlPanel.instances
+    assert bus.reconfigure([5, 9], 9600) == 0.0
+    assert cp.disabled == {7}
+    bus.reconfigure(ADDRESSES, 9600)
+    assert cp.disabled == set()
+    assert len(FakeControlPanel.instances) == 1
+
+
+def test_refused_disable_rebuilds_the_panel(bus):
+    if not bus_mod.PD_TOGGLE_SUPPORTED:
+        pytest.skip("libosdp cannot disable PDs")
+    FakeControlPanel.instances[0].refuse = True
+    bus.reconfigure([5, 9], 9600)
+    assert len(FakeControlPanel.instances) == 2
+    assert FakeControlPanel.instances[-1].addresses == [5, 9]
@@ -0,0 +1,124 @@
+"""Tests for table-driven card format decoding."""
+from __future__ import annotations
+
+import pytest
+
+from osdp_integration.cardformat import (
+    AUTO_TABLE,
+    FORMAT_RAW,
+    RAW_TABLE,
+    decode_card,
+    layout_table,
+)
+
+
+def _parity(bits: str, odd: bool) -> str:
+    """Parity bit making the count of ones in ``bits`` plus itself odd or even."""
+    return str((bits.count("1") + odd) % 2)
+
+
+def _pack(bits: str) -> bytes:
+    """Left-aligned, MSB first, as readers report card data."""
+    padded = bits + "0" * (-len(bits) % 8)
+    return int(padded, 2).to_bytes(len(padded) // 8, "big")
+
+
+def wiegand26(facility: int, card: int) -> bytes:
+    payload = f"{facility:08b}{card:016b}"
+    return _pack(_parity(payload[:12], False) + payload + _parity(payload[12:], True))
+
+
+def wiegand34(facility: int, card: int) -> bytes:
+    payload = f"{facility:016b}{card:016b}"
+    return _pack(_parity(payload[:16], False) + payload + _parity(payload[16:], True))
+
+
+def wiegand37(card: int) -> bytes:
+    payload = f"{card:035b}"
+    return _pack(_parity(payload[:18], False) + payload + _parity(payload[17:], True))
+
+
+def h10304(facility: int, card: int) -> bytes:
+    payload = f"{facility:016b}{card:019b}"
+    return _pack(_parity(payload[:18], False) + payload + _parity(payload[17:], True))
+
+
+def _flip(data: bytes, bit: int) -> bytes:
+    """Invert one bit, 0 being the first transmitted (MSB of the first byte)."""
+    value = bytearray(data)
+    value[bit // 8] ^= 0x80 >> (bit % 8)
+    return bytes(value)
+
+
+def test_wiegand26_known_value():
+    # Facility 1, card 1: even parity 1, odd parity 0
+    assert wiegand26(1, 1) == bytes.fromhex("80800080")
+    card = decode_card(AUTO_TABLE, bytes.fromhex("80800080"), 26)
+    assert card == ("wiegand26", 26, 1, 1, True)
+
+
+@pytest.mark.parametrize(
+    ("card_format", "data", "bits", "facility", "number"),
+    [
+        ("wiegand26", wiegand26(18, 12345), 26, 18, 12345),
+        ("wiegand26", wiegand26(255, 65535), 26, 255, 65535),
+        ("wiegand34", wiegand34(4660, 43981), 34, 4660, 43981),
+        ("wiegand37", wiegand37(23456789012), 37, None, 23456789012),
+        ("h10304", h10304(1234, 456789), 37, 1234, 456789),
+    ],
+)
+def test_fields_per_layout(card_format, data, bits, facility, number):
+    card = decode_card(layout_table(card_format), data, bits)
+    assert card.format == card_format
+    assert card.bits == bits
+    assert card.facility_code == facility
+    assert card.card_number == number
+    assert card.parity_valid is True
+
+
+def test_auto_decodes_37_bits_as_h10304():
+    card = decode_card(AUTO_TABLE, h10304(7, 8), 37)
+    assert (card.format, card.facility_code, card.card_number) == ("h10304", 7, 8)
+
+
+@pytest.mark.parametrize(
+    ("data", "bits"),
+    [(wiegand26(18, 12345), 26), (wiegand34(4660, 43981), 34), (h10304(1234, 456789), 37)],
+)
+def test_parity_errors(data, bits):
+    # First and last bits are the even and odd parity bits
+    for bit in (0, bits - 1, 1, bits - 2):
+        card = decode_card(AUTO_TABLE, _flip(data, bit), bits)
+        assert card.parity_valid is False, bit
+
+
+def test_h10304_shared_bit_is_checked_by_both_parities():
+    # Bit 18 is covered by the even and the odd half
+    data = _flip(h10304(1234, 456789), 18)
+    assert decode_card(AUTO_TABLE, data, 37).parity_valid is False
+
+
+def test_unknown_length_falls_back_to_raw():
+    data = bytes.fromhex("0123456789")
+    card = decode_card(AUTO_TABLE, data, 40)
+    assert card == (FORMAT_RAW, 40, None, 0x0123456789, None)
+
+
+def test_raw_table_never_decodes():
+    card = decode_card(RAW_TABLE, wiegand26(1, 1), 26)
+    assert card == (FORMAT_RAW, 26, None, int("10000000100000000000000010", 2), None)
+
+
+def test_forced_format_with_other_length_is_raw():
+    card = decode_card(layout_table("wiegand34"), wiegand26(1, 1), 26)
+    assert card.format == FORMAT_RAW
+
+
+@pytest.mark.parametrize("bits", [0, -1, 99])
+def test_missing_or_oversized_bit_count_uses_whole_payload(bits):
+    card = decode_card(AUTO_TABLE, b"\xab\xcd", bits)
+    assert card == (FORMAT_RAW, 16, None, 0xABCD, None)
+
+
+def test_unknown_format_name_means_auto():
+    assert layout_table("nonsense") is AUTO_TABLE
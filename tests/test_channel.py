@@ -0,0 +1,75 @@
+"""Tests for the reconnect backoff of the TCP channel."""
+from __future__ import annotations
+
+import socket
+import threading
+
+import pytest
+
+pytest.importorskip("osdp")
+
+from osdp_integration.channel import TcpChannel  # noqa: E402
+from osdp_integration.const import TCP_RECONNECT_MIN  # noqa: E402
+
+
+class Converter:
+    """Accepts connections; closes each at once, or first sends ``greeting``."""
+
+    def __init__(self) -> None:
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.port = self.server.getsockname()[1]
+        self.greeting = b""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            if self.greeting:
+                conn.sendall(self.greeting)
+            else:
+                conn.close()
+
+    def close(self) -> None:
+        self.server.close()
+
+
+@pytest.fixture
+def converter():
+    converter = Converter()
+    yield converter
+    converter.close()
+
+
+def _reconnect_and_read(channel: TcpChannel) -> bytes:
+    # Skip the wait; the backoff itself is what is checked
+    channel._next_attempt = 0.0
+    return channel.read(64)
+
+
+def test_backoff_grows_while_connections_drop_at_once(converter):
+    channel = TcpChannel("127.0.0.1", converter.port, read_timeout=1.0)
+    try:
+        backoffs = []
+        for _ in range(4):
+            assert _reconnect_and_read(channel) == b""
+            backoffs.append(channel._backoff)
+        assert backoffs == [TCP_RECONNECT_MIN * 2**n for n in range(1, 5)]
+    finally:
+        channel.close()
+
+
+def test_backoff_resets_once_data_arrives(converter):
+    channel = TcpChannel("127.0.0.1", converter.port, read_timeout=1.0)
+    try:
+        _reconnect_and_read(channel)
+        _reconnect_and_read(channel)
+        assert channel._backoff > TCP_RECONNECT_MIN
+        converter.greeting = b"\x53"
+        assert _reconnect_and_read(channel) == b"\x53"
+        assert channel._backoff == TCP_RECONNECT_MIN
+    finally:
+        channel.close()
@@ -0,0 +1,121 @@
+"""Tests for the outbound command queue, against a fake ControlPanel."""
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("osdp")
+
+from osdp_integration.commands import (  # noqa: E402
+    LANE_ACCESS,
+    CommandQueue,
+    buzzer_command,
+    led_command,
+    output_command,
+)
+
+
+class FakeControlPanel:
+    """Only submit_command: the deprecated send_command must not be used."""
+
+    def __init__(self, accept: bool = True) -> None:
+        self.accept = accept
+        self.sent: list[tuple[int, dict]] = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def submit_command(self, address: int, command: dict) -> bool:
+        self.gate.wait(5)
+        self.sent.append((address, command))
+        return self.accept
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def cp() -> FakeControlPanel:
+    return FakeControlPanel()
+
+
+@pytest.fixture
+def queue(cp):
+    queue = CommandQueue("test", lambda: cp, 115200)
+    queue.start()
+    yield queue
+    queue.stop()
+
+
+def test_commands_are_submitted(queue, cp):
+    assert queue.submit(1, output_command(0, True))
+    _wait_for(lambda: queue.sent == 1)
+    assert cp.sent == [(1, output_command(0, True))]
+    assert queue.failed == 0
+
+
+def test_pending_command_is_replaced_by_a_later_one(queue, cp):
+    cp.gate.clear()
+    # The first command holds the dispatcher; the next two share a key
+    queue.submit(1, buzzer_command(count=1))
+    _wait_for(lambda: queue.depth == 0)
+    queue.submit(1, led_command("red"))
+    queue.submit(1, led_command("green"))
+    queue.submit(1, output_command(0, True))
+    cp.gate.set()
+    _wait_for(lambda: queue.sent == 3)
+    assert [command for _, command in cp.sent] == [
+        buzzer_command(count=1),
+        led_command("green"),
+        output_command(0, True),
+    ]
+    assert queue.coalesced == 1
+
+
+def test_access_lane_goes_first(queue, cp):
+    cp.gate.clear()
+    queue.submit(1, buzzer_command(count=2))
+    _wait_for(lambda: queue.depth == 0)
+    queue.submit(2, output_command(0, True))
+    queue.submit(3, led_command("green"), LANE_ACCESS)
+    cp.gate.set()
+    _wait_for(lambda: queue.sent == 3)
+    assert [address for address, _ in cp.sent] == [1, 3, 2]
+
+
+def test_refused_command_counts_as_failed(cp):
+    cp.accept = False
+    queue = CommandQueue("test", lambda: cp, 115200)
+    queue.start()
+    try:
+        queue.submit(1, output_command(0, True))
+        _wait_for(lambda: queue.failed == 1)
+        assert queue.sent == 0
+    finally:
+        queue.stop()
+
+
+def test_command_without_panel_counts_as_failed():
+    queue = CommandQueue("test", lambda: None, 115200)
+    queue.start()
+    try:
+        assert queue.submit(1, output_command(0, True))
+        _wait_for(lambda: queue.failed == 1)
+    finally:
+        queue.stop()
+
+
+def test_submit_is_rejected_unless_running(cp):
+    queue = CommandQueue("test", lambda: cp, 115200)
+    assert not queue.submit(1, output_command(0, True))
+    queue.start()
+    queue.stop()
+    assert not queue.submit(1, output_command(0, True))
+    assert queue.failed == 2
+    assert queue.submitted == 0
+    assert cp.sent == []
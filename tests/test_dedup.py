@@ -0,0 +1,66 @@
+"""Tests for suppression of repeated card reads."""
+from __future__ import annotations
+
+import pytest
+
+from osdp_integration import dedup as dedup_mod
+from osdp_integration.dedup import ReadDeduplicator
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(dedup_mod, "time", clock)
+    return clock
+
+
+def test_window_zero_passes_everything(clock):
+    dedup = ReadDeduplicator(0.0)
+    assert not dedup.is_duplicate(1, b"a")
+    assert not dedup.is_duplicate(1, b"a")
+    assert (dedup.passed, dedup.suppressed) == (2, 0)
+
+
+def test_repeat_within_window_is_suppressed(clock):
+    dedup = ReadDeduplicator(2.0)
+    assert not dedup.is_duplicate(1, b"a")
+    clock.now += 1.0
+    assert dedup.is_duplicate(1, b"a")
+    # Another card, or the same card on another reader, still passes
+    assert not dedup.is_duplicate(1, b"b")
+    assert not dedup.is_duplicate(2, b"a")
+    assert dedup.suppressed_by_reader == {1: 1}
+
+
+def test_held_card_stays_quiet_until_away_for_a_window(clock):
+    dedup = ReadDeduplicator(2.0)
+    dedup.is_duplicate(1, b"a")
+    for _ in range(5):
+        clock.now += 1.5
+        assert dedup.is_duplicate(1, b"a")
+    clock.now += 2.0
+    assert not dedup.is_duplicate(1, b"a")
+
+
+def test_oldest_card_is_evicted_beyond_limit(clock):
+    dedup = ReadDeduplicator(10.0, max_tags=2)
+    for data in (b"a", b"b", b"c"):
+        dedup.is_duplicate(1, data)
+    assert not dedup.is_duplicate(1, b"a")
+    assert dedup.is_duplicate(1, b"c")
+
+
+def test_turning_off_forgets_seen_cards(clock):
+    dedup = ReadDeduplicator(10.0)
+    dedup.is_duplicate(1, b"a")
+    dedup.configure(0.0)
+    dedup.configure(10.0)
+    assert not dedup.is_duplicate(1, b"a")
@@ -0,0 +1,96 @@
+"""Tests for the assembly of keypad presses into PIN entries."""
+from __future__ import annotations
+
+import pytest
+
+from osdp_integration import keypad as keypad_mod
+from osdp_integration.keypad import KEYPAD_EVENT, KeypadAssembler
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(keypad_mod, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def keypad(clock) -> KeypadAssembler:
+    return KeypadAssembler(timeout=5.0, max_length=8, card_window=10.0)
+
+
+def _pins(entries: list[dict]) -> list[str]:
+    return [entry["pin"] for entry in entries]
+
+
+@pytest.mark.parametrize("enter", [b"\x0d", b"#"])
+def test_enter_completes_entry(keypad, enter):
+    assert keypad.on_keys(1, b"1234") == []
+    assert keypad.on_keys(1, enter) == [{"event": KEYPAD_EVENT, "pd": 1, "pin": "1234", "card": None}]
+
+
+@pytest.mark.parametrize("clear", [b"\x7f", b"*"])
+def test_clear_discards_digits(keypad, clear):
+    assert _pins(keypad.on_keys(1, b"12" + clear + b"34#")) == ["34"]
+
+
+def test_every_entry_in_one_report_is_returned(keypad):
+    assert _pins(keypad.on_keys(1, b"12#34\x0d")) == ["12", "34"]
+
+
+def test_max_length_completes_entry(keypad):
+    keypad.max_length = 4
+    assert _pins(keypad.on_keys(1, b"123456")) == ["1234"]
+    assert _pins(keypad.on_keys(1, b"78")) == ["5678"]
+
+
+def test_enter_without_digits_is_ignored(keypad):
+    assert keypad.on_keys(1, b"##\x0d") == []
+
+
+def test_other_keys_are_ignored(keypad):
+    assert _pins(keypad.on_keys(1, b"1A2 3#")) == ["123"]
+
+
+def test_pause_discards_partial_entry(keypad, clock):
+    keypad.on_keys(1, b"12")
+    clock.now += 6.0
+    assert _pins(keypad.on_keys(1, b"34#")) == ["34"]
+
+
+def test_readers_are_buffered_separately(keypad):
+    keypad.on_keys(1, b"12")
+    keypad.on_keys(2, b"98")
+    assert _pins(keypad.on_keys(1, b"#")) == ["12"]
+    assert _pins(keypad.on_keys(2, b"#")) == ["98"]
+
+
+def test_pin_is_paired_with_recent_card(keypad, clock):
+    card = {"event": "card"}
+    keypad.on_card(1, card)
+    clock.now += 3.0
+    first, second = keypad.on_keys(1, b"12#34#")
+    assert first["card"] is card
+    # A card pairs with one PIN only
+    assert second["card"] is None
+
+
+def test_card_outside_window_is_not_paired(keypad, clock):
+    keypad.on_card(1, {"event": "card"})
+    clock.now += 11.0
+    (entry,) = keypad.on_keys(1, b"12#")
+    assert entry["card"] is None
+
+
+def test_card_read_clears_digits(keypad):
+    keypad.on_keys(1, b"12")
+    keypad.on_card(1, {"event": "card"})
+    assert _pins(keypad.on_keys(1, b"34#")) == ["34"]
@@ -0,0 +1,56 @@
+"""Tests for taking over the wire metrics of a worker process."""
+from __future__ import annotations
+
+from osdp_integration.metrics import BusMetrics
+
+
+def _worker(run: str, latencies: dict[int, list[float]], timeouts: dict[int, int]) -> dict:
+    """The state a worker's BusMetrics would report."""
+    metrics = BusMetrics()
+    for address, values in latencies.items():
+        for value in values:
+            metrics.reader(address).reply_latency.record(value)
+    for address, count in timeouts.items():
+        metrics.reader(address).timeouts = count
+        metrics.timeouts += count
+    metrics.frames_sent = sum(len(values) for values in latencies.values()) + metrics.timeouts
+    return {**metrics.wire_state(), "run": run}
+
+
+def test_loads_add_only_what_is_new():
+    metrics = BusMetrics()
+    metrics.load_wire_state(_worker("a", {1: [0.01]}, {1: 1}))
+    metrics.load_wire_state(_worker("a", {1: [0.01, 0.02]}, {1: 3}))
+    assert metrics.frames_sent == 5
+    assert metrics.timeouts == 3
+    assert metrics.readers[1].timeouts == 3
+    assert metrics.readers[1].reply_latency.count == 2
+
+
+def test_counters_keep_growing_across_a_worker_restart():
+    metrics = BusMetrics()
+    metrics.load_wire_state(_worker("a", {1: [0.01, 0.02]}, {1: 4}))
+    # The new worker counts from zero again
+    metrics.load_wire_state(_worker("b", {1: [0.5]}, {1: 1}))
+    assert metrics.frames_sent == 8
+    assert metrics.timeouts == 5
+    assert metrics.readers[1].reply_latency.count == 3
+    assert metrics.readers[1].reply_latency.max == 0.5
+
+
+def test_in_process_counts_are_kept():
+    metrics = BusMetrics()
+    metrics.timeouts = 7
+    metrics.reader(1).timeouts = 7
+    metrics.load_wire_state(_worker("a", {}, {1: 2}))
+    assert metrics.timeouts == 9
+    assert metrics.readers[1].timeouts == 9
+
+
+def test_forgotten_readers_stay_forgotten():
+    metrics = BusMetrics()
+    metrics.load_wire_state(_worker("a", {1: [0.01], 2: [0.01]}, {}), [1, 2])
+    metrics.forget([2])
+    # The worker still reports the disabled PD
+    metrics.load_wire_state(_worker("a", {1: [0.01], 2: [0.01, 0.01]}, {2: 1}), [1])
+    assert set(metrics.readers) == {1}
@@ -0,0 +1,279 @@
+"""Tests for the adaptive poll scheduler, against a fake ControlPanel."""
+from __future__ import annotations
+
+import pytest
+
+from osdp_integration import scheduler as scheduler_mod
+from osdp_integration.const import (
+    LOW_PARK_TIME,
+    LOW_POLL_SLICE,
+    LOW_WAKE_TIMEOUT,
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PROBE_MAX,
+    PROBE_MAX_HIGH,
+    PROBE_MIN,
+)
+from osdp_integration.scheduler import PollScheduler
+
+class FakeControlPanel:
+    """Just what the scheduler uses: enable, disable and online state.
+
+    Like libosdp, a request for a PD already in that state is refused.
+    """
+
+    def __init__(self, addresses: list[int]) -> None:
+        self.present = set(addresses)
+        self.enabled = set(addresses)
+        self.fail_disable = False
+        self.refuse = False
+
+    def enable_pd(self, address: int) -> bool:
+        if self.refuse or address in self.enabled:
+            return False
+        self.enabled.add(address)
+        return True
+
+    def disable_pd(self, address: int) -> bool:
+        if self.fail_disable:
+            raise RuntimeError("not supported")
+        if self.refuse or address not in self.enabled:
+            return False
+        self.enabled.discard(address)
+        return True
+
+    def is_online(self, address: int) -> bool:
+        return address in self.present and address in self.enabled
+
+
+class Harness:
+    def __init__(self, cp: FakeControlPanel, readers: list[int], priorities: dict[str, str] | None = None):
+        self.cp = cp
+        # libosdp starts with every configured PD enabled, answering or not
+        cp.enabled.update(readers)
+        self.readers = readers
+        self.now = 0.0
+        self.scheduler = PollScheduler("test", lambda: self.cp, lambda: self.readers, priorities)
+
+    def tick(self) -> None:
+        self.scheduler._tick(self.cp, self.now)
+
+    def run_for(self, seconds: float, step: float = 1.0) -> None:
+        end = self.now + seconds
+        while self.now < end:
+            self.now += step
+            self.tick()
+
+    def state(self, address: int) -> str:
+        return self.scheduler._readers[address].state
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _Clock:
+    # note_activity reads the clock; the harness passes its time to _tick
+    clock = _Clock()
+    monkeypatch.setattr(scheduler_mod, "time", clock)
+    return clock
+
+
+def test_online_readers_stay_active():
+    cp = FakeControlPanel([1, 2])
+    h = Harness(cp, [1, 2])
+    h.run_for(120)
+    assert h.state(1) == h.state(2) == scheduler_mod._ACTIVE
+    assert cp.enabled == {1, 2}
+    assert h.scheduler.parks == 0
+
+
+def test_offline_reader_is_parked_probed_and_recovered():
+    cp = FakeControlPanel([1])
+    h = Harness(cp, [1, 2])
+    h.run_for(h.scheduler.offline_grace + 1)
+    assert h.state(2) == scheduler_mod._PARKED_OFFLINE
+    assert 2 not in cp.enabled
+
+    h.run_for(PROBE_MIN)
+    assert h.state(2) == scheduler_mod._PROBING
+    assert 2 in cp.enabled
+    assert h.scheduler.probes == 1
+
+    cp.present.add(2)
+    h.tick()
+    assert h.state(2) == scheduler_mod._ACTIVE
+    assert h.scheduler.recoveries == 1
+
+
+def test_offline_readers_are_probed_one_at_a_time():
+    cp = FakeControlPanel([1])
+    h = Harness(cp, [1, 2, 3, 4])
+    h.run_for(h.scheduler.offline_grace + 1)
+    for _ in range(600):
+        h.run_for(1)
+        probing = [address for address in (2, 3, 4) if h.state(address) == scheduler_mod._PROBING]
+        assert len(probing) <= 1
+        assert cp.enabled & {2, 3, 4} <= set(probing)
+    assert h.scheduler.probes > 3
+
+
+@pytest.mark.parametrize(("priorities", "cap"), [(None, PROBE_MAX), ({"2": PRIORITY_HIGH}, PROBE_MAX_HIGH)])
+def test_probe_backoff_doubles_up_to_cap(priorities, cap):
+    cp = FakeControlPanel([1])
+    h = Harness(cp, [1, 2], priorities)
+    backoffs = []
+    for _ in range(1800):
+        h.run_for(1)
+        backoff = h.scheduler._readers[2].backoff
+        if not backoffs or backoffs[-1] != backoff:
+            backoffs.append(backoff)
+    expected = [PROBE_MIN]
+    while expected[-1] < cap:
+        expected.append(min(expected[-1] * 2, cap))
+    assert backoffs == expected
+
+
+def test_returning_reader_is_seen_within_probe_cap():
+    cp = FakeControlPanel([1])
+    h = Harness(cp, [1, 2])
+    # Offline long enough for the backoff to reach its cap
+    h.run_for(1800)
+    cp.present.add(2)
+    recovered_at = None
+    back_at = h.now
+    while recovered_at is None and h.now < back_at + 2 * PROBE_MAX:
+        h.run_for(1)
+        if h.state(2) == scheduler_mod._ACTIVE:
+            recovered_at = h.now
+    assert recovered_at is not None
+    assert recovered_at - back_at <= PROBE_MAX + 1
+
+
+def test_idle_low_priority_door_is_parked_masked_and_woken(clock):
+    cp = FakeControlPanel([1, 2])
+    h = Harness(cp, [1, 2], {"2": PRIORITY_LOW})
+    h.run_for(h.scheduler.low_idle_after + 1)
+    assert h.state(2) == scheduler_mod._PARKED_IDLE
+    assert h.scheduler.masked == {2}
+    assert 2 not in cp.enabled
+    assert h.state(1) == scheduler_mod._ACTIVE
+
+    h.run_for(LOW_PARK_TIME + 1)
+    assert h.state(2) == scheduler_mod._SLICE
+    assert 2 in cp.enabled
+    # Still masked through the slice, so the entity does not flap
+    assert h.scheduler.masked == {2}
+
+    # A read during the slice makes the door active again
+    clock.now = h.now
+    h.scheduler.note_activity(2)
+    h.run_for(LOW_POLL_SLICE + 1)
+    assert h.state(2) == scheduler_mod._ACTIVE
+    assert h.scheduler.masked == frozenset()
+
+
+def test_slice_starts_once_the_woken_reader_is_online():
+    cp = FakeControlPanel([1])
+    h = Harness(cp, [1], {"1": PRIORITY_LOW})
+    h.run_for(h.scheduler.low_idle_after + 1)
+    assert h.state(1) == scheduler_mod._PARKED_IDLE
+    # Every wake is a full reconnect; this one takes a while
+    cp.present.discard(1)
+    h.run_for(LOW_PARK_TIME + 4)
+    assert h.state(1) == scheduler_mod._WAKING
+    cp.present.add(1)
+    h.run_for(1)
+    assert h.state(1) == scheduler_mod._SLICE
+    assert h.scheduler.wake_time.count == 1
+    assert h.scheduler.wake_time.max >= 4
+    h.run_for(LOW_POLL_SLICE - 1)
+    assert h.state(1) == scheduler_mod._SLICE
+    # Still idle after the slice: parked again
+    h.run_for(1)
+    assert h.state(1) == scheduler_mod._PARKED_IDLE
+    assert h.scheduler.masked == {1}
+
+
+def test_reader_gone_while_parked_is_unmasked_and_treated_as_offline():
+    cp = FakeControlPanel([1])
+    h = Harness(cp, [1], {"1": PRIORITY_LOW})
+    h.run_for(h.scheduler.low_idle_after + 1)
+    cp.present.discard(1)
+    h.run_for(LOW_PARK_TIME + LOW_WAKE_TIMEOUT + 1)
+    assert h.state(1) == scheduler_mod._ACTIVE
+    assert h.scheduler.masked == frozenset()
+    h.run_for(h.scheduler.offline_grace + 1)
+    assert h.state(1) == scheduler_mod._PARKED_OFFLINE
+
+
+def test_failed_disable_keeps_reader_active_and_unmasked():
+    cp = FakeControlPanel([1])
+    cp.fail_disable = True
+    h = Harness(cp, [1], {"1": PRIORITY_LOW})
+    h.run_for(h.scheduler.low_idle_after + 5)
+    assert h.state(1) == scheduler_mod._ACTIVE
+    assert h.scheduler.masked == frozenset()
+    assert h.scheduler.parks == 0
+
+
+def test_refused_disable_keeps_reader_active_and_unmasked():
+    cp = FakeControlPanel([1])
+    cp.refuse = True
+    h = Harness(cp, [1], {"1": PRIORITY_LOW})
+    h.run_for(h.scheduler.low_idle_after + 5)
+    assert h.state(1) == scheduler_mod._ACTIVE
+    assert h.scheduler.masked == frozenset()
+    assert h.scheduler.parks == 0
+
+
+def test_refused_enable_keeps_reader_parked_until_accepted():
+    cp = FakeControlPanel([1])
+    h = Harness(cp, [1], {"1": PRIORITY_LOW})
+    h.run_for(h.scheduler.low_idle_after + 1)
+    assert h.state(1) == scheduler_mod._PARKED_IDLE
+    cp.refuse = True
+    h.run_for(h.scheduler.low_park_time + 1)
+    assert h.state(1) == scheduler_mod._PARKED_IDLE
+    assert 1 in h.scheduler.masked
+    cp.refuse = False
+    h.run_for(1)
+    assert h.state(1) == scheduler_mod._WAKING
+    assert 1 in cp.enabled
+
+
+def test_paused_enables_parked_readers():
+    cp = FakeControlPanel([1])
+    h = Harness(cp, [1, 2, 3], {"1": PRIORITY_LOW})
+    h.run_for(h.scheduler.low_idle_after + 1)
+    assert 1 not in cp.enabled
+    with h.scheduler.paused():
+        assert {1, 2, 3} <= cp.enabled
+        assert h.scheduler.masked == frozenset()
+    assert h.scheduler._readers == {}
+
+
+def test_disabling_releases_parked_readers():
+    cp = FakeControlPanel([1])
+    h = Harness(cp, [1, 2])
+    h.run_for(h.scheduler.offline_grace + 1)
+    assert 2 not in cp.enabled
+    h.scheduler.configure(None, enabled=False)
+    assert 2 in cp.enabled
+    assert not h.scheduler.enabled
+
+
+def test_removed_reader_is_forgotten():
+    cp = FakeControlPanel([1, 2])
+    h = Harness(cp, [1, 2], {"2": PRIORITY_LOW})
+    h.run_for(h.scheduler.low_idle_after + 1)
+    assert h.scheduler.masked == {2}
+    h.readers = [1]
+    h.tick()
+    assert 2 not in h.scheduler._readers
+    assert h.scheduler.masked == frozenset()
@@ -0,0 +1,67 @@
+"""Tests for the worker proxy's state that must survive a worker restart."""
+from __future__ import annotations
+
+import os
+import socket
+
+import pytest
+
+from osdp_integration import worker as worker_mod
+from osdp_integration.worker import MSG_CONFIG, RemoteControlPanel, _FrameReader
+
+
+class _FakePopen:
+    """Keeps the worker's end of the socketpair instead of starting a process."""
+
+    def __init__(self, args, pass_fds, **kwargs) -> None:
+        self.sock = socket.socket(fileno=os.dup(pass_fds[0]))
+        spawned.append(self)
+
+    def wait(self, timeout=None) -> int:
+        return 0
+
+
+spawned: list[_FakePopen] = []
+
+
+@pytest.fixture
+def proxy(monkeypatch):
+    spawned.clear()
+    monkeypatch.setattr(worker_mod.subprocess, "Popen", _FakePopen)
+    proxy = RemoteControlPanel("/dev/ttyUSB0", 9600, [3, 5, 7], False, lambda address, event: 0)
+    yield proxy
+    proxy._close()
+    for proc in spawned:
+        proc.sock.close()
+
+
+def _config(proc: _FakePopen) -> dict:
+    kind, config = _FrameReader(proc.sock).read()
+    assert kind == MSG_CONFIG
+    return config
+
+
+def test_disabled_readers_are_replayed_to_a_new_worker(proxy, monkeypatch):
+    monkeypatch.setattr(proxy, "_call", lambda method, address: True)
+    proxy._spawn()
+    assert _config(spawned[-1])["disabled"] == []
+
+    proxy.disable_pd(7)
+    proxy.disable_pd(3)
+    proxy.enable_pd(7)
+    proxy._close()
+    proxy._spawn()
+    assert _config(spawned[-1]) == {
+        "port": "/dev/ttyUSB0",
+        "baudrate": 9600,
+        "addresses": [3, 5, 7],
+        "notifications": False,
+        "disabled": [3],
+    }
+
+
+def test_rejected_toggle_is_not_recorded(proxy, monkeypatch):
+    monkeypatch.setattr(proxy, "_call", lambda method, address: False)
+    assert proxy.disable_pd(5) is False
+    proxy._spawn()
+    assert _config(spawned[-1])["disabled"] == []